@@ -1,16 +1,19 @@
 """Exchange public api"""
-from exchange.cache import Cache
-from exchange._abstract_exchange import AbstractExchange, RequestClass, BookData
+from exchange.cache import Cache, CacheStats
+from exchange.rate_limiter import RateLimiter
+from exchange._abstract_exchange import AbstractExchange, RequestClass, AsyncRequestClass, BookData
 from exchange.exchange_fabric import get_exchange
 from exchange.exchange_entities import ExchangeCode
 
 from exchange.binance import BinanceExchange
+from exchange.deribit_stream import DeribitStream
 from exchange.deribit import DeribitExchange, DeribitAssetKind, COLUMNS_TO_CURRENCY as DERIBIT_COLUMNS_TO_CURRENCY
 from exchange.moex import MoexExchange, COLUMNS_TO_CURRENCY as MOEX_COLUMNS_TO_CURRENCY
 from exchange.exchange_provider_factory import get_provider
 
 __all__ = [
-    'Cache', 'AbstractExchange', 'RequestClass', 'BookData', 'get_exchange', 'ExchangeCode',
-    'BinanceExchange', 'DeribitExchange', 'DeribitAssetKind', 'DERIBIT_COLUMNS_TO_CURRENCY',
+    'Cache', 'CacheStats', 'RateLimiter', 'AbstractExchange', 'RequestClass', 'AsyncRequestClass', 'BookData',
+    'get_exchange', 'ExchangeCode',
+    'BinanceExchange', 'DeribitExchange', 'DeribitAssetKind', 'DERIBIT_COLUMNS_TO_CURRENCY', 'DeribitStream',
     'MoexExchange', 'MOEX_COLUMNS_TO_CURRENCY', 'get_provider'
 ]
@@ -8,6 +8,13 @@ import pandas as pd
 from provider import DataEngine
 from provider import AbstractProvider
 from exchange.exchange_exception import APIException, RequestException
+from exchange.cache import Cache, CacheStats
+from exchange.rate_limiter import RateLimiter
+
+try:
+    import h2
+except ImportError:
+    h2 = None
 
 
 class BookData(NamedTuple):
@@ -17,8 +24,8 @@ class BookData(NamedTuple):
     spot: pd.DataFrame | None
 
 
-class RequestClass:
-    """Request implementation for Exchanges"""
+class BaseRequestClass(ABC):
+    """Api url and responses handling shared by sync and async request classes"""
     api_url: str
     version_url: str | None = None
     HEADERS: dict = {
@@ -26,23 +33,19 @@ class RequestClass:
         'User-Agent': 'Option Library Client',
     }
 
-    def __init__(self, api_url, http_params: dict | None = None):
+    def __init__(self, api_url, http_params: dict | None = None, rate_limiter: RateLimiter | None = None):
         self.api_url = api_url[:-1] if api_url[-1] == '/' else api_url
+        self.rate_limiter: RateLimiter | None = rate_limiter
         if not isinstance(http_params, dict):
             http_params = {'headers': self.HEADERS}
         elif 'headers' not in http_params:
             http_params['headers'] = self.HEADERS
-        self.session = httpx.Client(**http_params)
+        self.session = self._create_session(http_params)
         self.timestamp_offset = 0
 
-    def request_api(self, endpoint_path: str, signed: bool = False, **kwargs):
-        """Main request method """
-        api_url = self._create_api_uri(endpoint_path)
-        return self._request(api_url, signed, **kwargs)
-
-    def _request(self, request_url, signed: bool, **kwargs):
-        response = self.session.get(request_url, **kwargs)
-        return self._handle_response(response)
+    @abstractmethod
+    def _create_session(self, http_params: dict) -> httpx.Client | httpx.AsyncClient:
+        """Session of requests"""
 
     @staticmethod
     def _handle_response(response: httpx.Response):
@@ -63,16 +66,94 @@ class RequestClass:
         return f'{self.api_url}/{endpoint_path}'
 
 
+class RequestClass(BaseRequestClass):
+    """Request implementation for Exchanges. With rate limiter requests are limited and retried on throttling"""
+    session: httpx.Client
+
+    def _create_session(self, http_params: dict) -> httpx.Client:
+        return httpx.Client(**http_params)
+
+    def request_api(self, endpoint_path: str, signed: bool = False, **kwargs):
+        """Main request method """
+        api_url = self._create_api_uri(endpoint_path)
+        return self._request(api_url, signed, **kwargs)
+
+    def _request(self, request_url, signed: bool, **kwargs):
+        if self.rate_limiter is None:
+            response = self.session.get(request_url, **kwargs)
+        else:
+            response = self.rate_limiter.request(lambda: self.session.get(request_url, **kwargs))
+        return self._handle_response(response)
+
+
+class AsyncRequestClass(BaseRequestClass):
+    """Asyncio request implementation for Exchanges. Requests share pool of keep alive connections limited by limits,
+    with http2 requests are multiplexed over connection (h2 package is required)"""
+    session: httpx.AsyncClient
+    DEFAULT_LIMITS: httpx.Limits = httpx.Limits(max_connections=32, max_keepalive_connections=32, keepalive_expiry=30)
+
+    def __init__(self, api_url, http_params: dict | None = None, limits: httpx.Limits | None = None,
+                 http2: bool = False, rate_limiter: RateLimiter | None = None):
+        if http2 and h2 is None:
+            raise ImportError('HTTP/2 support is not installed, install it by: poetry install --with http2')
+        self.limits: httpx.Limits = self.DEFAULT_LIMITS if limits is None else limits
+        self.http2: bool = http2
+        super().__init__(api_url, http_params, rate_limiter)
+
+    def _create_session(self, http_params: dict) -> httpx.AsyncClient:
+        return httpx.AsyncClient(**{'limits': self.limits, 'http2': self.http2, **http_params})
+
+    async def __aenter__(self) -> 'AsyncRequestClass':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close connections pool"""
+        await self.session.aclose()
+
+    async def request_api(self, endpoint_path: str, signed: bool = False, **kwargs):
+        """Main request method """
+        api_url = self._create_api_uri(endpoint_path)
+        return await self._request(api_url, signed, **kwargs)
+
+    async def _request(self, request_url, signed: bool, **kwargs):
+        if self.rate_limiter is None:
+            response = await self.session.get(request_url, **kwargs)
+        else:
+            response = await self.rate_limiter.arequest(lambda: self.session.get(request_url, **kwargs))
+        return self._handle_response(response)
+
+
 class AbstractExchange(AbstractProvider, ABC):
     """Abstract exchange class"""
     SOURCE_PREFIX = 'source'
+    ASYNC_TASKS_LIMIT: int = 32  # Concurrent requests of async methods
+    RATE_LIMIT: float | None = None  # Requests per second, None - only concurrency is adapted to throttling
+    RATE_BURST: int | None = None  # Requests over rate limit which exchange allows at once
+    cache: Cache | None = None  # Cache of exchange requests
 
     @abstractmethod
     def __init__(self, engine: DataEngine, exchange_code: str, api_url: str, http_params: dict | None = None, **kwargs):
         """"""
-        self.client = RequestClass(api_url, http_params)
+        self.rate_limiter: RateLimiter = RateLimiter(self.RATE_LIMIT, self.RATE_BURST,
+                                                     max_concurrency=self.ASYNC_TASKS_LIMIT)
+        self.client = RequestClass(api_url, http_params, self.rate_limiter)
+        self._http_params: dict | None = http_params
         super().__init__(exchange_code, **kwargs)
 
+    def get_async_client(self, http2: bool = False) -> AsyncRequestClass:
+        """New async client of exchange api with pool of ASYNC_TASKS_LIMIT connections, it is closed by caller.
+        Rate limiter is shared with sync client"""
+        limits = httpx.Limits(max_connections=self.ASYNC_TASKS_LIMIT, max_keepalive_connections=self.ASYNC_TASKS_LIMIT,
+                              keepalive_expiry=AsyncRequestClass.DEFAULT_LIMITS.keepalive_expiry)
+        return AsyncRequestClass(self.client.api_url, dict(self._http_params or {}), limits, http2, self.rate_limiter)
+
+    def cache_stats(self) -> dict[str, CacheStats]:
+        """Snapshot of requests cache counters by function, empty if exchange does not cache requests"""
+        return {} if self.cache is None else self.cache.stats()
+
     @abstractmethod
     def get_options_assets_books_snapshot(self, asset_codes: list[str] | str | None = None) -> pd.DataFrame:
         """Get symbols books snapshot"""
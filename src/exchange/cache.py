@@ -1,4 +1,9 @@
 from functools import wraps
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, replace
+import datetime
+import heapq
+import os
 import threading
 import time
 import sys
@@ -7,17 +12,112 @@ import psutil
 from copy import deepcopy
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+from pyarrow import feather
+from zoneinfo import ZoneInfo
+
+try:
+    import fcntl
+except ImportError:  # Not POSIX, processes sharing disk tier are not synchronized
+    fcntl = None
+
+
+class _InFlightCall:
+    """Call which result is waited by concurrent callers with the same key"""
+    __slots__ = ('done', 'result', 'error', 'owner')
+
+    def __init__(self):
+        self.owner: int = threading.get_ident()
+        self.done: threading.Event = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+    def wait(self):
+        """Result of call or raise its error"""
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    """Bookkeeping of cached data"""
+    create: float
+    update: float
+    expiry: float
+    data_type: str
+    namespace: str
+    key: int
+    size: int
+    requests: int
+
+    @property
+    def score(self) -> float:
+        """Efficiency of cached data, the least efficient data is evicted first"""
+        return self.requests / self.size if self.size else float('inf')
+
+
+@dataclass(slots=True)
+class CacheStats:
+    """Counters of decorated function"""
+    hits: int = 0  # Including callers which waited result of concurrent miss
+    misses: int = 0
+    disk_hits: int = 0  # Misses loaded from disk tier
+    ignored: int = 0  # Calls of keys which data is too big to be cached
+    expired: int = 0
+    evicted: int = 0  # Evicted by inefficiency when memory budget is exceeded
+    size: int = 0  # Bytes of cached data
+    compute_time: float = 0.  # Seconds of misses computation
+
+    @property
+    def hit_ratio(self) -> float:
+        """Part of cached calls served from cache"""
+        calls = self.hits + self.misses + self.disk_hits
+        return self.hits / calls if calls else 0.
+
+    @property
+    def saved_time(self) -> float:
+        """Estimated seconds of computation saved by hits"""
+        return self.hits * self.compute_time / self.misses if self.misses else 0.
 
 
 class Cache:
+    """
+    TTL cache with eviction by efficiency: requests per byte of cached data
+    Entries are kept in dict, hit only increments requests counter. Expiry and score heaps are lazy: outdated heap
+    items are skipped or pushed again with actual values when they are popped, so eviction is O(log n)
+    Namespace of data is data type (function name) or namespace of decorator. Namespaces with memory ratio have own
+    memory budget and are evicted separately, other namespaces share the rest of memory
+    Hits, misses, evictions and compute time are counted by data type, stats() returns snapshot of counters
+    In read only mode cached dataframes have read only arrays and hits return shallow copies without copy of data,
+    in place changes of values raise ValueError. By default hits return deep copies which can be changed
+    Misses are single flight: the first caller computes data and concurrent callers with the same key wait for its
+    result. Lock of bookkeeping is held only for dict and heaps operations
+    With new day TTL reset data expires at the start of next day in day_reset_tz instead of expiration timeout.
+    Data of persistent functions is also written to disk tier as arrow files with expiry in metadata, so it is
+    reloaded by misses after restart until it expires. Disk tier can be shared by processes of host: miss of
+    persistent data holds lock file of key, so data is computed by one process, and the rest read it by memory
+    mapping without copy of numeric columns
+    """
     EXPIRATION_DELTA_MINUTES = 30  # Cache storage timeout
     INVALIDATION_TIMES = 4  # Check INVALIDATION_TIMES per EXPIRATION_DELTA_MINUTES
-    LOCK_TIMEOUT_SEC = 1
     MAX_MEM_DF_RATIO = 25  # max files in dedicated max_cache_memory
+    SHARED_NAMESPACE = 'shared'  # Budget of namespaces without memory ratio
+    DISK_FILE_SUFFIX = '.arrow'
+    DISK_EXPIRY_METADATA = b'cache_expiry'
+    DISK_LOCK_SUFFIX = '.lock'
 
-    validate_df: pd.DataFrame
-    _lock_obj: threading.Lock
-    _lock_expiry: float
+    entries: dict[int, CacheEntry]
+    cached_size: int
+    namespace_memory_ratio: dict[str, float]
+    _budget_sizes: dict[str, int]
+    _namespace_sizes: dict[str, int]
+    _expiry_heap: list[tuple[float, int]]
+    _score_heaps: dict[str, list[tuple[float, int]]]
+    _lock_obj: threading.RLock
+    _in_flight: dict[int, _InFlightCall]
+    _stats: dict[str, CacheStats]
     cached_data: dict
     ignore_keys: dict  # Potentially there can be a lot of records - it will use memory and will slow cache
     expiry: float
@@ -25,32 +125,54 @@ class Cache:
     invalidate_timeout_sec: float
     max_cache_memory: int
     max_cached_df_size: int
+    day_reset_tz: ZoneInfo
+    disk_path: str | None
 
     def __init__(self, mem_size_limit_mb: int = 1_024, mem_ratio_percent_limit: int = 10,
-                 is_new_day_ttl_reset: bool = False):
-        self.validate_df: pd.DataFrame = pd.DataFrame(
-            {'create': np.ndarray((0,), dtype=float),
-             'update': np.ndarray((0,), dtype=float),
-             'expiry': np.ndarray((0,), dtype=float),
-             'data_type': np.ndarray((0,), dtype=str),
-             'key': np.ndarray((0,), dtype=int),
-             'size': np.ndarray((0,), dtype=int),
-             'requests': np.ndarray((0,), dtype=int),
-             }
-        )
-        self._is_new_day_ttl_reset = is_new_day_ttl_reset  # TODO not implemented
-        self._lock_obj: threading.Lock = threading.Lock()
+                 is_new_day_ttl_reset: bool = False, namespace_memory_ratio: dict[str, float] | None = None,
+                 read_only: bool = False, day_reset_tz: str = 'UTC', disk_path: str | None = None):
+        """namespace_memory_ratio - part of cache memory reserved for namespace, read_only and is_new_day_ttl_reset -
+        default modes of decorated functions, disk_path - folder of disk tier for persistent functions"""
+        namespace_memory_ratio = {} if namespace_memory_ratio is None else namespace_memory_ratio
+        if any(ratio <= 0 for ratio in namespace_memory_ratio.values()) or sum(namespace_memory_ratio.values()) > 1:
+            raise ValueError(f'Namespaces memory ratios should be positive with sum up to 1: {namespace_memory_ratio}')
+        if self.SHARED_NAMESPACE in namespace_memory_ratio:
+            raise ValueError(f'Namespace {self.SHARED_NAMESPACE} is reserved for shared memory budget')
+        self.namespace_memory_ratio: dict[str, float] = namespace_memory_ratio
+        self.read_only: bool = read_only
+        self.entries: dict[int, CacheEntry] = {}
+        self.cached_size: int = 0
+        self._budget_sizes: dict[str, int] = {}
+        self._namespace_sizes: dict[str, int] = {}
+        self._expiry_heap: list[tuple[float, int]] = []
+        self._score_heaps: dict[str, list[tuple[float, int]]] = {}
+        self._is_new_day_ttl_reset: bool = is_new_day_ttl_reset
+        self.day_reset_tz: ZoneInfo = ZoneInfo(day_reset_tz)
+        self._lock_obj: threading.RLock = threading.RLock()
+        self._in_flight: dict[int, _InFlightCall] = {}
+        self._stats: dict[str, CacheStats] = {}
         self.cached_data: dict = dict()
         self.ignore_keys: dict = dict()
         self.expiry_timeout_sec: float = self.EXPIRATION_DELTA_MINUTES * 60
         self.invalidate_timeout_sec: float = self.expiry_timeout_sec / self.INVALIDATION_TIMES
         self._set_expiry()
-        self._lock_expiry = time.time()
         self.max_cache_memory: int = int(
             min(mem_size_limit_mb * 1048576, self.get_total_memory() * mem_ratio_percent_limit / 100))
         self.max_cached_df_size: int = int(self.max_cache_memory / self.MAX_MEM_DF_RATIO)
+        self.disk_path: str | None = None
+        self.set_disk_tier(disk_path)
+
+    def it(self, func=None, *, namespace: str | None = None, read_only: bool | None = None,
+           is_new_day_ttl_reset: bool | None = None, persistent: bool = False):
+        """Cache decorator: @cache.it or @cache.it(namespace=NAME, read_only=True). Namespace can be shared between
+        functions, read_only and is_new_day_ttl_reset override modes of cache for function, data of persistent
+        function is kept in disk tier if it is set"""
+        if func is None:
+            return lambda decorated_func: self.it(decorated_func, namespace=namespace, read_only=read_only,
+                                                  is_new_day_ttl_reset=is_new_day_ttl_reset, persistent=persistent)
+        is_read_only = self.read_only if read_only is None else read_only
+        is_day_reset = self._is_new_day_ttl_reset if is_new_day_ttl_reset is None else is_new_day_ttl_reset
 
-    def it(self, func):
         @wraps(func)
         # @_develop_time_rec
         def wrapper(*args, **kwargs):
@@ -64,58 +186,232 @@ class Cache:
 
             data_type = func.__name__
             key = self._get_key(data_type, *(_norm_args(args, data_type)), **kwargs)
-            if key in self.ignore_keys:
-                df = func(*args, **kwargs)
-            else:
-                df = self._get_cache(key)
-                if df is None:
-                    df = func(*args, **kwargs)
-                    if df is not None:
-                        self._set_cache(df, key, data_type)
+            df = None if key in self.ignore_keys else self._get_cache(key)
+            if df is None:
+                df = self._single_flight(key, lambda: func(*args, **kwargs), data_type, namespace, is_read_only,
+                                         is_day_reset, persistent)
             if not isinstance(df, pd.DataFrame):
                 return deepcopy(df)
+            if is_read_only and self.is_read_only_df(df):
+                return df.copy(deep=False)  # Cached data is shared, but it can not be changed
             return df.copy(deep=True)
 
         return wrapper
 
     def _get_cache(self, key: int):
         self.invalidate_cache_by_expiry()
-        if self._is_missed(key):
-            return None
-        df = self._get_cached_data(key)
-        return df
+        with self._lock_obj:
+            if self._is_missed(key):
+                return None
+            return self._get_cached_data(key)
+
+    def _single_flight(self, key: int, call, data_type: str, namespace: str | None, read_only: bool,
+                       is_day_reset: bool = False, persistent: bool = False):
+        """Compute data once for concurrent misses of key, waiters get result or error of the first caller.
+        Persistent data is read from disk tier before computation"""
+        with self._lock_obj:
+            df = None if key in self.ignore_keys else self._get_cache(key)  # Data cached by just finished call
+            if df is not None:
+                return df
+            in_flight = self._in_flight.get(key)
+            is_leader = in_flight is None
+            if is_leader:
+                in_flight = self._in_flight[key] = _InFlightCall()
+            # Recursive call of owner is computed, other callers wait result
+            is_waiter = not is_leader and in_flight.owner != threading.get_ident()
+            stats = self._get_stats(data_type)
+            if is_waiter:
+                stats.hits += 1
+        if is_waiter:
+            return in_flight.wait()
+        if not is_leader:
+            return call()
+        try:
+            is_ignored = key in self.ignore_keys
+            persistent = persistent and not is_ignored and self.disk_path is not None
+            with self._lock_disk_key(key, data_type) if persistent else nullcontext():
+                disk_data = self._read_disk(key, data_type) if persistent else None
+                if disk_data is None:
+                    start_time = time.perf_counter()
+                    df = call()
+                    compute_time = time.perf_counter() - start_time
+                    expiry = self._get_expiry(time.time(), is_day_reset)
+                    with self._lock_obj:
+                        if is_ignored:
+                            stats.ignored += 1
+                        else:
+                            stats.misses += 1
+                            stats.compute_time += compute_time
+                else:
+                    df, expiry = disk_data
+                    with self._lock_obj:
+                        stats.disk_hits += 1
+                in_flight.result = df
+                if df is not None and self._set_cache(df, key, data_type, namespace, read_only, expiry,
+                                                      persistent=persistent and disk_data is None,
+                                                      is_copy=disk_data is not None) and read_only:
+                    in_flight.result = self.cached_data.get(key, df)  # Waiters share read only cached data
+            return df
+        except BaseException as err:
+            in_flight.error = err
+            raise
+        finally:
+            with self._lock_obj:
+                self._in_flight.pop(key, None)
+            in_flight.done.set()
+
+    def _get_stats(self, data_type: str) -> CacheStats:
+        stats = self._stats.get(data_type)
+        if stats is None:
+            stats = self._stats[data_type] = CacheStats()
+        return stats
+
+    def stats(self) -> dict[str, CacheStats]:
+        """Snapshot of counters by data type (decorated function name)"""
+        with self._lock_obj:
+            return {data_type: replace(stats) for data_type, stats in self._stats.items()}
 
     def _add_cache_ignore(self, key: int):
         self.ignore_keys[key] = True
 
-    def _set_cache(self, df: pd.DataFrame, key: int, data_type: str) -> bool:
+    def _get_budget(self, namespace: str) -> str:
+        return namespace if namespace in self.namespace_memory_ratio else self.SHARED_NAMESPACE
+
+    def get_budget_memory(self, namespace: str) -> int:
+        """Memory limit for namespace, shared budget for namespaces without memory ratio"""
+        budget = self._get_budget(namespace)
+        if budget == self.SHARED_NAMESPACE:
+            return int(self.max_cache_memory * (1 - sum(self.namespace_memory_ratio.values())))
+        return int(self.max_cache_memory * self.namespace_memory_ratio[budget])
+
+    def get_memory_usage(self) -> dict[str, int]:
+        """Bytes of cached data by namespaces"""
+        return {namespace: size for namespace, size in self._namespace_sizes.items() if size}
+
+    def _get_expiry(self, cur_time: float, is_day_reset: bool = False) -> float:
+        """Expiry by timeout or the start of next day in day_reset_tz"""
+        if not is_day_reset:
+            return cur_time + self.expiry_timeout_sec
+        next_date = datetime.datetime.fromtimestamp(cur_time, self.day_reset_tz).date() + datetime.timedelta(days=1)
+        return datetime.datetime.combine(next_date, datetime.time(), tzinfo=self.day_reset_tz).timestamp()
+
+    def _set_cache(self, df: pd.DataFrame, key: int, data_type: str, namespace: str | None = None,
+                   read_only: bool = False, expiry: float | None = None, persistent: bool = False,
+                   is_copy: bool = False) -> bool:
+        """Cache data with expiry (by timeout if it is None), persistent data is written to disk tier.
+        Data which is copy not referenced by caller is cached without copy"""
         res_value = False
         if key in self.ignore_keys:
             return res_value
-        if not isinstance(df, pd.DataFrame) or not isinstance(self.validate_df, pd.DataFrame) or \
-            not isinstance(self.cached_data, dict):
+        if not isinstance(df, pd.DataFrame) or not isinstance(self.cached_data, dict):
             return res_value
-        cur_time = time.time()
         try:
-            self._lock()
-            size = self.get_df_memory_usage(df)
-            if size > self.max_cached_df_size:
+            namespace = data_type if namespace is None else namespace
+            budget = self._get_budget(namespace)
+            size = self.get_df_memory_usage(df)  # Measured once, bookkeeping use running totals
+            if size > min(self.max_cached_df_size, self.get_budget_memory(namespace)):
                 self._add_cache_ignore(key)
+                return res_value
+            if is_copy:
+                cached_df = self.to_read_only_df(df, copy=False) if read_only else df
             else:
-                ttl = cur_time + self.expiry_timeout_sec
-                # if self._is_new_day_ttl_reset:
-                #     ttl = ttl # round to days
-                self.validate_df.loc[key, self.validate_df.columns] = [cur_time, cur_time, ttl,
-                                                                       data_type, key, size, 1]
-                self._inefficiency_invalidation()
-                if key in self.validate_df.index:
-                    self.cached_data[key] = df.copy(deep=True)
+                cached_df = self.to_read_only_df(df) if read_only else df.copy(deep=True)  # Copy out of lock
+            with self._lock_obj:
+                cur_time = time.time()
+                ttl = self._get_expiry(cur_time) if expiry is None else expiry
+                self._del_cache_keys([key])
+                entry = CacheEntry(cur_time, cur_time, ttl, data_type, namespace, key, size, 1)
+                self.entries[key] = entry
+                self._add_size(entry, size)
+                heapq.heappush(self._expiry_heap, (entry.expiry, key))
+                heapq.heappush(self._score_heaps.setdefault(budget, []), (entry.score, key))
+                self._inefficiency_invalidation(budget)
+                if key in self.entries:
+                    self.cached_data[key] = cached_df
                     res_value = True
+            if persistent and self.disk_path is not None:
+                self._write_disk(df, key, data_type, ttl)
         except Exception as err:
             print('[ERROR] set cache:', err, file=sys.stderr)
-        self._unlock()
         return res_value
 
+    def set_disk_tier(self, disk_path: str | None) -> None:
+        """Set folder of disk tier for data of persistent functions and remove expired files, None disables it"""
+        if disk_path is not None:
+            os.makedirs(disk_path, exist_ok=True)
+            cur_time = time.time()
+            for file_name in os.listdir(disk_path):
+                fn = os.path.join(disk_path, file_name)
+                if file_name.endswith(self.DISK_FILE_SUFFIX) and self._get_disk_expiry(fn) <= cur_time:
+                    self._remove_disk_file(fn)
+        self.disk_path = disk_path
+
+    def _get_disk_fn(self, key: int, data_type: str) -> str:
+        return os.path.join(self.disk_path, f'{data_type}_{key}{self.DISK_FILE_SUFFIX}')
+
+    @contextmanager
+    def _lock_disk_key(self, key: int, data_type: str):
+        """Exclusive lock of key between processes sharing disk tier. Lock files are not removed, otherwise
+        processes could lock different files of the same key"""
+        if fcntl is None:
+            yield
+            return
+        with open(self._get_disk_fn(key, data_type) + self.DISK_LOCK_SUFFIX, 'a', encoding='utf-8') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @classmethod
+    def _get_disk_expiry(cls, fn: str) -> float:
+        """Expiry from metadata of disk file, 0 if file can not be read"""
+        try:
+            with pa.OSFile(fn) as file:
+                metadata = pa.ipc.open_file(file).schema.metadata or {}
+            return float(metadata.get(cls.DISK_EXPIRY_METADATA, 0))
+        except (OSError, ValueError, pa.ArrowException):
+            return 0
+
+    @staticmethod
+    def _remove_disk_file(fn: str) -> None:
+        try:
+            os.remove(fn)
+        except FileNotFoundError:
+            pass
+
+    def _write_disk(self, df: pd.DataFrame, key: int, data_type: str, expiry: float) -> None:
+        """Write data with expiry to disk tier atomically, data which arrow can not convert is not persisted"""
+        fn = self._get_disk_fn(key, data_type)
+        tmp_fn = f'{fn}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            table = pa.Table.from_pandas(df)
+            metadata = {**(table.schema.metadata or {}), self.DISK_EXPIRY_METADATA: repr(expiry).encode()}
+            feather.write_feather(table.replace_schema_metadata(metadata), tmp_fn, compression='uncompressed')
+            os.replace(tmp_fn, fn)
+        except (OSError, pa.ArrowException) as err:
+            print('[WARNING] cache disk write:', err, file=sys.stderr)
+            self._remove_disk_file(tmp_fn)
+
+    def _read_disk(self, key: int, data_type: str) -> tuple[pd.DataFrame, float] | None:
+        """Data and expiry from disk tier, None if there is no actual data. File is memory mapped, numeric columns
+        are read only views of mapped pages shared with other processes"""
+        if self.disk_path is None:
+            return None
+        fn = self._get_disk_fn(key, data_type)
+        if not os.path.exists(fn):
+            return None
+        try:
+            table = feather.read_table(fn, memory_map=True)
+            expiry = float((table.schema.metadata or {}).get(self.DISK_EXPIRY_METADATA, 0))
+        except (OSError, ValueError, pa.ArrowException) as err:
+            print('[WARNING] cache disk read:', err, file=sys.stderr)
+            expiry = 0
+        if expiry <= time.time():
+            self._remove_disk_file(fn)
+            return None
+        return table.to_pandas(split_blocks=True), expiry  # Blocks are not consolidated by copy
+
     @staticmethod
     def _get_key(data_type, *args, **kwargs) -> int:
         if kwargs:
@@ -129,70 +425,132 @@ class Cache:
     def _get_cached_data(self, key: int) -> pd.DataFrame | None:
         df = self.cached_data.get(key)
         if df is not None:
-            try:
-                self.validate_df.loc[key, 'requests'] += 1
-            except:
-                pass
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry.requests += 1  # Score heap item is updated lazily on eviction
+                self._get_stats(entry.data_type).hits += 1
         return df
 
     def _set_expiry(self) -> None:
         self.expiry = time.time() + self.invalidate_timeout_sec
 
-    def _lock(self):
-        self._lock_obj.acquire(blocking=True, timeout=self.LOCK_TIMEOUT_SEC)
-
-    def _unlock(self):
-        try:
-            if self._lock_obj.locked():
-                self._lock_obj.release()  # Possible situation, when block was auto-release and blocked again - it will release not self block
-        except:
-            pass
-
     def invalidate_cache_by_expiry(self):
         cur_time = time.time()
         if self.expiry > cur_time:
             return True
-        try:
-            self._lock()
+        with self._lock_obj:
             self._set_expiry()
             self._invalidation()
-        except:
-            pass
-        self._unlock()
 
     def _invalidation(self):
         cur_time = time.time()
-        expired_df = self.validate_df[self.validate_df['expiry'] < cur_time]
-        if not expired_df.empty:
-            idxs = set(expired_df.index)
-            del expired_df
-            self._del_cache_keys(idxs)
-
-    def _inefficiency_invalidation(self):
-        score_df = self.validate_df.assign(_score=lambda x: x['requests'] / x['size']) \
-            .sort_values(by=['_score'], ascending=False) \
-            .assign(_cumsum=lambda x: x['size'].cumsum())
-        inefficiency_df = score_df[score_df['_cumsum'] > self.max_cache_memory]
-        if not inefficiency_df.empty:
-            idxs = set(inefficiency_df.index)
-            del inefficiency_df
-            self._del_cache_keys(idxs)
+        while self._expiry_heap and self._expiry_heap[0][0] < cur_time:
+            expiry, key = heapq.heappop(self._expiry_heap)
+            entry = self.entries.get(key)
+            if entry is not None and entry.expiry == expiry:  # Otherwise item of removed or replaced entry
+                self._get_stats(entry.data_type).expired += 1
+                self._del_cache_keys([key])
+        self._compact_heaps()
+
+    def _inefficiency_invalidation(self, budget: str):
+        """Evict the least efficient data of budget while its size exceeds budget memory"""
+        score_heap = self._score_heaps.get(budget, [])
+        max_memory = self.get_budget_memory(budget)
+        while self._budget_sizes.get(budget, 0) > max_memory and score_heap:
+            score, key = heapq.heappop(score_heap)
+            entry = self.entries.get(key)
+            if entry is None:
+                continue
+            if entry.score != score:  # Requests were added after item was pushed
+                heapq.heappush(score_heap, (entry.score, key))
+                continue
+            self._get_stats(entry.data_type).evicted += 1
+            self._del_cache_keys([key])
+        self._compact_heaps()
+
+    def _compact_heaps(self):
+        """Rebuild heaps when outdated items are majority, so heaps size is limited by number of entries"""
+        if len(self._expiry_heap) > 2 * len(self.entries) + 64:
+            self._expiry_heap = [(entry.expiry, key) for key, entry in self.entries.items()]
+            heapq.heapify(self._expiry_heap)
+        if sum(len(score_heap) for score_heap in self._score_heaps.values()) > 2 * len(self.entries) + 64:
+            self._score_heaps = {}
+            for key, entry in self.entries.items():
+                self._score_heaps.setdefault(self._get_budget(entry.namespace), []).append((entry.score, key))
+            for score_heap in self._score_heaps.values():
+                heapq.heapify(score_heap)
+
+    def _add_size(self, entry: CacheEntry, size: int):
+        self.cached_size += size
+        budget = self._get_budget(entry.namespace)
+        self._budget_sizes[budget] = self._budget_sizes.get(budget, 0) + size
+        self._namespace_sizes[entry.namespace] = self._namespace_sizes.get(entry.namespace, 0) + size
+        self._get_stats(entry.data_type).size += size
 
     def _del_cache_keys(self, keys):
-        self.validate_df.drop(keys, axis='index', inplace=True)
         for key in keys:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self._add_size(entry, -entry.size)
             if key in self.cached_data:
                 del self.cached_data[key]
 
     def _is_missed(self, key: int) -> bool:
-        if key in self.validate_df.index and key in self.cached_data:
+        if key in self.entries and key in self.cached_data:
             return False
         return True
 
+    @property
+    def validate_df(self) -> pd.DataFrame:
+        """Bookkeeping of cached data as dataframe indexed by key"""
+        return pd.DataFrame(
+            [(entry.create, entry.update, entry.expiry, entry.data_type, entry.namespace, entry.key, entry.size,
+              entry.requests) for entry in self.entries.values()],
+            columns=['create', 'update', 'expiry', 'data_type', 'namespace', 'key', 'size', 'requests'],
+            index=pd.Index(list(self.entries), dtype=int),
+        )
+
+    @staticmethod
+    def _get_df_arrays(df: pd.DataFrame) -> list[np.ndarray] | None:
+        """Numpy arrays with data of dataframe, None if some column data is not numpy arrays"""
+        arrays = []
+        for block in df._mgr.blocks:  # pylint: disable=protected-access
+            values = block.values
+            if isinstance(values, np.ndarray):
+                arrays.append(values)
+                continue
+            # Extension arrays backed by numpy: datetime with timezone, categorical codes, nullable masked arrays
+            values_arrays = [getattr(values, attr) for attr in ['_ndarray', '_data', '_mask']
+                             if isinstance(getattr(values, attr, None), np.ndarray)]
+            if not values_arrays:
+                return None
+            arrays.extend(values_arrays)
+        return arrays
+
+    @classmethod
+    def to_read_only_df(cls, df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
+        """Deep copy of dataframe with read only arrays, without copy arrays of dataframe are made read only.
+        If some column can not be read only, it is just copy"""
+        df = df.copy(deep=True) if copy else df
+        arrays = cls._get_df_arrays(df)
+        for array in arrays or []:
+            array.flags.writeable = False
+        return df
+
+    @classmethod
+    def is_read_only_df(cls, df: pd.DataFrame) -> bool:
+        """All data arrays of dataframe are read only"""
+        arrays = cls._get_df_arrays(df)
+        return arrays is not None and not any(array.flags.writeable for array in arrays)
+
     @staticmethod
-    def get_df_memory_usage(df):
-        mem_usage = sys.getsizeof(df)
-        return mem_usage
+    def get_df_memory_usage(df) -> int:
+        """Bytes of data including python objects of object columns"""
+        if isinstance(df, pd.DataFrame):
+            return int(df.memory_usage(index=True, deep=True).sum())
+        if isinstance(df, (pa.Table, pa.RecordBatch)):
+            return df.nbytes
+        return sys.getsizeof(df)
 
     @staticmethod
     def get_total_memory():
@@ -1,8 +1,10 @@
 """
 Deribit api provider
 """
+import asyncio
 import datetime
 import re
+import time
 import pandas as pd
 import concurrent
 from concurrent.futures import ThreadPoolExecutor
@@ -16,7 +18,8 @@ from options_lib.dictionary import (
 from options_lib.normalization.datetime_conversion import df_columns_to_timestamp
 from options_lib.normalization import parse_expiration_date, normalize_timestamp, fill_option_price
 from exchange.exchange_entities import ExchangeCode
-from exchange._abstract_exchange import AbstractExchange, RequestClass
+from exchange._abstract_exchange import AbstractExchange, RequestClass, AsyncRequestClass
+from exchange.deribit_stream import DeribitStream
 from provider import DataEngine, RequestParameters
 
 
@@ -36,7 +39,8 @@ COLUMNS_TO_CURRENCY = [OCl.ASK.nm, OCl.BID.nm, OCl.LAST.nm, OCl.HIGH_24.nm, OCl.
 class DeribitMarket:
     """Deribit Market data api"""
 
-    def __init__(self, client: RequestClass):
+    def __init__(self, client: RequestClass | AsyncRequestClass):
+        """Methods with a prefix are coroutines, they require AsyncRequestClass client"""
         self.client = client
 
     def get_instruments(self) -> pd.DataFrame:
@@ -160,15 +164,41 @@ class DeribitMarket:
 1489                        NaT               NaN   0.000            0.000        0.00
 
         """
-        params = {'currency': currency}
-        if kind is not None:
-            params['kind'] = kind.value
         request_timestamp = pd.Timestamp.now(tz=datetime.UTC)
-        response = self.client.request_api('/public/get_book_summary_by_currency', params=params)
+        book_summary_df = self.request_book_summary(currency, kind)
+        book_summary_df = self._normalize_book(book_summary_df, request_timestamp)
+        return book_summary_df
+
+    def request_book_summary(self, currency: str, kind: DeribitAssetKind | None = None) -> pd.DataFrame:
+        """Book summary by currency, not normalized like in stream state"""
+        response = self.client.request_api('/public/get_book_summary_by_currency',
+                                           params=self._get_book_summary_params(currency, kind))
+        return pd.DataFrame(response['result'])
+
+    async def aget_book_summary_by_currency(self, currency: str,
+                                            kind: DeribitAssetKind | None = None) -> pd.DataFrame:
+        """Async get_book_summary_by_currency"""
+        request_timestamp = pd.Timestamp.now(tz=datetime.UTC)
+        response = await self.client.request_api('/public/get_book_summary_by_currency',
+                                                 params=self._get_book_summary_params(currency, kind))
         book_summary_df = pd.DataFrame(response['result'])
         book_summary_df = self._normalize_book(book_summary_df, request_timestamp)
         return book_summary_df
 
+    def get_stream_book_summary(self, stream: DeribitStream, currencies: list[str] | None = None) -> pd.DataFrame:
+        """get_book_summary_by_currency for currencies from latest state of websocket stream, without requests"""
+        request_timestamp = pd.Timestamp.now(tz=datetime.UTC)
+        book_summary_df = stream.get_book_summary(currencies)
+        book_summary_df = self._normalize_book(book_summary_df, request_timestamp)
+        return book_summary_df
+
+    @staticmethod
+    def _get_book_summary_params(currency: str, kind: DeribitAssetKind | None = None) -> dict:
+        params = {'currency': currency}
+        if kind is not None:
+            params['kind'] = kind.value
+        return params
+
     @staticmethod
     def _kind_enrichment(row: pd.Series) -> pd.Series:
         try:
@@ -281,12 +311,41 @@ class DeribitExchange(AbstractExchange):
     TEST_API_URL: str = 'https://test.deribit.com/api/v2'
     CURRENCIES: list[str] = ['BTC', 'ETH', 'USDC', 'USDT', 'EURR']
     TASKS_LIMIT: int = 4
+    RATE_LIMIT: float = 20.  # Non matching engine requests credits refill, https://docs.deribit.com/#rate-limits
+    RATE_BURST: int = 100
+    INSTRUMENTS_REFRESH_SEC: int = 3_600  # Subscriptions of stream are updated by new and expired instruments
 
     def __init__(self, engine: DataEngine = DataEngine.PANDAS, api_url: str | None = None):
         """Init"""
         api_url = api_url if api_url else self.PRODUCT_API_URL
         super().__init__(engine, ExchangeCode.DERIBIT.name, api_url=api_url)
         self.market = DeribitMarket(self.client)
+        self.stream: DeribitStream | None = None
+
+    def start_stream(self, ws_url: str | None = None, timeout: float | None = 30.) -> bool:
+        """Subscribe tickers of all instruments by websocket, books snapshots are made from stream state instead of
+        book summary requests while stream is connected. Return if stream is connected in timeout"""
+        if self.stream is None:
+            self.stream = DeribitStream(self.market.get_instruments(), ws_url=ws_url,
+                                        book_summary_fn=self._get_stream_seed)
+        return self.stream.start(timeout)
+
+    def _get_stream_seed(self) -> pd.DataFrame:
+        """Book summary of all currencies for stream state, so snapshots are complete from connection"""
+        return pd.concat([self.market.request_book_summary(currency) for currency in self.CURRENCIES],
+                         ignore_index=True)
+
+    def stop_stream(self) -> None:
+        """Stop websocket stream, books snapshots are requested again"""
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+    def _get_stream_books_snapshot(self, asset_codes: list[str]) -> pd.DataFrame:
+        """Books snapshot from latest state of stream"""
+        if time.time() - self.stream.instruments_time > self.INSTRUMENTS_REFRESH_SEC:
+            self.stream.set_instruments(self.market.get_instruments())
+        return self.market.get_stream_book_summary(self.stream, asset_codes)
 
     def get_assets_list(self, asset_kind: AssetKind) -> list[str]:
         """
@@ -356,7 +415,9 @@ class DeribitExchange(AbstractExchange):
             asset_codes = self.CURRENCIES
         elif isinstance(asset_codes, str):
             asset_codes = [asset_codes]
-        if len(asset_codes) == 1:
+        if self.stream is not None and self.stream.is_connected:
+            book_summary_df = self._get_stream_books_snapshot(asset_codes)
+        elif len(asset_codes) == 1:
             book_summary_df = self.market.get_book_summary_by_currency(currency=asset_codes[0])
         else:
             books = []
@@ -373,6 +434,21 @@ class DeribitExchange(AbstractExchange):
             book_summary_df = pd.concat(books, ignore_index=True) if len(books) > 1 else books[0]
         return book_summary_df
 
+    async def aget_options_assets_books_snapshot(self, asset_codes: list[str] | str | None = None,
+                                                 client: AsyncRequestClass | None = None) -> pd.DataFrame:
+        """Async get_options_assets_books_snapshot, currencies are requested concurrently. Without client new one
+        is created for the call"""
+        if client is None:
+            async with self.get_async_client() as client:
+                return await self.aget_options_assets_books_snapshot(asset_codes, client)
+        if asset_codes is None:
+            asset_codes = self.CURRENCIES
+        elif isinstance(asset_codes, str):
+            asset_codes = [asset_codes]
+        market = DeribitMarket(client)
+        books = await asyncio.gather(*(market.aget_book_summary_by_currency(currency) for currency in asset_codes))
+        return pd.concat(books, ignore_index=True) if len(books) > 1 else books[0]
+
     def load_option_history(self, symbol: str, params: RequestParameters | None = None,
                             columns: list | None = None) -> pd.DataFrame:
         """load options history."""
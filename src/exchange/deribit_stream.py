@@ -0,0 +1,277 @@
+"""
+Deribit websocket stream
+Ticker channels of instruments are subscribed by JSON-RPC over websocket, latest values of instruments are kept in
+columnar table: numpy column per field and row per instrument updated in place. State is seeded by book summary on
+connection, so instruments without notifications yet are present. Book summary snapshot is made from local state
+without requests, columns are the same as in public/get_book_summary_by_currency response
+https://docs.deribit.com/#ticker-instrument_name-interval
+"""
+import asyncio
+import itertools
+import json
+import sys
+import threading
+import time
+from typing import Callable
+import numpy as np
+import pandas as pd
+
+try:
+    from websockets.asyncio.client import connect as ws_connect
+    from websockets.exceptions import ConnectionClosed
+except ImportError:
+    ws_connect = None
+    ConnectionClosed = None
+
+# Ticker fields to book summary columns
+TICKER_COLUMNS = {
+    'timestamp': 'creation_timestamp',
+    'best_bid_price': 'bid_price',
+    'best_ask_price': 'ask_price',
+    'last_price': 'last',
+    'mark_price': 'mark_price',
+    'mark_iv': 'mark_iv',
+    'underlying_price': 'underlying_price',
+    'open_interest': 'open_interest',
+    'estimated_delivery_price': 'estimated_delivery_price',
+    'interest_rate': 'interest_rate',
+    'current_funding': 'current_funding',
+    'funding_8h': 'funding_8h',
+}
+TICKER_STATS_COLUMNS = {'high': 'high', 'low': 'low', 'volume': 'volume', 'volume_usd': 'volume_usd',
+                        'price_change': 'price_change'}
+TICKER_OBJECT_COLUMNS = {'underlying_index': 'underlying_index'}
+INSTRUMENT_COLUMNS = ['instrument_name', 'base_currency', 'quote_currency', 'settlement_currency']
+
+
+class LatestStateTable:
+    """Latest values of instruments in numpy columns, row of instrument is updated in place"""
+    INITIAL_CAPACITY: int = 1_024
+
+    def __init__(self, numeric_columns: list[str], object_columns: list[str] | None = None):
+        self.numeric_columns: list[str] = numeric_columns
+        self.object_columns: list[str] = [] if object_columns is None else object_columns
+        self.rows: dict[str, int] = {}
+        self._instruments: np.ndarray = np.empty(self.INITIAL_CAPACITY, dtype=object)
+        self._active: np.ndarray = np.zeros(self.INITIAL_CAPACITY, dtype=bool)
+        self._columns: dict[str, np.ndarray] = {column: np.full(self.INITIAL_CAPACITY, np.nan)
+                                                for column in self.numeric_columns}
+        self._columns.update({column: np.full(self.INITIAL_CAPACITY, None, dtype=object)
+                              for column in self.object_columns})
+        self._lock: threading.Lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return int(self._active[:len(self.rows)].sum())
+
+    def _get_row(self, instrument: str) -> int:
+        row = self.rows.get(instrument)
+        if row is not None:
+            return row
+        row = len(self.rows)
+        if row == len(self._instruments):  # Capacity is doubled, so appends are amortized O(1)
+            self._instruments = np.concatenate([self._instruments, np.empty(row, dtype=object)])
+            self._active = np.concatenate([self._active, np.zeros(row, dtype=bool)])
+            for column, values in self._columns.items():
+                self._columns[column] = np.concatenate([values, np.full(row, np.nan if values.dtype != object
+                                                                         else None, dtype=values.dtype)])
+        self.rows[instrument] = row
+        self._instruments[row] = instrument
+        return row
+
+    def update(self, instrument: str, values: dict) -> None:
+        """Set values of instrument columns, other columns keep previous values"""
+        with self._lock:
+            row = self._get_row(instrument)
+            self._active[row] = True
+            for column, value in values.items():
+                self._columns[column][row] = np.nan if value is None and column in self.numeric_columns else value
+
+    def remove(self, instruments: list[str]) -> None:
+        """Exclude instruments from snapshots until they are updated"""
+        with self._lock:
+            for instrument in instruments:
+                row = self.rows.get(instrument)
+                if row is not None:
+                    self._active[row] = False
+
+    def to_frame(self, index_name: str = 'instrument_name') -> pd.DataFrame:
+        """Copy of active rows"""
+        with self._lock:
+            rows = np.flatnonzero(self._active[:len(self.rows)])
+            data = {index_name: self._instruments[rows]}
+            data.update({column: values[rows] for column, values in self._columns.items()})
+        return pd.DataFrame(data)
+
+
+class DeribitStream:
+    """Latest state of Deribit instruments by websocket ticker subscriptions. Stream runs as coroutine or in
+    background thread by start, it is reconnected with subscription of instruments after errors"""
+    PRODUCT_WS_URL: str = 'wss://www.deribit.com/ws/api/v2'
+    TEST_WS_URL: str = 'wss://test.deribit.com/ws/api/v2'
+    TICKER_INTERVAL: str = 'agg2'  # Aggregated notifications, 100ms and raw intervals require authorization
+    SUBSCRIBE_BATCH: int = 500  # Channels in subscribe request
+    HEARTBEAT_SEC: int = 30
+    RECONNECT_DELAY_SEC: float = 1.
+
+    def __init__(self, instruments_df: pd.DataFrame, ws_url: str | None = None,
+                 book_summary_fn: Callable[[], pd.DataFrame] | None = None):
+        """instruments_df - instruments to subscribe with instrument_name, base_currency, quote_currency and
+        settlement_currency (quote_currency if it is absent, like for spot), book_summary_fn - book summary of
+        instruments not normalized, state is seeded by it on every connection before subscription"""
+        if ws_connect is None:
+            raise ImportError('Websockets is not installed, install it by: poetry install --with websocket')
+        self.ws_url: str = ws_url if ws_url else self.PRODUCT_WS_URL
+        self.table: LatestStateTable = LatestStateTable(
+            list(TICKER_COLUMNS.values()) + list(TICKER_STATS_COLUMNS.values()), list(TICKER_OBJECT_COLUMNS.values()))
+        self.instruments_df: pd.DataFrame = self._get_instruments(instruments_df)
+        self.instruments_time: float = time.time()
+        self.book_summary_fn: Callable[[], pd.DataFrame] | None = book_summary_fn
+        self.messages: int = 0
+        self._request_ids = itertools.count(1)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._websocket = None
+        self._stop_event: asyncio.Event | None = None
+        self._thread: threading.Thread | None = None
+        self._connected: threading.Event = threading.Event()
+
+    @staticmethod
+    def _get_instruments(instruments_df: pd.DataFrame) -> pd.DataFrame:
+        """Instrument columns, book summary of Deribit is grouped by settlement currency, it is quote currency for
+        spot instruments"""
+        instruments_df = instruments_df.drop_duplicates('instrument_name')
+        settlement_currency = instruments_df['settlement_currency'] if 'settlement_currency' in instruments_df \
+            else pd.Series(None, index=instruments_df.index, dtype=object)
+        return instruments_df.assign(settlement_currency=settlement_currency.fillna(instruments_df['quote_currency'])
+                                     )[INSTRUMENT_COLUMNS]
+
+    def get_channels(self, instruments: list[str]) -> list[str]:
+        """Ticker channels of instruments"""
+        return [f'ticker.{instrument}.{self.TICKER_INTERVAL}' for instrument in instruments]
+
+    async def _send(self, websocket, method: str, params: dict) -> None:
+        await websocket.send(json.dumps({'jsonrpc': '2.0', 'id': next(self._request_ids), 'method': method,
+                                         'params': params}))
+
+    async def _subscribe(self, websocket, instruments: list[str]) -> None:
+        channels = self.get_channels(instruments)
+        for start in range(0, len(channels), self.SUBSCRIBE_BATCH):
+            await self._send(websocket, 'public/subscribe', {'channels': channels[start:start + self.SUBSCRIBE_BATCH]})
+
+    async def _handle_message(self, websocket, message: str | bytes) -> None:
+        response = json.loads(message)
+        method = response.get('method')
+        if method == 'subscription':
+            self.messages += 1
+            self.update_ticker(response['params']['data'])
+        elif method == 'heartbeat' and response['params'].get('type') == 'test_request':
+            await self._send(websocket, 'public/test', {})
+        elif 'error' in response:
+            print('[ERROR] deribit stream:', response['error'], file=sys.stderr)
+
+    def update_ticker(self, data: dict) -> None:
+        """Update instrument state by ticker notification"""
+        values = {column: data[field] for field, column in TICKER_COLUMNS.items() if field in data}
+        values.update({column: data['stats'][field] for field, column in TICKER_STATS_COLUMNS.items()
+                       if field in data.get('stats', {})})
+        values.update({column: data[field] for field, column in TICKER_OBJECT_COLUMNS.items() if field in data})
+        self.table.update(data['instrument_name'], values)
+
+    def seed(self, book_summary_df: pd.DataFrame) -> None:
+        """Set state of instruments by book summary, so snapshots have instruments without notifications yet"""
+        columns = [column for column in self.table.numeric_columns + self.table.object_columns
+                   if column in book_summary_df.columns]
+        instruments = self.instruments_df['instrument_name']
+        book_summary_df = book_summary_df[book_summary_df['instrument_name'].isin(instruments)]
+        for instrument, values in zip(book_summary_df['instrument_name'],
+                                      book_summary_df[columns].to_dict('records')):
+            self.table.update(instrument, values)
+
+    async def _seed(self) -> None:
+        if self.book_summary_fn is None:
+            return
+        try:
+            book_summary_df = await asyncio.to_thread(self.book_summary_fn)
+        except Exception as err:
+            raise ConnectionError(f'book summary seed failed: {err}') from err
+        self.seed(book_summary_df)
+
+    async def run(self) -> None:
+        """Subscribe instruments and consume notifications until stop"""
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        while not self._stop_event.is_set():
+            try:
+                async with ws_connect(self.ws_url, max_size=None) as websocket:
+                    self._websocket = websocket
+                    await self._seed()  # Notifications after subscription are newer than book summary
+                    await self._send(websocket, 'public/set_heartbeat', {'interval': self.HEARTBEAT_SEC})
+                    await self._subscribe(websocket, list(self.instruments_df['instrument_name']))
+                    self._connected.set()
+                    async for message in websocket:
+                        try:
+                            await self._handle_message(websocket, message)
+                        except (KeyError, TypeError, ValueError) as err:  # Stream is not stopped by bad message
+                            print('[ERROR] deribit stream message:', repr(err), file=sys.stderr)
+            except (OSError, ConnectionClosed) as err:
+                print('[WARNING] deribit stream reconnect:', err, file=sys.stderr)
+            finally:
+                self._websocket = None
+                self._connected.clear()
+            if not self._stop_event.is_set():
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), self.RECONNECT_DELAY_SEC)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def stop(self) -> None:
+        """Stop stream running in event loop"""
+        if self._stop_event is not None:
+            self._stop_event.set()
+        if self._websocket is not None:
+            await self._websocket.close()
+
+    def start(self, timeout: float | None = None) -> bool:
+        """Run stream in background thread, wait up to timeout for subscription, return if stream is connected"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=asyncio.run, args=(self.run(),), name='deribit_stream',
+                                            daemon=True)
+            self._thread.start()
+        return self._connected.wait(timeout)
+
+    def close(self, timeout: float | None = None) -> None:
+        """Stop background thread of stream"""
+        if self._thread is None or self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result(timeout)
+        self._thread.join(timeout)
+        self._thread = None
+
+    @property
+    def is_connected(self) -> bool:
+        """Stream state is seeded, instruments are subscribed and notifications are received"""
+        return self._connected.is_set()
+
+    def set_instruments(self, instruments_df: pd.DataFrame) -> None:
+        """Subscribe new instruments, removed instruments are excluded from snapshots"""
+        instruments_df = self._get_instruments(instruments_df)
+        instruments = set(instruments_df['instrument_name'])
+        previous_instruments = set(self.instruments_df['instrument_name'])
+        self.instruments_df = instruments_df
+        self.instruments_time = time.time()
+        self.table.remove(list(previous_instruments - instruments))
+        new_instruments = sorted(instruments - previous_instruments)
+        websocket, loop = self._websocket, self._loop
+        if new_instruments and websocket is not None and loop is not None:
+            asyncio.run_coroutine_threadsafe(self._subscribe(websocket, new_instruments), loop)
+
+    def get_book_summary(self, currencies: list[str] | None = None) -> pd.DataFrame:
+        """Book summary of instruments with settlement currencies from latest state like get_book_summary_by_currency,
+        not normalized"""
+        book_summary_df = self.table.to_frame().merge(self.instruments_df, on='instrument_name', how='inner')
+        if currencies is not None:
+            book_summary_df = book_summary_df[book_summary_df['settlement_currency'].isin(currencies)] \
+                .reset_index(drop=True)
+        book_summary_df = book_summary_df.drop(columns='settlement_currency')
+        book_summary_df['mid_price'] = (book_summary_df['bid_price'] + book_summary_df['ask_price']) / 2
+        book_summary_df['creation_timestamp'] = book_summary_df['creation_timestamp'].astype('Int64')
+        return book_summary_df
@@ -31,6 +31,12 @@ class RequestException(Exception):
         return f'DeribitRequestException: {self.message}'
 
 
+class IncompleteDataException(Exception):
+    """Part of requests failed, received data is not complete and should not be cached"""
+    def __init__(self, message, data):
+        super().__init__(message)
+        self.data = data
+
 
 class NotImplementedException(NotImplementedError):
     """Method not implemented Error"""
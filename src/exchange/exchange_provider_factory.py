@@ -5,20 +5,20 @@ from typing import Dict, Type
 from functools import partial
 from provider import DataEngine, DataSource
 from provider import AbstractProvider
-from provider import PandasLocalFileProvider
+from provider import PandasLocalFileProvider, PolarsLocalFileProvider, DaskLocalFileProvider, PandasS3FileProvider
 from exchange.exchange_fabric import get_exchange
 
 
 _PROVIDERS: Dict[DataSource, Dict[DataEngine, Type[AbstractProvider]]] = {
     DataSource.LOCAL: {
         DataEngine.PANDAS: PandasLocalFileProvider,
-        DataEngine.POLARIS: AbstractProvider,
-        DataEngine.DASK: AbstractProvider,
+        DataEngine.POLARIS: PolarsLocalFileProvider,
+        DataEngine.DASK: DaskLocalFileProvider,
         DataEngine.SPARK: AbstractProvider
 
     },
     DataSource.S3: {
-        DataEngine.PANDAS: AbstractProvider,
+        DataEngine.PANDAS: PandasS3FileProvider,
         DataEngine.POLARIS: AbstractProvider,
         DataEngine.DASK: AbstractProvider,
         DataEngine.SPARK: AbstractProvider
@@ -1,6 +1,7 @@
 """
 Deribit api provider
 """
+import asyncio
 import datetime
 import re
 import pandas as pd
@@ -22,10 +23,13 @@ from options_lib.normalization import parse_expiration_date, normalize_timestamp
 from provider import DataEngine, RequestParameters
 from exchange.cache import Cache
 from exchange.exchange_entities import ExchangeCode
-from exchange._abstract_exchange import AbstractExchange, RequestClass, APIException
+from exchange._abstract_exchange import AbstractExchange, RequestClass, AsyncRequestClass, APIException
+from exchange.exchange_exception import IncompleteDataException, RequestException
 
 
-ttl_cache = Cache(128, is_new_day_ttl_reset=True)
+MOEX_REFERENCE_CACHE_NAMESPACE = 'reference'  # Assets and underlyings lists are not evicted by options series
+MOEX_TIMEZONE = 'Europe/Moscow'  # Reference data is refreshed once per trading day
+ttl_cache = Cache(128, namespace_memory_ratio={MOEX_REFERENCE_CACHE_NAMESPACE: 0.2}, day_reset_tz=MOEX_TIMEZONE)
 
 
 class MoexAssetType(EnumCode):
@@ -51,7 +55,8 @@ class MoexOptions:
     https://iss.moex.com/iss/docs/option-calc/v1/about/
     """
 
-    def __init__(self, client: RequestClass):
+    def __init__(self, client: RequestClass | AsyncRequestClass):
+        """Methods with a prefix are coroutines, they require AsyncRequestClass client"""
         self.client = client
 
     def get_assets(self, asset_type: MoexAssetType | str | None = None) -> pd.DataFrame:
@@ -298,6 +303,21 @@ underlying_type               c
                 return None
             raise err from err
 
+    @validate_call
+    async def aget_option_series_desk(self, asset_code: str, series_code: str,
+                                      asset_type: MoexAssetType | str | None = None) -> pd.DataFrame | None:
+        """Async get_option_series_desk"""
+        try:
+            request_timestamp = pd.Timestamp.now(tz=datetime.UTC)
+            params = self._get_asset_type_params(None, asset_type)
+            response = await self.client.request_api(
+                f'/assets/{asset_code}/optionseries/{series_code}/optionboard', params=params)
+            return self._normalize_option_desk(response, asset_code, series_code, asset_type, request_timestamp)
+        except APIException as err:
+            if err.status_code == 422:
+                return None
+            raise err from err
+
     def _normalize_option_desk(self, response: dict, asset_code: str, series_code: str,
                                asset_type: MoexAssetType | str | None = None,
                                request_timestamp: pd.Timestamp | None = None) -> pd.DataFrame:
@@ -348,14 +368,18 @@ class MoexExchange(AbstractExchange):
     TEST_API_URL: str = 'https://iss.moex.com/iss/apps/option-calc/v1'
     CURRENCIES = [Currency.RUB.value]
     TASKS_LIMIT: int = 2
+    cache: Cache = ttl_cache
 
-    def __init__(self, engine: DataEngine = DataEngine.PANDAS, api_url: str | None = None):
-        """Init"""
+    def __init__(self, engine: DataEngine = DataEngine.PANDAS, api_url: str | None = None,
+                 cache_path: str | None = None):
+        """Init, cache_path - folder where reference data is kept between restarts"""
         api_url = api_url if api_url else self.PRODUCT_API_URL
         super().__init__(engine, ExchangeCode.MOEX.name, api_url=api_url, http_params={'timeout': 30})
         self.options = MoexOptions(self.client)
+        if cache_path is not None:
+            ttl_cache.set_disk_tier(cache_path)
 
-    @ttl_cache.it
+    @ttl_cache.it(read_only=True)
     def _request_asset_options(self, asset_code: str) -> pd.DataFrame | None:
         try:
             return self.options.get_asset_options(asset_code)
@@ -379,7 +403,11 @@ class MoexExchange(AbstractExchange):
                     options_asset_codes.append(asset_code)
         return options_asset_codes
 
-    @ttl_cache.it
+    @ttl_cache.it(namespace=MOEX_REFERENCE_CACHE_NAMESPACE, read_only=True, is_new_day_ttl_reset=True,
+                  persistent=True)
+    def _request_assets(self, asset_kind: MoexAssetType | None) -> pd.DataFrame:
+        return self.options.get_assets(asset_kind)
+
     def _get_asset_list_wo_options(self, asset_kind: AssetKind | str | None = None):
         if asset_kind in [AssetType.OPTIONS, AssetType.OPTIONS.value]:
             asset_kind = None
@@ -387,52 +415,52 @@ class MoexExchange(AbstractExchange):
             asset_kind = MoexAssetType.FUTURES
         elif isinstance(asset_kind, AssetType):
             asset_kind = MoexAssetType(asset_kind.value)  # TODO REFACTOR THIS, due changes in asset type to assend kind
-        assets_code_df = self.options.get_assets(asset_kind)
+        assets_code_df = self._request_assets(asset_kind)
         asset_codes = [asset_code.upper() for asset_code in assets_code_df[OCl.ASSET_CODE.nm].unique()]
         return asset_codes
 
-    def _request_series(self, asset_code: str):
-        try:
-            return self.options.get_option_series(asset_code)
-        except Exception as err:
-            print(f'[ERROR] option series request for {asset_code}: {err}')
-            return None
-
-    @ttl_cache.it
-    def _get_options_series(self, asset_codes: list[str]) -> pd.DataFrame:
-        asset_series = []
+    def _request_assets_data(self, request, asset_codes: list[str]) -> list[pd.DataFrame]:
+        """Request data of assets in threads, IncompleteDataException with received data if some requests failed"""
+        assets_data, failed_asset_codes = [], []
         with ThreadPoolExecutor(max_workers=self.TASKS_LIMIT) as executor:
-            job_results = {executor.submit(self._request_series, asset_code): asset_code for asset_code
-                           in asset_codes}
+            job_results = {executor.submit(request, asset_code): asset_code for asset_code in asset_codes}
             for job_res in concurrent.futures.as_completed(job_results):
-                series_df: pd.DataFrame | Exception | None = job_res.result()
-                if isinstance(series_df, pd.DataFrame):
-                    asset_series.append(series_df)
-                # else:
-                #     raise FileNotFoundError(f'Asset code {asset_code} is not options') # asset_code = job_results[job_res]
-        asset_series_df = pd.concat(asset_series, ignore_index=True) if len(asset_series) > 1 else asset_series[0]
-        return asset_series_df
-
-    def _request_underlying(self, asset_code: str):
+                try:
+                    asset_df: pd.DataFrame | None = job_res.result()
+                except Exception as err:
+                    print(f'[ERROR] {request.__name__} for {job_results[job_res]}: {err}')
+                    failed_asset_codes.append(job_results[job_res])
+                    continue
+                if isinstance(asset_df, pd.DataFrame):
+                    assets_data.append(asset_df)
+        if failed_asset_codes:
+            message = f'{request.__name__} failed for {sorted(failed_asset_codes)}'
+            if not assets_data:
+                raise RequestException(message)
+            raise IncompleteDataException(message, self._concat_assets_data(assets_data))
+        return assets_data
+
+    @staticmethod
+    def _concat_assets_data(assets_data: list[pd.DataFrame]) -> pd.DataFrame:
+        return pd.concat(assets_data, ignore_index=True) if len(assets_data) > 1 else assets_data[0]
+
+    @staticmethod
+    def _get_reference_data(get_data, asset_codes: list[str]) -> pd.DataFrame:
+        """Reference data of assets, incomplete data is used but not cached, so failed assets are requested again"""
         try:
-            return self.options.get_asset_futures(asset_code)
-        except Exception as err:
-            print(f'[ERROR] option underlying request for {asset_code}: {err}')
-            return None
+            return get_data(asset_codes)
+        except IncompleteDataException as err:
+            print(f'[WARNING] {err}, data is not cached')
+            return err.data
+
+    @ttl_cache.it(read_only=True, is_new_day_ttl_reset=True, persistent=True)
+    def _get_options_series(self, asset_codes: list[str]) -> pd.DataFrame:
+        return self._concat_assets_data(self._request_assets_data(self.options.get_option_series, asset_codes))
 
-    @ttl_cache.it
+    @ttl_cache.it(namespace=MOEX_REFERENCE_CACHE_NAMESPACE, read_only=True, is_new_day_ttl_reset=True,
+                  persistent=True)
     def _get_underlyings(self, asset_codes: list[str]) -> pd.DataFrame:
-        asset_underlying = []
-        with ThreadPoolExecutor(max_workers=self.TASKS_LIMIT) as executor:
-            job_results = {executor.submit(self._request_underlying, asset_code): asset_code for asset_code
-                           in asset_codes}
-            for job_res in concurrent.futures.as_completed(job_results):
-                underlying_df: pd.DataFrame | Exception | None = job_res.result()
-                if isinstance(underlying_df, pd.DataFrame):
-                    asset_underlying.append(underlying_df)
-        asset_underlying_df = pd.concat(asset_underlying, ignore_index=True) if len(asset_underlying) > 1 else \
-            asset_underlying[0]
-        return asset_underlying_df
+        return self._concat_assets_data(self._request_assets_data(self.options.get_asset_futures, asset_codes))
 
     def _request_desk(self, asset_code: str, series_code: str):
         try:
@@ -449,16 +477,56 @@ class MoexExchange(AbstractExchange):
         """
         # print('\n[WARNING] for get_options_assets_books_snapshot used STATIC FILE')
         # return pd.read_parquet('./book_summary_df.parquet')
+        asset_series_df, tasks = self._get_books_snapshot_tasks(asset_codes)
+        books = []
+        with ThreadPoolExecutor(max_workers=self.TASKS_LIMIT) as executor:
+            job_results = {executor.submit(self._request_desk, asset_code, series_code): [asset_code, series_code]
+                           for asset_code, series_code in tasks}
+            for job_res in concurrent.futures.as_completed(job_results):
+                book_summary_df: pd.DataFrame | Exception = job_res.result()
+                if isinstance(book_summary_df, pd.DataFrame):
+                    books.append(book_summary_df)
+                else:
+                    asset_code, series_code = job_results[job_res]
+                    print(f'[ERROR] for {asset_code} {series_code} book summary: {book_summary_df}')  # raise ?
+        return self._merge_books_series(books, asset_series_df)
+
+    async def aget_options_assets_books_snapshot(self, asset_codes: list[str] | str | None = None,
+                                                 client: AsyncRequestClass | None = None) -> pd.DataFrame:
+        """Async get_options_assets_books_snapshot, desks of series are requested concurrently up to
+        ASYNC_TASKS_LIMIT. Reference data is requested by cached methods in thread. Without client new one is
+        created for the call"""
+        if client is None:
+            async with self.get_async_client() as client:
+                return await self.aget_options_assets_books_snapshot(asset_codes, client)
+        asset_series_df, tasks = await asyncio.to_thread(self._get_books_snapshot_tasks, asset_codes)
+        options = MoexOptions(client)
+        semaphore = asyncio.Semaphore(self.ASYNC_TASKS_LIMIT)
+
+        async def request_desk(asset_code: str, series_code: str) -> pd.DataFrame | None:
+            async with semaphore:
+                try:
+                    return await options.aget_option_series_desk(asset_code=asset_code, series_code=series_code)
+                except Exception as err:
+                    print(f'[ERROR] get desk for {asset_code} {series_code}: {err}')
+                    return None
+
+        books = await asyncio.gather(*(request_desk(asset_code, series_code) for asset_code, series_code in tasks))
+        return self._merge_books_series([book for book in books if isinstance(book, pd.DataFrame)], asset_series_df)
+
+    def _get_books_snapshot_tasks(self, asset_codes: list[str] | str | None = None
+                                  ) -> tuple[pd.DataFrame, list[list[str]]]:
+        """Series of assets with underlyings and [asset code, series code] of desks to request"""
         if asset_codes is None:
             asset_codes = self._get_asset_list_wo_options(AssetType.OPTIONS)
         elif isinstance(asset_codes, str):
             asset_codes = [asset_codes]
-        asset_series_df = self._get_options_series(asset_codes)[[OCl.SERIES_CODE.nm, OCl.BASE_CODE.nm,
-                                                                 OCl.UNDERLYING_CODE.nm, OCl.UNDERLYING_TYPE.nm,
-                                                                 OCl.ORIGINAL_TIMESTAMP.nm]]
+        asset_series_df = self._get_reference_data(self._get_options_series, asset_codes)[
+            [OCl.SERIES_CODE.nm, OCl.BASE_CODE.nm, OCl.UNDERLYING_CODE.nm, OCl.UNDERLYING_TYPE.nm,
+             OCl.ORIGINAL_TIMESTAMP.nm]]
         futures_asset_codes = list(asset_series_df[asset_series_df[OCl.UNDERLYING_TYPE.nm] == AssetType.FUTURES.code][
                                        OCl.BASE_CODE.nm].unique())
-        futures_asset_underlying_df = self._get_underlyings(futures_asset_codes)[
+        futures_asset_underlying_df = self._get_reference_data(self._get_underlyings, futures_asset_codes)[
             [FCl.ASSET_CODE.nm, FCl.ASSET_TYPE.nm, FCl.EXPIRATION_DATE.nm]] \
             .rename(columns={FCl.ASSET_CODE.nm: OCl.UNDERLYING_CODE.nm, FCl.ASSET_TYPE.nm: OCl.UNDERLYING_TYPE.nm,
                              FCl.EXPIRATION_DATE.nm: OCl.UNDERLYING_EXPIRATION_DATE.nm})
@@ -468,17 +536,10 @@ class MoexExchange(AbstractExchange):
         tasks = [[asset_code, series_code] for asset_code in asset_series_df[OCl.BASE_CODE.nm].unique() \
                  for series_code in list(asset_series_df[asset_series_df[OCl.BASE_CODE.nm] == asset_code][
                                              OCl.SERIES_CODE.nm].unique())]
-        books = []
-        with ThreadPoolExecutor(max_workers=self.TASKS_LIMIT) as executor:
-            job_results = {executor.submit(self._request_desk, asset_code, series_code): [asset_code, series_code]
-                           for asset_code, series_code in tasks}
-            for job_res in concurrent.futures.as_completed(job_results):
-                book_summary_df: pd.DataFrame | Exception = job_res.result()
-                if isinstance(book_summary_df, pd.DataFrame):
-                    books.append(book_summary_df)
-                else:
-                    asset_code, series_code = job_results[job_res]
-                    print(f'[ERROR] for {asset_code} {series_code} book summary: {book_summary_df}')  # raise ?
+        return asset_series_df, tasks
+
+    @staticmethod
+    def _merge_books_series(books: list[pd.DataFrame], asset_series_df: pd.DataFrame) -> pd.DataFrame:
         book_summary_df = pd.concat(books, ignore_index=True) if len(books) > 1 else books[0]
         book_summary_df = book_summary_df.merge(asset_series_df[[OCl.SERIES_CODE.nm, OCl.UNDERLYING_CODE.nm,
                                                                  OCl.UNDERLYING_TYPE.nm,
@@ -0,0 +1,179 @@
+"""
+Adaptive rate limiter of exchange requests
+Token bucket limits rate of requests, number of concurrent requests is adjusted by AIMD: it is increased by one after
+concurrency successful responses and halved by throttling (429), server errors or transport errors. Only requests
+started after the last decrease can decrease concurrency again, so burst of errors halves it once.
+Retry-After of response pauses all requests of limiter. Failed requests are retried with capped exponential backoff
+with full jitter
+"""
+import asyncio
+import datetime
+import email.utils
+import math
+import random
+import threading
+import time
+from typing import Awaitable, Callable
+import httpx
+
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class RateLimiter:
+    """Token bucket with AIMD concurrency and retries, shared by sync and async clients of exchange"""
+    ASYNC_POLL_SEC: float = 0.01  # Async waiting of free concurrency slot
+
+    def __init__(self, rate: float | None = None, burst: int | None = None, max_concurrency: int = 8,
+                 min_concurrency: int = 1, max_retries: int = 5, backoff_base_sec: float = 0.5,
+                 backoff_max_sec: float = 30.):
+        """rate - requests per second (None - not limited), burst - bucket size (by default tokens of second),
+        concurrency starts from max_concurrency"""
+        if rate is not None and rate <= 0:
+            raise ValueError(f'Rate should be positive, got {rate}')
+        if not 1 <= min_concurrency <= max_concurrency:
+            raise ValueError(f'Concurrency limits should be 1 <= {min_concurrency} <= {max_concurrency}')
+        self.rate: float | None = rate
+        self.burst: int = burst if burst is not None else max(1, math.ceil(rate or 1))
+        self.min_concurrency: int = min_concurrency
+        self.max_concurrency: int = max_concurrency
+        self.max_retries: int = max_retries
+        self.backoff_base_sec: float = backoff_base_sec
+        self.backoff_max_sec: float = backoff_max_sec
+        self.concurrency: float = float(max_concurrency)
+        self.throttled: int = 0  # Responses which decreased concurrency or were retried
+        self._tokens: float = float(self.burst)
+        self._tokens_time: float = time.monotonic()
+        self._active: int = 0
+        self._successes: int = 0
+        self._decrease_time: float = 0.
+        self._blocked_until: float = 0.
+        self._condition: threading.Condition = threading.Condition()
+
+    def _try_acquire(self) -> float:
+        """Take concurrency slot and token: 0 if taken, otherwise seconds to wait (inf - until slot release)"""
+        now = time.monotonic()
+        if self._blocked_until > now:
+            return self._blocked_until - now
+        if self._active >= int(self.concurrency):
+            return math.inf
+        if self.rate is not None:
+            self._tokens = min(float(self.burst), self._tokens + (now - self._tokens_time) * self.rate)
+            self._tokens_time = now
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.rate
+            self._tokens -= 1
+        self._active += 1
+        return 0.
+
+    def acquire(self) -> float:
+        """Wait for slot and token, return start time of request for release"""
+        with self._condition:
+            while (wait_sec := self._try_acquire()) > 0:
+                self._condition.wait(None if wait_sec == math.inf else wait_sec)
+            return time.monotonic()
+
+    async def aacquire(self) -> float:
+        """Async acquire, event loop is not blocked"""
+        while True:
+            with self._condition:
+                wait_sec = self._try_acquire()
+                if wait_sec == 0:
+                    return time.monotonic()
+            await asyncio.sleep(min(wait_sec, self.ASYNC_POLL_SEC) if wait_sec == math.inf else wait_sec)
+
+    def release(self, started: float, status_code: int | None, retry_after: float | None = None) -> None:
+        """Free slot and adjust concurrency by response status, None status is transport error"""
+        with self._condition:
+            self._active -= 1
+            now = time.monotonic()
+            if status_code is None or status_code in RETRY_STATUS_CODES:
+                self.throttled += 1
+                if started >= self._decrease_time:  # Requests started before decrease saw previous concurrency
+                    self.concurrency = max(float(self.min_concurrency), self.concurrency / 2)
+                    self._decrease_time = now
+                    self._successes = 0
+                if retry_after is not None:
+                    self._blocked_until = max(self._blocked_until, now + retry_after)
+            else:
+                self._successes += 1
+                if self._successes >= self.concurrency:
+                    self.concurrency = min(float(self.max_concurrency), self.concurrency + 1)
+                    self._successes = 0
+            self._condition.notify_all()
+
+    def get_backoff(self, attempt: int) -> float:
+        """Capped exponential backoff with full jitter"""
+        return random.uniform(0, min(self.backoff_max_sec, self.backoff_base_sec * 2 ** attempt))
+
+    @staticmethod
+    def parse_retry_after(value: str | None) -> float | None:
+        """Seconds from Retry-After header with seconds or HTTP date"""
+        if not value:
+            return None
+        try:
+            return max(0., float(value))
+        except ValueError:
+            pass
+        try:
+            retry_datetime = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0., (retry_datetime - datetime.datetime.now(datetime.UTC)).total_seconds())
+
+    def _get_retry_delay(self, attempt: int, response: httpx.Response) -> float | None:
+        """Delay before retry of request, None if response should be returned"""
+        if attempt >= self.max_retries or response.status_code not in RETRY_STATUS_CODES:
+            return None
+        if 'Retry-After' in response.headers:
+            return 0.  # Requests are paused by limiter
+        return self.get_backoff(attempt)
+
+    def request(self, send: Callable[[], httpx.Response]) -> httpx.Response:
+        """Send request with limits and retries, response of the last attempt is returned"""
+        attempt = 0
+        while True:
+            started = self.acquire()
+            status_code, retry_after = None, None  # Cancellation and unexpected exceptions are released as errors
+            try:
+                response = send()
+                status_code, retry_after = response.status_code, \
+                    self.parse_retry_after(response.headers.get('Retry-After'))
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    raise
+                response = None
+            finally:
+                self.release(started, status_code, retry_after)
+            if response is None:
+                time.sleep(self.get_backoff(attempt))
+            else:
+                retry_delay = self._get_retry_delay(attempt, response)
+                if retry_delay is None:
+                    return response
+                time.sleep(retry_delay)
+            attempt += 1
+
+    async def arequest(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """Async request"""
+        attempt = 0
+        while True:
+            started = await self.aacquire()
+            status_code, retry_after = None, None  # Cancellation and unexpected exceptions are released as errors
+            try:
+                response = await send()
+                status_code, retry_after = response.status_code, \
+                    self.parse_retry_after(response.headers.get('Retry-After'))
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    raise
+                response = None
+            finally:
+                self.release(started, status_code, retry_after)
+            if response is None:
+                await asyncio.sleep(self.get_backoff(attempt))
+            else:
+                retry_delay = self._get_retry_delay(attempt, response)
+                if retry_delay is None:
+                    return response
+                await asyncio.sleep(retry_delay)
+            attempt += 1
@@ -114,15 +114,42 @@ class OptionData:
         settlement_date: datetime.datetime | None = None,
         expiration_date: datetime.datetime | None = None,
     ) -> bool:
-        """Update option chain by api request if it supported by provider"""
+        """Update option chain by provider request if history is not loaded, settlement date is limited by the end
+        of data period. Loaded history is used as is, so chain has its enrichment columns"""
+        if self._df_hist is not None:
+            return False
+        period_end = self._get_period_end()
+        if period_end is not None:
+            settlement_date = period_end if settlement_date is None else min(
+                self._to_utc_timestamp(settlement_date), period_end)
         df_chain: DataFrame | None = self._provider.load_options_chain(
-            self.option_symbol, settlement_date, expiration_date
+            self.option_symbol, settlement_date, expiration_date, timeframe=self.timeframe, columns=self._opt_columns
         )
         if df_chain is None:
             return False
+        if OCl.PRICE.nm in df_chain.columns:
+            df_chain = df_chain.dropna(subset=[OCl.PRICE.nm])  # Like in history dataframe
+            if df_chain.empty:
+                return False
         self._df_chain: DataFrame = df_chain
         return True
 
+    def _get_period_end(self) -> pd.Timestamp | None:
+        """The last datetime of data period"""
+        period_to = None if self._provider_params is None else self._provider_params.period_to
+        if period_to is None:
+            return None
+        if isinstance(period_to, int):
+            return pd.Timestamp(year=period_to + 1, month=1, day=1, tz=datetime.UTC) - pd.Timedelta(microseconds=1)
+        if isinstance(period_to, datetime.datetime):
+            return self._to_utc_timestamp(period_to)
+        return self._to_utc_timestamp(period_to) + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+
+    @staticmethod
+    def _to_utc_timestamp(value: datetime.date | datetime.datetime) -> pd.Timestamp:
+        timestamp = pd.Timestamp(value)
+        return timestamp.tz_localize(datetime.UTC) if timestamp.tzinfo is None else timestamp.tz_convert(datetime.UTC)
+
     @property
     def df_chain(self) -> pd.DataFrame:
         """Chain dataframe getter"""
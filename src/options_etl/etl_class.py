@@ -106,12 +106,26 @@ class EtlOptions(ABC):
                       f'Saved files {self._number_saved_files} (waiting {len(self._save_tasks)}), ' \
                       f'{self._number_of_requests} requests made ' \
                       f'in {self._number_of_jobs} jobs by avg {self._avg_job_time: .2f} sec'
+        report_text += self._get_cache_report()
         messages = self._get_messages()
         if len(messages) > 0:
             report_text += '\n(!)`Warning messages`:\n'
             report_text += '\n- '.join(messages)
         self._messanger.send_message(report_text)
 
+    def _get_cache_report(self) -> str:
+        """Exchange requests cache counters by function"""
+        cache_stats = self.exchange.cache_stats()
+        if not cache_stats:
+            return ''
+        report_text = f'\nCache {sum(stats.size for stats in cache_stats.values()) / 1048576:.1f} MB:'
+        for data_type, stats in cache_stats.items():
+            report_text += f'\n- `{data_type}` hits {stats.hits} ({stats.hit_ratio:.0%}), misses {stats.misses}, ' \
+                           f'disk {stats.disk_hits}, ignored {stats.ignored}, expired {stats.expired}, ' \
+                           f'evicted {stats.evicted}, {stats.size / 1048576:.1f} MB, ' \
+                           f'saved {stats.saved_time:.1f} sec'
+        return report_text
+
     def print_etl(self):
         def report_jobs(scheduler):
             # pylint: disable=protected-access, W0212
@@ -1,8 +1,8 @@
 """Update history timeframes from timeframe updates"""
 import datetime
-import random
 import os
 import re
+import shutil
 import time
 
 from typing import Generator
@@ -12,9 +12,10 @@ from collections import OrderedDict
 # import itertools
 # from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-from options_lib.dictionary import Timeframe, AssetKind, OptionsColumns as OCl, FuturesColumns as FCl, SpotColumns as SCl
+from options_lib.dictionary import Timeframe, AssetKind, OptionsColumns as OCl, SpotColumns as SCl
 from options_lib.normalization.timeframe_resample import DEFAULT_RESAMPLE_MODEL, convert_to_timeframe
-from provider import PandasLocalFileProvider, RequestParameters
+from provider import PandasLocalFileProvider, HistoryCatalog, HistoryLayout, TimestampOffsetIndex, \
+    write_history_parquet, DEFAULT_SORT_COLUMNS, DEFAULT_ROW_GROUP_ROWS
 from exchange.exchange_entities import ExchangeCode
 from exchange import AbstractExchange
 
@@ -30,6 +31,10 @@ class EtlHistory:
         'source_fields': True,
         'update_history': True,
         'parallelize': False,
+        'history_layout': HistoryLayout.YEAR.value,  # HistoryLayout.MONTH.value - partitions for intraday timeframes
+        'sort_columns': DEFAULT_SORT_COLUMNS,  # first column align row groups
+        'row_group_rows': DEFAULT_ROW_GROUP_ROWS,  # 0 - row group for each value of first sort column (trading day)
+        'create_catalog': False,  # Create catalog of history files by existing files if history has no catalog
     }
     update_fn_pattern: re.Pattern = re.compile(r'^(\d{4}|\d{2})-\d{2}-\d{2}((T\d{2}-\d{2})|(T\d{2}))?\.parquet$')
 
@@ -71,6 +76,14 @@ class EtlHistory:
 
         self._resample_by_exchange_symbol = self._params['resample_by_exchange_symbol']
         self._update_history = self._params['update_history']
+        self._history_layout = HistoryLayout(self._params['history_layout'])
+        self._sort_columns: list[str] = self._params['sort_columns']
+        self._row_group_rows: int = self._params['row_group_rows']
+        if self.provider.catalog is None and self._params['create_catalog']:
+            print('[INFO] Create history catalog', exchange_data_path)
+            self.provider.catalog = HistoryCatalog(exchange_data_path)
+            self.provider.catalog.rebuild(self.provider)
+        self.catalog: HistoryCatalog | None = self.provider.catalog  # Existing catalog is kept updated
 
     def prepare(self):
         """Load history dataframe and load list of increments and update by them
@@ -95,8 +108,8 @@ class EtlHistory:
                     df[col] = df[OCl.PRICE.nm]
         return df
 
-    def _get_filepath(self, symbol: str, asset_kind: str | AssetKind, year: int) -> str:
-        return self.provider.fn_path_prepare(symbol, asset_kind, self._timeframe, year)
+    def _get_filepath(self, symbol: str, asset_kind: str | AssetKind, year: int, month: int | None = None) -> str:
+        return self.provider.fn_path_prepare(symbol, asset_kind, self._timeframe, year, month)
 
     def _convert_timeframe(self, df: pd.DataFrame) -> pd.DataFrame:
         # TODO self._parallelize split to chanks by month and calc - only for options
@@ -147,20 +160,87 @@ class EtlHistory:
                     period_df = self._convert_timeframe(period_df)
 
                 year_dfs.append(period_df)
-            fn = self._get_filepath(symbol, asset_kind, year)
             year_df = pd.concat(year_dfs, ignore_index=True, copy=False)
-            early_timestamp: pd.Timestamp = year_df[OCl.TIMESTAMP.nm].min()
-            last_timestamp: pd.Timestamp = year_df[OCl.TIMESTAMP.nm].max()
-            if self._update_history and os.path.isfile(fn):
-                df_prev = pd.read_parquet(fn)
-                year_df = pd.concat([df_prev, year_df], ignore_index=True, copy=False)
-            year_df = self._convert_timeframe(year_df)
-            os.makedirs(os.path.dirname(fn), exist_ok=True)
-            year_df.to_parquet(fn)
-            print(f'  - updated {symbol}/{asset_kind} for {year} with record: {len(year_df)} and period '
-                  f'{early_timestamp.tz_localize(None).isoformat(timespec="minutes")}-'
-                  f'{last_timestamp.tz_localize(None).isoformat(timespec="minutes")}: '
-                  f'{fn.replace(self.update_path, "")}')
+            if self._history_layout == HistoryLayout.MONTH:
+                self._update_month_partitions(year_df, symbol, asset_kind, year)
+                continue
+            self._update_year_file(year_df, symbol, asset_kind, year)
+
+    def _update_year_file(self, year_df: pd.DataFrame, symbol: str, asset_kind: str | AssetKind, year: int):
+        """Rewrite year file. Month partitions of previous layout are merged to year file and removed, otherwise
+        they would shadow year file for readers"""
+        fn = self._get_filepath(symbol, asset_kind, year)
+        early_timestamp: pd.Timestamp = year_df[OCl.TIMESTAMP.nm].min()
+        last_timestamp: pd.Timestamp = year_df[OCl.TIMESTAMP.nm].max()
+        month_fns = self._get_month_partition_files(symbol, asset_kind, year)
+        if self._update_history and month_fns:
+            year_df = pd.concat([pd.read_parquet(month_fn) for month_fn in month_fns] + [year_df],
+                                ignore_index=True, copy=False)
+        elif self._update_history and os.path.isfile(fn):
+            df_prev = pd.read_parquet(fn)
+            year_df = pd.concat([df_prev, year_df], ignore_index=True, copy=False)
+        year_df = self._convert_timeframe(year_df)
+        self._write_history_file(year_df, fn, symbol, asset_kind, year)
+        for month_fn in month_fns:
+            self._remove_history_file(month_fn)
+        if month_fns:
+            shutil.rmtree(os.path.dirname(os.path.dirname(month_fns[0])), ignore_errors=True)
+        self._print_history_update(symbol, asset_kind, year, year_df, early_timestamp, last_timestamp, fn)
+
+    def _get_month_partition_files(self, symbol: str, asset_kind: str | AssetKind, year: int) -> list[str]:
+        """Existing month partition files of year ordered by month"""
+        return [fn for fn in (self._get_filepath(symbol, asset_kind, year, month) for month in range(1, 13))
+                if os.path.isfile(fn)]
+
+    def _remove_history_file(self, fn: str):
+        os.remove(fn)
+        TimestampOffsetIndex.remove(fn)
+        if self.catalog is not None:
+            self.catalog.remove_file(fn)
+
+    def _update_month_partitions(self, year_df: pd.DataFrame, symbol: str, asset_kind: str | AssetKind, year: int):
+        """Rewrite only month partitions which have updates. Year file of previous layout split to partitions or
+        removed without update_history, otherwise it would be shadowed by partitions for readers"""
+        year_fn = self._get_filepath(symbol, asset_kind, year)
+        prev_month_dfs = {}
+        if self._update_history and os.path.isfile(year_fn):
+            df_prev = pd.read_parquet(year_fn)
+            prev_month_dfs = dict(list(df_prev.groupby(df_prev[OCl.TIMESTAMP.nm].dt.month)))
+            del df_prev
+        for (update_year, month), month_df in year_df.groupby([year_df[OCl.TIMESTAMP.nm].dt.year,
+                                                              year_df[OCl.TIMESTAMP.nm].dt.month]):
+            fn = self._get_filepath(symbol, asset_kind, update_year, month)
+            early_timestamp: pd.Timestamp = month_df[OCl.TIMESTAMP.nm].min()
+            last_timestamp: pd.Timestamp = month_df[OCl.TIMESTAMP.nm].max()
+            if update_year == year and month in prev_month_dfs:
+                month_df = pd.concat([prev_month_dfs.pop(month), month_df], ignore_index=True, copy=False)
+            elif self._update_history and os.path.isfile(fn):
+                month_df = pd.concat([pd.read_parquet(fn), month_df], ignore_index=True, copy=False)
+            month_df = self._convert_timeframe(month_df)
+            self._write_history_file(month_df, fn, symbol, asset_kind, update_year, month)
+            self._print_history_update(symbol, asset_kind, f'{update_year}-{month:02d}', month_df, early_timestamp,
+                                       last_timestamp, fn)
+        if os.path.isfile(year_fn):
+            for month, month_df in prev_month_dfs.items():  # Months without updates are moved as is
+                self._write_history_file(month_df.reset_index(drop=True),
+                                         self._get_filepath(symbol, asset_kind, year, month),
+                                         symbol, asset_kind, year, month)
+            self._remove_history_file(year_fn)
+
+    def _write_history_file(self, df: pd.DataFrame, fn: str, symbol: str, asset_kind: str | AssetKind, year: int,
+                            month: int | None = None):
+        os.makedirs(os.path.dirname(fn), exist_ok=True)
+        write_history_parquet(df, fn, sort_columns=self._sort_columns, row_group_rows=self._row_group_rows)
+        TimestampOffsetIndex.build(fn)  # Books are read by index without scan of history file
+        if self.catalog is not None:
+            self.catalog.update_file(fn, symbol, asset_kind, self._timeframe, year, month, df)
+
+    def _print_history_update(self, symbol: str, asset_kind: str | AssetKind, period: int | str, df: pd.DataFrame,
+                              early_timestamp: pd.Timestamp, last_timestamp: pd.Timestamp, fn: str):
+        print(f'  - updated {symbol}/{asset_kind} for {period} with record: {len(df)} and period '
+              f'{early_timestamp.tz_localize(None).isoformat(timespec="minutes")}-'
+              f'{last_timestamp.tz_localize(None).isoformat(timespec="minutes")}: '
+              f'{fn.replace(self.update_path, "")}')
 
     def detect_last_update(self) -> pd.Timestamp | None:
         """Detect last history update date from fututrers and options"""
@@ -177,30 +257,20 @@ class EtlHistory:
         return min(asset_kinds_start_ts)
 
     def _get_start_timestamp(self, years_symbol: dict[int: list[str]], asset_kind: AssetKind) -> pd.Timestamp | None:
-        """Search max timestamp in history files for sample of symbols"""
-        max_symbols = 3  # Max symbols to search last date
-        if years_symbol is None:
-            return None
-        years = list(years_symbol.keys())
-        if len(years) == 0:
-            return None
-        max_year = max(years)
-        year_symbols = years_symbol[max_year]
-        if len(year_symbols) == 0:
+        """Max timestamp of symbols history by catalog, without catalog by the last history files"""
+        if not years_symbol:
             return None
+        if self.catalog is not None:
+            symbols = [symbol for year_symbols in years_symbol.values() for symbol in year_symbols]
+            return self.catalog.get_last_timestamp(asset_kind.value, self._timeframe, symbols)
         start_ts = None
-        request_parma = RequestParameters(period_to=max_year, timeframe=self._timeframe)
-        year_symbols = random.sample(year_symbols, max_symbols) if len(year_symbols) > max_symbols else year_symbols
-        for symbol in year_symbols:
-            if asset_kind.value == AssetKind.FUTURES.value:  # Use value there because it can be DeribitAssetKind and they will be different but the equal values
-                df = self.provider.load_future_history(symbol, request_parma, columns=[FCl.TIMESTAMP.nm])
-                start_ts_new = df[FCl.TIMESTAMP.nm].max()
-            elif asset_kind.value == AssetKind.OPTIONS.value:
-                df = self.provider.load_option_history(symbol, request_parma, columns=[OCl.TIMESTAMP.nm])
-                start_ts_new = df[OCl.TIMESTAMP.nm].max()
-            else:
-                raise TypeError(f'{asset_kind} Is not supported')
-            start_ts = start_ts_new if start_ts is None else max(start_ts, start_ts_new)
+        for year, year_symbols in years_symbol.items():
+            for symbol in year_symbols:
+                fn_paths = self.provider.get_history_files(symbol, asset_kind, self._timeframe, year)
+                if not fn_paths:
+                    continue
+                start_ts_new = pd.read_parquet(fn_paths[-1], columns=[OCl.TIMESTAMP.nm])[OCl.TIMESTAMP.nm].max()
+                start_ts = start_ts_new if start_ts is None else max(start_ts, start_ts_new)
         return start_ts
 
     def _get_asset_history_years(self, asset_kind: AssetKind) -> dict[int: list[str]]:
@@ -278,7 +348,7 @@ class EtlHistory:
 
     @staticmethod
     def _update_symbols_timeframes_fn(updates_files: dict, symbol: str, asset_kind: str, timeframe: str,
-                                      root_path: str, files: list[str] | Generator[str] | filter) -> dict:
+                                      root_path: str, files: list[str] | Generator[str, None, None] | filter) -> dict:
         if symbol not in updates_files:
             updates_files[symbol] = {}
         if asset_kind not in updates_files[symbol]:
@@ -292,7 +362,7 @@ class EtlHistory:
     @staticmethod
     def _update_resample_model_for_source(resample_model: dict) -> dict:
         prefix = AbstractExchange.SOURCE_PREFIX
-        list_of_source_columns = [OCl.PRICE.nm, OCl.LAST.nm, OCl.ASK.nm, OCl.BID.nm, OCl.EXCHANGE_PRICE.nm]
+        list_of_source_columns = [OCl.PRICE.nm, OCl.LAST.nm, OCl.ASK.nm, OCl.BID.nm, OCl.EXCHANGE_MARK_PRICE.nm]
         for col in list_of_source_columns:
             source_col = f'{prefix}_{col}'
             if col in resample_model and source_col not in resample_model:
@@ -0,0 +1,10 @@
+"""
+Dask module for out of core options operations by partitions
+
+Dask is optional dependency: poetry install --with dask
+"""
+from options_lib.dask._operations import join_option_with_future, add_intrinsic_and_time_value, convert_to_timeframe
+
+__all__ = [
+    'join_option_with_future', 'add_intrinsic_and_time_value', 'convert_to_timeframe'
+]
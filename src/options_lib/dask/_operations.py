@@ -0,0 +1,38 @@
+"""
+Dask versions of heavy options operations
+Operations are applied to every partition by pandas implementation. Dask dataframes from DaskLocalFileProvider have
+partition for every year or month history file, so rows of one timestamp and one instrument are in one partition
+"""
+import pandas as pd
+import dask.dataframe as dd
+from options_lib.dictionary import Timeframe
+from options_lib.enrichment import (
+    join_option_with_future as pd_join_option_with_future,
+    add_intrinsic_and_time_value as pd_add_intrinsic_and_time_value
+)
+from options_lib.normalization import convert_to_timeframe as pd_convert_to_timeframe
+
+
+def join_option_with_future(ddf_hist: dd.DataFrame, df_fut: pd.DataFrame | dd.DataFrame) -> dd.DataFrame:
+    """Join futures column to correspond options. Futures history is small and is broadcast to every partition"""
+    if isinstance(df_fut, dd.DataFrame):
+        df_fut = df_fut.compute()
+    return ddf_hist.map_partitions(pd_join_option_with_future, df_fut)
+
+
+def _add_intrinsic_and_time_value(df_hist: pd.DataFrame) -> pd.DataFrame:
+    return pd_add_intrinsic_and_time_value(df_hist.copy(deep=False))  # Partitions should not be changed in place
+
+
+def add_intrinsic_and_time_value(ddf_hist: dd.DataFrame) -> dd.DataFrame:
+    """Adding columns with intrinsic value and time value"""
+    return ddf_hist.map_partitions(_add_intrinsic_and_time_value)
+
+
+def convert_to_timeframe(ddf: dd.DataFrame, timeframe: Timeframe, by_exchange_symbol: bool = True,
+                         resample_model: dict[str, str] | None = None) -> dd.DataFrame:
+    """Convert to upper timeframe by partitions. Partitions should be aligned with timeframe periods"""
+    if timeframe.mult > Timeframe.EOD.mult:
+        raise ValueError(f'Timeframe {timeframe.value} is greater than history partitions alignment')
+    return ddf.map_partitions(pd_convert_to_timeframe, timeframe=timeframe, by_exchange_symbol=by_exchange_symbol,
+                              resample_model=resample_model)
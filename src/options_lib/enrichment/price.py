@@ -65,7 +65,8 @@ def add_atm_itm_otm_exp(df_hist):
 
     df_hist.loc[:, OCl.PRICE_STATUS.nm] = \
         df_hist.sort_values(by=[OCl.TIMESTAMP.nm, OCl.EXPIRATION_DATE.nm, OCl.OPTION_TYPE.nm, OCl.STRIKE.nm]) \
-            .groupby([OCl.TIMESTAMP.nm, OCl.EXPIRATION_DATE.nm, OCl.OPTION_TYPE.nm], group_keys=False)[
+            .groupby([OCl.TIMESTAMP.nm, OCl.EXPIRATION_DATE.nm, OCl.OPTION_TYPE.nm], group_keys=False,
+                     observed=True)[
             ['_diff', '_diff_abs', OCl.OPTION_TYPE.nm]] \
             .apply(atm_otm_itm, include_groups=False).drop(columns=['_diff']).reset_index(drop=True)
     return df_hist
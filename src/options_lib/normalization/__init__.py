@@ -1,11 +1,12 @@
 """Facade for normalization libraries implementation """
 from options_lib.normalization.price import fill_option_price
 from options_lib.normalization.timeframe_resample import convert_to_timeframe
+from options_lib.normalization.dtypes import get_compact_dtypes, compact_dtypes
 from options_lib.normalization.datetime_conversion import (
     parse_expiration_date, df_columns_to_timestamp, normalize_timestamp
 )
 
 __all__ = [
     'fill_option_price', 'convert_to_timeframe', 'parse_expiration_date',
-    'df_columns_to_timestamp', 'normalize_timestamp'
+    'df_columns_to_timestamp', 'normalize_timestamp', 'get_compact_dtypes', 'compact_dtypes'
 ]
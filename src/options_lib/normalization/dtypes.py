@@ -0,0 +1,33 @@
+"""
+Compact dtypes of dataframe columns by dictionary types
+- str columns (option_type, asset_code, currency, ...) are low cardinality and converted to category
+- float columns may be converted to float32, except columns used as keys and compared by equality (strike)
+"""
+import pandas as pd
+from options_lib.dictionary import OptionsColumns as OCl, FuturesColumns as FCl, SpotColumns as SCl
+
+CATEGORY_DTYPE = "category"
+FLOAT32_DTYPE = "float32"
+FLOAT32_EXCLUDED_COLUMNS = [OCl.STRIKE.nm]
+
+
+def get_compact_dtypes(columns: list[str], float32: bool = False) -> dict[str, str]:
+    """Compact dtypes for columns which are present in dictionaries"""
+    column_types = {col.nm: col.type for col in list(OCl) + list(FCl) + list(SCl)}
+    dtypes = {}
+    for column in columns:
+        column_type = column_types.get(column)
+        if column_type is str:
+            dtypes[column] = CATEGORY_DTYPE
+        elif column_type is float and float32 and column not in FLOAT32_EXCLUDED_COLUMNS:
+            dtypes[column] = FLOAT32_DTYPE
+    return dtypes
+
+
+def compact_dtypes(df: pd.DataFrame, float32: bool = False) -> pd.DataFrame:
+    """Convert dataframe columns to compact dtypes"""
+    dtypes = {column: dtype for column, dtype in get_compact_dtypes(list(df.columns), float32).items()
+              if df[column].dtype != dtype}
+    if not dtypes:
+        return df
+    return df.astype(dtypes, copy=False)
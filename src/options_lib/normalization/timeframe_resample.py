@@ -64,7 +64,7 @@ def _resample_by_kind_type_or_exchange_symbol(df: pd.DataFrame, timeframe: Timef
                                                          by_exchange_symbol=by_exchange_symbol)
 
     if len(group_columns) > 0:
-        group = df.groupby(group_columns[0], group_keys=False)
+        group = df.groupby(group_columns[0], group_keys=False, observed=True)
         return group.apply(_resample_by_kind_type_or_exchange_symbol,
                            timeframe=timeframe,
                            by_exchange_symbol=by_exchange_symbol,
@@ -1,10 +1,21 @@
 """Provider module api"""
-from provider._provider_entities import DataEngine, DataSource, RequestParameters
+from provider._provider_entities import DataEngine, DataSource, HistoryLayout, RequestParameters
 from provider._abstract_provider_class import AbstractProvider
 from provider._file_provider import AbstractFileProvider
 from provider._local_provider import PandasLocalFileProvider
+from provider._polars_provider import PolarsLocalFileProvider
+from provider._dask_provider import DaskLocalFileProvider
+from provider._s3_provider import PandasS3FileProvider
+from provider._parquet_writer import write_history_parquet, DEFAULT_SORT_COLUMNS, DEFAULT_ROW_GROUP_ROWS
+from provider._hot_tier import ArrowHotTier
+from provider._duckdb_query import DuckDBHistoryQuery
+from provider._catalog import HistoryCatalog
+from provider._offset_index import TimestampOffsetIndex
+from provider._async_provider import AsyncProvider
 
 __all__ = [
-    'DataEngine', 'DataSource', 'RequestParameters', 'AbstractProvider',
-    'AbstractFileProvider', 'PandasLocalFileProvider'
+    'DataEngine', 'DataSource', 'HistoryLayout', 'RequestParameters', 'AbstractProvider',
+    'AbstractFileProvider', 'PandasLocalFileProvider', 'PolarsLocalFileProvider', 'DaskLocalFileProvider',
+    'PandasS3FileProvider', 'write_history_parquet', 'DEFAULT_SORT_COLUMNS', 'DEFAULT_ROW_GROUP_ROWS',
+    'ArrowHotTier', 'DuckDBHistoryQuery', 'HistoryCatalog', 'TimestampOffsetIndex', 'AsyncProvider'
 ]
@@ -8,10 +8,11 @@ Provider limits:
 It is not planned that provider level will be contained any data logic. It should be in option data class
 """
 
-from typing import Any
+from typing import Any, Iterator
 from abc import ABC, abstractmethod
 import datetime
 import pandas as pd
+import pyarrow as pa
 
 from options_lib.dictionary import OptionsColumns, FuturesColumns, Timeframe, AssetKind
 from provider._provider_entities import RequestParameters
@@ -36,6 +37,8 @@ class AbstractProvider(ABC):
         FuturesColumns.PRICE.nm,
     ]
 
+    ITER_BATCH_ROWS: int = 100_000  # Default rows in chunk of history iterators
+
     def __init__(self, exchange_code: str, **kwargs: Any) -> None:
         self.exchange_code = exchange_code
         super().__init__(**kwargs)
@@ -98,3 +101,38 @@ class AbstractProvider(ABC):
         columns: list | None = None,
     ) -> pd.DataFrame | None:
         """Provide options chain by request to api if supported. Otherwise, return None"""
+
+    @staticmethod
+    def _iter_chunks(df: pd.DataFrame, batch_rows: int, to_pandas: bool) -> Iterator[pd.DataFrame | pa.RecordBatch]:
+        """Split dataframe to chunks in timestamp order"""
+        if OptionsColumns.TIMESTAMP.nm in df.columns:
+            df = df.sort_values(OptionsColumns.TIMESTAMP.nm, kind="stable", ignore_index=True)
+        for start in range(0, len(df), batch_rows):
+            df_chunk = df.iloc[start:start + batch_rows].reset_index(drop=True)
+            yield df_chunk if to_pandas else pa.RecordBatch.from_pandas(df_chunk, preserve_index=False)
+
+    def iter_options_history(
+        self,
+        asset_code: str,
+        params: RequestParameters | None = None,
+        columns: list | None = None,
+        batch_rows: int | None = None,
+        to_pandas: bool = True,
+    ) -> Iterator[pd.DataFrame | pa.RecordBatch]:
+        """Provide options by period, timeframe as pandas chunks or arrow record batches up to batch_rows in
+        timestamp order. By default history is loaded at once, providers which can read by parts override it"""
+        df_hist = self.load_options_history(asset_code, RequestParameters() if params is None else params, columns)
+        yield from self._iter_chunks(df_hist, batch_rows or self.ITER_BATCH_ROWS, to_pandas)
+
+    def iter_futures_history(
+        self,
+        asset_code: str,
+        params: RequestParameters | None = None,
+        columns: list | None = None,
+        batch_rows: int | None = None,
+        to_pandas: bool = True,
+    ) -> Iterator[pd.DataFrame | pa.RecordBatch]:
+        """Provide futures by period, timeframe as pandas chunks or arrow record batches up to batch_rows in
+        timestamp order. By default history is loaded at once, providers which can read by parts override it"""
+        df_fut = self.load_futures_history(asset_code, RequestParameters() if params is None else params, columns)
+        yield from self._iter_chunks(df_fut, batch_rows or self.ITER_BATCH_ROWS, to_pandas)
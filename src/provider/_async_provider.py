@@ -0,0 +1,112 @@
+"""
+Asyncio provider
+Adapter with async counterparts of provider methods. Blocking file and network I/O of wrapped provider is executed
+in thread pool, so event loop of web backend is not blocked. Number of concurrently executed requests is limited,
+many assets and kinds are loaded at once by agather_history
+"""
+
+import asyncio
+import datetime
+import functools
+from concurrent.futures import Executor, ThreadPoolExecutor
+import pandas as pd
+from options_lib.dictionary import Timeframe, AssetKind
+from provider._abstract_provider_class import AbstractProvider
+from provider._provider_entities import RequestParameters
+
+
+class AsyncProvider:
+    """Async interface for provider"""
+
+    DEFAULT_CONCURRENCY: int = 8
+
+    def __init__(self, provider: AbstractProvider, concurrency: int = DEFAULT_CONCURRENCY,
+                 executor: Executor | None = None) -> None:
+        """concurrency - limit of concurrently executed provider requests. Without executor own thread pool with
+        concurrency workers is created and it is shut down by close"""
+        if concurrency < 1:
+            raise ValueError(f"Concurrency should be positive, got {concurrency}")
+        self.provider: AbstractProvider = provider
+        self.concurrency: int = concurrency
+        self._own_executor: bool = executor is None
+        self._executor: Executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="provider") \
+            if executor is None else executor
+        self._semaphore: asyncio.Semaphore = asyncio.Semaphore(concurrency)
+
+    async def __aenter__(self) -> "AsyncProvider":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut down own thread pool"""
+        if self._own_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, method, *args, **kwargs):
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(method, *args, **kwargs))
+
+    async def aget_assets_list(self, asset_kind: AssetKind) -> list[str]:
+        """List of symbols"""
+        return await self._run(self.provider.get_assets_list, asset_kind)
+
+    async def aget_asset_history_years(self, asset_code: str, asset_kind: AssetKind,
+                                       timeframe: Timeframe) -> list[int]:
+        """List of history years"""
+        return await self._run(self.provider.get_asset_history_years, asset_code, asset_kind, timeframe)
+
+    async def aload_options_history(self, asset_code: str, params: RequestParameters | None = None,
+                                    columns: list | None = None) -> pd.DataFrame:
+        """Provide options by period, timeframe"""
+        return await self._run(self.provider.load_options_history, asset_code,
+                               RequestParameters() if params is None else params, columns)
+
+    async def aload_futures_history(self, asset_code: str, params: RequestParameters | None = None,
+                                    columns: list | None = None) -> pd.DataFrame:
+        """Provide futures by period, timeframe"""
+        return await self._run(self.provider.load_futures_history, asset_code,
+                               RequestParameters() if params is None else params, columns)
+
+    async def aload_options_book(self, asset_code: str, settlement_datetime: datetime.datetime | None = None,
+                                 timeframe: Timeframe = Timeframe.EOD, columns: list | None = None) -> pd.DataFrame:
+        """Provide options for datetime, timeframe"""
+        return await self._run(self.provider.load_options_book, asset_code, settlement_datetime, timeframe, columns)
+
+    async def aload_futures_book(self, asset_code: str, settlement_datetime: datetime.datetime | None = None,
+                                 timeframe: Timeframe = Timeframe.EOD, columns: list | None = None) -> pd.DataFrame:
+        """Provide futures for datetime, timeframe"""
+        return await self._run(self.provider.load_futures_book, asset_code, settlement_datetime, timeframe, columns)
+
+    async def aload_options_chain(self, asset_code: str, settlement_datetime: datetime.datetime | None = None,
+                                  expiration_date: datetime.datetime | None = None,
+                                  timeframe: Timeframe = Timeframe.EOD,
+                                  columns: list | None = None) -> pd.DataFrame | None:
+        """Provide options chain if supported. Otherwise, return None"""
+        return await self._run(self.provider.load_options_chain, asset_code, settlement_datetime, expiration_date,
+                               timeframe, columns)
+
+    async def agather_history(
+        self,
+        asset_codes: list[str],
+        asset_kinds: list[AssetKind] | None = None,
+        params: RequestParameters | None = None,
+        columns: dict[AssetKind, list] | None = None,
+        return_exceptions: bool = False,
+    ) -> dict[tuple[str, AssetKind], pd.DataFrame | BaseException]:
+        """Load history of options and futures (by default) for assets concurrently, result by (asset code, kind).
+        With return_exceptions errors are returned in result instead of raising the first one"""
+        asset_kinds = [AssetKind.OPTIONS, AssetKind.FUTURES] if asset_kinds is None else asset_kinds
+        columns = {} if columns is None else columns
+        load_methods = {AssetKind.OPTIONS: self.aload_options_history, AssetKind.FUTURES: self.aload_futures_history}
+        for asset_kind in asset_kinds:
+            if asset_kind not in load_methods:
+                raise ValueError(f"History of {asset_kind.value} is not supported")
+        keys = [(asset_code, asset_kind) for asset_code in asset_codes for asset_kind in asset_kinds]
+        results = await asyncio.gather(
+            *(load_methods[asset_kind](asset_code, params, columns.get(asset_kind)) for asset_code, asset_kind in keys),
+            return_exceptions=return_exceptions,
+        )
+        return dict(zip(keys, results))
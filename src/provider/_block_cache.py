@@ -0,0 +1,195 @@
+"""
+Disk block cache for remote files
+File is read by ranges aligned to blocks. Blocks are saved in CACHE_PATH/<file key>/<block number>, file key depends
+on path, size and modification time, so changed remote files are not read from cache. Cache size is limited,
+the least recently used blocks are removed first
+"""
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pyarrow.fs as pafs
+
+
+class DiskBlockCache:
+    """Size limited disk cache of remote files blocks"""
+
+    DEFAULT_BLOCK_SIZE: int = 4 * 1024 * 1024
+    DEFAULT_MAX_SIZE: int = 10 * 1024 * 1024 * 1024
+    FETCH_TASKS_LIMIT: int = 8  # Parallel ranged requests for missed blocks
+    EVICT_RATIO: float = 0.9  # Size of cache after eviction from max size
+
+    def __init__(self, cache_path: str, max_size: int = DEFAULT_MAX_SIZE, block_size: int = DEFAULT_BLOCK_SIZE) -> None:
+        self.cache_path: str = os.path.normpath(os.path.abspath(cache_path))
+        self.max_size: int = max_size
+        self.block_size: int = block_size
+        os.makedirs(self.cache_path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._size: int = sum(size for _, _, size in self._get_blocks())
+
+    @property
+    def size(self) -> int:
+        """Size of cached blocks"""
+        return self._size
+
+    def _get_blocks(self) -> list[tuple[str, float, int]]:
+        blocks = []
+        for file_key in os.listdir(self.cache_path):
+            file_folder = os.path.join(self.cache_path, file_key)
+            if not os.path.isdir(file_folder):
+                continue
+            for block in os.listdir(file_folder):
+                if block.isdigit():
+                    block_stat = os.stat(os.path.join(file_folder, block))
+                    blocks.append((os.path.join(file_folder, block), block_stat.st_mtime, block_stat.st_size))
+        return blocks
+
+    @staticmethod
+    def get_file_key(path: str, size: int, mtime_ns: int | None) -> str:
+        """Key of cached file version"""
+        return hashlib.sha1(f"{path}:{size}:{mtime_ns}".encode("utf-8")).hexdigest()
+
+    def get_block_path(self, file_key: str, block: int) -> str:
+        """Path of cached block"""
+        return os.path.join(self.cache_path, file_key, str(block))
+
+    def get(self, file_key: str, block: int) -> bytes | None:
+        """Cached block, None if block is not cached"""
+        block_path = self.get_block_path(file_key, block)
+        try:
+            with open(block_path, "rb") as block_file:
+                data = block_file.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(block_path)  # Modification time is used as last access time for eviction
+        except FileNotFoundError:  # Block is evicted after read
+            pass
+        return data
+
+    def put(self, file_key: str, block: int, data: bytes) -> None:
+        """Save block and evict the least recently used blocks if cache size is exceeded"""
+        block_path = self.get_block_path(file_key, block)
+        os.makedirs(os.path.dirname(block_path), exist_ok=True)
+        tmp_path = f"{block_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as block_file:
+            block_file.write(data)
+        with self._lock:
+            try:
+                replaced_size = os.path.getsize(block_path)  # Block can be put again by concurrent reads
+            except FileNotFoundError:
+                replaced_size = 0
+            os.replace(tmp_path, block_path)
+            self._size += len(data) - replaced_size
+            if self._size > self.max_size:
+                self._evict()
+
+    def _evict(self) -> None:
+        blocks = sorted(self._get_blocks(), key=lambda block: block[1])
+        self._size = sum(size for _, _, size in blocks)
+        for block_path, _, size in blocks:
+            if self._size <= self.max_size * self.EVICT_RATIO:
+                break
+            try:
+                os.remove(block_path)
+                self._size -= size
+            except FileNotFoundError:
+                pass
+
+    def open(self, filesystem: pafs.FileSystem, path: str) -> "CachedFile":
+        """Open remote file for reading through cache"""
+        file_info = filesystem.get_file_info(path)
+        if file_info.type != pafs.FileType.File:
+            raise FileNotFoundError(f"File {path} is not exist")
+        return CachedFile(self, filesystem, path, file_info.size, file_info.mtime_ns)
+
+
+class CachedFile(io.RawIOBase):
+    """Read only file object, blocks are read from cache or by ranged requests to remote storage"""
+
+    def __init__(self, cache: DiskBlockCache, filesystem: pafs.FileSystem, path: str, size: int,
+                 mtime_ns: int | None) -> None:
+        super().__init__()
+        self._cache: DiskBlockCache = cache
+        self._filesystem: pafs.FileSystem = filesystem
+        self._path: str = path
+        self._size: int = size
+        self._file_key: str = cache.get_file_key(path, size, mtime_ns)
+        self._position: int = 0
+        self._source = None
+        self._source_lock = threading.Lock()
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def size(self) -> int:
+        """Size of remote file"""
+        return self._size
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        match whence:
+            case io.SEEK_SET:
+                self._position = offset
+            case io.SEEK_CUR:
+                self._position += offset
+            case io.SEEK_END:
+                self._position = self._size + offset
+            case _:
+                raise ValueError(f"Incorrect whence {whence}")
+        return self._position
+
+    def _get_source(self):
+        with self._source_lock:
+            if self._source is None:
+                self._source = self._filesystem.open_input_file(self._path)
+            return self._source
+
+    def _fetch_block(self, block: int) -> bytes:
+        offset = block * self._cache.block_size
+        data = self._get_source().read_at(min(self._cache.block_size, self._size - offset), offset)
+        data = bytes(data)
+        self._cache.put(self._file_key, block, data)
+        return data
+
+    def read_range(self, offset: int, length: int) -> bytes:
+        """Read range of file, missed blocks are requested in parallel"""
+        length = max(0, min(length, self._size - offset))
+        if length == 0:
+            return b""
+        block_size = self._cache.block_size
+        blocks = range(offset // block_size, (offset + length - 1) // block_size + 1)
+        blocks_data = {block: self._cache.get(self._file_key, block) for block in blocks}
+        missed_blocks = [block for block, data in blocks_data.items() if data is None]
+        if len(missed_blocks) == 1:
+            blocks_data[missed_blocks[0]] = self._fetch_block(missed_blocks[0])
+        elif missed_blocks:
+            with ThreadPoolExecutor(max_workers=min(self._cache.FETCH_TASKS_LIMIT, len(missed_blocks))) as executor:
+                blocks_data.update(zip(missed_blocks, executor.map(self._fetch_block, missed_blocks)))
+        data = b"".join(blocks_data[block] for block in blocks)
+        start = offset - blocks[0] * block_size
+        return data[start:start + length]
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self._size - self._position
+        data = self.read_range(self._position, size)
+        self._position += len(data)
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self) -> None:
+        if self._source is not None:
+            self._source.close()
+            self._source = None
+        super().close()
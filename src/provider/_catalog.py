@@ -0,0 +1,218 @@
+"""
+Catalog of history files
+SQLite database EXCHANGE_CODE/_catalog.sqlite with record for every history file: asset, kind, timeframe, year and
+month partition, rows count, timestamps range, expirations, schema hash, modification time and size.
+History writers update catalog, so providers discover assets, years and files and ETL detect last update without
+listing folders and reading data files. Files changed outside of writers are detected by modification time and size,
+for them providers fall back to folders discovery
+"""
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from options_lib.dictionary import Timeframe, AssetKind, OptionsColumns as OCl
+
+
+class HistoryCatalog:
+    """SQLite catalog of exchange history files"""
+
+    CATALOG_FILE_NAME: str = "_catalog.sqlite"
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS history_files (
+            path TEXT PRIMARY KEY,
+            asset_code TEXT NOT NULL,
+            asset_kind TEXT NOT NULL,
+            timeframe TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            month INTEGER,
+            row_count INTEGER NOT NULL,
+            timestamp_min INTEGER,
+            timestamp_max INTEGER,
+            expirations TEXT NOT NULL,
+            schema_hash TEXT NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS history_files_asset ON history_files (asset_kind, timeframe, asset_code, year);
+    """
+
+    def __init__(self, exchange_data_path: str) -> None:
+        self.exchange_data_path: str = os.path.normpath(os.path.abspath(exchange_data_path))
+        self.catalog_path: str = os.path.join(self.exchange_data_path, self.CATALOG_FILE_NAME)
+        with self._connect() as connection:
+            connection.executescript(self._SCHEMA)
+
+    @classmethod
+    def exists(cls, exchange_data_path: str) -> bool:
+        """Catalog is created for exchange history"""
+        return os.path.isfile(os.path.join(exchange_data_path, cls.CATALOG_FILE_NAME))
+
+    @contextlib.contextmanager
+    def _connect(self):
+        connection = sqlite3.connect(self.catalog_path, timeout=30)
+        try:
+            with connection:  # Commit or rollback transaction
+                yield connection
+        finally:
+            connection.close()
+
+    def _relative_path(self, fn_path: str) -> str:
+        relative_path = os.path.relpath(os.path.normpath(os.path.abspath(fn_path)), self.exchange_data_path)
+        return relative_path.replace(os.sep, "/")
+
+    @staticmethod
+    def _kind_value(asset_kind: AssetKind | str) -> str:
+        return asset_kind if isinstance(asset_kind, str) else asset_kind.value
+
+    @staticmethod
+    def _timeframe_value(timeframe: Timeframe | str) -> str:
+        return timeframe if isinstance(timeframe, str) else timeframe.value
+
+    @staticmethod
+    def _get_schema_hash(schema: pa.Schema) -> str:
+        return hashlib.sha1(schema.remove_metadata().to_string().encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _to_ns(value) -> int | None:
+        return None if pd.isnull(value) else pd.Timestamp(value).value
+
+    def update_file(self, fn_path: str, asset_code: str, asset_kind: AssetKind | str, timeframe: Timeframe | str,
+                    year: int, month: int | None = None, df: pd.DataFrame | None = None) -> None:
+        """Add or update record of history file, values are calculated from written dataframe if it is provided,
+        otherwise timestamp and expiration columns are read from file"""
+        parquet_file = pq.ParquetFile(fn_path)
+        schema = parquet_file.schema_arrow
+        if df is None:
+            columns = [column for column in [OCl.TIMESTAMP.nm, OCl.EXPIRATION_DATE.nm] if column in schema.names]
+            df = parquet_file.read(columns=columns).to_pandas()
+        timestamp_min, timestamp_max = None, None
+        if OCl.TIMESTAMP.nm in df.columns and len(df):
+            timestamp_min = self._to_ns(df[OCl.TIMESTAMP.nm].min())
+            timestamp_max = self._to_ns(df[OCl.TIMESTAMP.nm].max())
+        expirations = []
+        if OCl.EXPIRATION_DATE.nm in df.columns:
+            expirations = sorted(self._to_ns(expiration)
+                                 for expiration in df[OCl.EXPIRATION_DATE.nm].dropna().unique())
+        fn_stat = os.stat(fn_path)
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO history_files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self._relative_path(fn_path), asset_code, self._kind_value(asset_kind),
+                 self._timeframe_value(timeframe), int(year), None if month is None else int(month),
+                 parquet_file.metadata.num_rows, timestamp_min,
+                 timestamp_max, json.dumps(expirations), self._get_schema_hash(schema), fn_stat.st_mtime_ns,
+                 fn_stat.st_size)
+            )
+
+    def remove_file(self, fn_path: str) -> None:
+        """Remove record of history file"""
+        with self._connect() as connection:
+            connection.execute("DELETE FROM history_files WHERE path = ?", (self._relative_path(fn_path),))
+
+    def rebuild(self, provider) -> int:
+        """Recreate catalog records by files of file provider, return number of files"""
+        with self._connect() as connection:
+            connection.execute("DELETE FROM history_files")
+        provider_catalog, provider.catalog = provider.catalog, None  # Discovery by folders
+        try:
+            files_number = self._add_provider_files(provider)
+        finally:
+            provider.catalog = provider_catalog
+        return files_number
+
+    def _add_provider_files(self, provider) -> int:
+        files_number = 0
+        for asset_kind in [AssetKind.OPTIONS, AssetKind.FUTURES, AssetKind.SPOT]:
+            for asset_code in provider.get_assets_list(asset_kind):
+                for timeframe in Timeframe:
+                    for year in provider.get_asset_history_years(asset_code, asset_kind, timeframe):
+                        for fn_path in provider.get_history_files(asset_code, asset_kind, timeframe, year):
+                            month_folder = os.path.basename(os.path.dirname(fn_path))
+                            month = int(month_folder[len(provider.MONTH_PARTITION_PREFIX):]) \
+                                if month_folder.startswith(provider.MONTH_PARTITION_PREFIX) else None
+                            self.update_file(fn_path, asset_code, asset_kind, timeframe, year, month)
+                            files_number += 1
+        return files_number
+
+    def get_assets_list(self, asset_kind: AssetKind | str) -> list[str]:
+        """Asset codes which have history for kind"""
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT DISTINCT asset_code FROM history_files WHERE asset_kind = ? ORDER BY asset_code",
+                (self._kind_value(asset_kind),)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_asset_history_years(self, asset_code: str, asset_kind: AssetKind | str,
+                                timeframe: Timeframe | str) -> list[int]:
+        """Years of history"""
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT DISTINCT year FROM history_files WHERE asset_kind = ? AND timeframe = ? AND asset_code = ? "
+                "ORDER BY year", (self._kind_value(asset_kind), self._timeframe_value(timeframe), asset_code)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_history_files(self, asset_code: str, asset_kind: AssetKind | str, timeframe: Timeframe | str,
+                          year: int, months: list[int] | None = None) -> list[str] | None:
+        """Files of year history ordered by month, month partitions shadow year file like in folders discovery.
+        None if any file was changed or removed outside of catalog, so files should be discovered by folders"""
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT path, month, mtime_ns, size FROM history_files WHERE asset_kind = ? AND timeframe = ? "
+                "AND asset_code = ? AND year = ? ORDER BY month, path",
+                (self._kind_value(asset_kind), self._timeframe_value(timeframe), asset_code, int(year))
+            ).fetchall()
+        is_partitioned = any(month is not None for _, month, _, _ in rows)
+        fn_paths = []
+        for path, month, mtime_ns, size in rows:
+            if is_partitioned and (month is None or (months is not None and month not in months)):
+                continue
+            fn_path = f"{self.exchange_data_path}/{path}"
+            try:
+                fn_stat = os.stat(fn_path)
+            except FileNotFoundError:
+                return None
+            if fn_stat.st_mtime_ns != mtime_ns or fn_stat.st_size != size:
+                return None
+            fn_paths.append(fn_path)
+        return fn_paths
+
+    def get_last_timestamp(self, asset_kind: AssetKind | str, timeframe: Timeframe | str,
+                           asset_codes: list[str] | None = None) -> pd.Timestamp | None:
+        """Last timestamp of history for kind, timeframe and assets"""
+        query = "SELECT MAX(timestamp_max) FROM history_files WHERE asset_kind = ? AND timeframe = ?"
+        parameters = [self._kind_value(asset_kind), self._timeframe_value(timeframe)]
+        if asset_codes is not None:
+            query += f" AND asset_code IN ({', '.join('?' * len(asset_codes))})"
+            parameters.extend(asset_codes)
+        with self._connect() as connection:
+            last_timestamp = connection.execute(query, parameters).fetchone()[0]
+        return None if last_timestamp is None else pd.Timestamp(last_timestamp, tz="UTC")
+
+    def get_expirations(self, asset_code: str, asset_kind: AssetKind | str,
+                        timeframe: Timeframe | str) -> list[pd.Timestamp]:
+        """Expirations present in history"""
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT expirations FROM history_files WHERE asset_kind = ? AND timeframe = ? AND asset_code = ?",
+                (self._kind_value(asset_kind), self._timeframe_value(timeframe), asset_code)
+            ).fetchall()
+        expirations = set()
+        for row in rows:
+            expirations.update(json.loads(row[0]))
+        return [pd.Timestamp(expiration, tz="UTC") for expiration in sorted(expirations)]
+
+    def get_files_info(self, asset_code: str | None = None) -> pd.DataFrame:
+        """Records of catalog"""
+        query = "SELECT * FROM history_files"
+        parameters = []
+        if asset_code is not None:
+            query += " WHERE asset_code = ?"
+            parameters.append(asset_code)
+        with self._connect() as connection:
+            return pd.read_sql_query(query + " ORDER BY path", connection, params=parameters)
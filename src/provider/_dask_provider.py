@@ -0,0 +1,186 @@
+"""
+Local provider by Dask
+The same files layout as for pandas local provider. History is exposed as lazy dask dataframe with partition for
+every history file (year or month partition), so history bigger than memory is processed by chunks on all cores.
+Partitions are aligned with calendar periods, so operations by timeframes up to EOD can be applied by partitions,
+see options_lib.dask
+
+Dask is optional dependency: poetry install --with dask
+"""
+
+import datetime
+from pydantic import validate_call
+import pandas as pd
+from options_lib.dictionary import Timeframe, AssetKind, OptionsColumns as OCl
+from provider._file_provider import AbstractFileProvider
+from provider._provider_entities import RequestParameters
+
+try:
+    import dask.dataframe as dd
+except ImportError:
+    dd = None
+
+
+class DaskLocalFileProvider(AbstractFileProvider):
+    """Load data from files by Dask"""
+
+    def __init__(self, exchange_code: str, data_path: str) -> None:
+        if dd is None:
+            raise ImportError("Dask is not installed, install it by: poetry install --with dask")
+        super().__init__(exchange_code, data_path)
+
+    def _scan_data_for_period(
+        self,
+        asset_kind: AssetKind,
+        asset_code: str,
+        params: RequestParameters,
+        columns: list,
+    ) -> "dd.DataFrame":
+        ts_from, ts_to = self._get_period_bounds(params)
+        fn_paths = self._get_period_files(asset_kind, asset_code, params.timeframe, ts_from, ts_to)
+        if not fn_paths:
+            raise FileNotFoundError(
+                f"There is no {asset_kind.value} {params.timeframe.value} history for {asset_code} "
+                f"from {params.period_from} to {params.period_to}"
+            )
+        filters = self._get_filters(asset_kind, params, ts_from, ts_to)
+        # Partition for every file keep calendar alignment, hive partitions folders are not columns
+        return dd.read_parquet(fn_paths, columns=columns, filters=filters, split_row_groups=False,
+                               dataset={"partitioning": None})
+
+    def _load_book(
+        self,
+        asset_kind: AssetKind,
+        asset_code: str,
+        settlement_datetime: datetime.datetime | None,
+        timeframe: Timeframe,
+        columns: list,
+        is_chain: bool = False,
+        expiration_date: datetime.datetime | None = None,
+    ) -> pd.DataFrame:
+        """Book of the last timestamp not later than settlement datetime, the last book of history if it is None.
+        Files are read from the latest with timestamp filter pushed down"""
+        fn_paths, ts_to = self._get_book_files(asset_kind, asset_code, timeframe, settlement_datetime)
+        read_columns = list(dict.fromkeys(columns + [OCl.TIMESTAMP.nm] + ([OCl.EXPIRATION_DATE.nm] if is_chain
+                                                                           else [])))
+        for fn_path in fn_paths:
+            ddf = dd.read_parquet(fn_path, columns=read_columns,
+                                  filters=None if ts_to is None else [(OCl.TIMESTAMP.nm, "<", ts_to)],
+                                  split_row_groups=False, dataset={"partitioning": None})
+            timestamp = ddf[OCl.TIMESTAMP.nm].max().compute()
+            if pd.isnull(timestamp):
+                continue
+            df = ddf[ddf[OCl.TIMESTAMP.nm] == timestamp].compute()
+            if is_chain:
+                expirations = [expiration.value for expiration in df[OCl.EXPIRATION_DATE.nm].unique()]
+                expiration = self._get_chain_expiration(expirations, timestamp.value, expiration_date)
+                df = df[df[OCl.EXPIRATION_DATE.nm] == pd.Timestamp(expiration, tz=datetime.UTC)]
+            return df[columns].reset_index(drop=True)
+        raise self._get_book_error(asset_kind, asset_code, timeframe, settlement_datetime, is_chain)
+
+    @validate_call
+    def scan_options_history(
+        self,
+        asset_code: str,
+        params: RequestParameters | None = None,
+        columns: list | None = None,
+    ) -> "dd.DataFrame":
+        """Lazy dask dataframe of options by period, timeframe"""
+        return self._scan_data_for_period(
+            asset_kind=AssetKind.OPTIONS,
+            asset_code=asset_code,
+            params=RequestParameters() if params is None else params,
+            columns=self.options_columns if columns is None else columns,
+        )
+
+    @validate_call
+    def scan_futures_history(
+        self,
+        asset_code: str,
+        params: RequestParameters | None = None,
+        columns: list | None = None,
+    ) -> "dd.DataFrame":
+        """Lazy dask dataframe of futures by period, timeframe"""
+        return self._scan_data_for_period(
+            asset_kind=AssetKind.FUTURES,
+            asset_code=asset_code,
+            params=RequestParameters() if params is None else params,
+            columns=self.futures_columns if columns is None else columns,
+        )
+
+    def load_options_history(
+        self,
+        asset_code: str,
+        params: RequestParameters | None = None,
+        columns: list | None = None,
+        to_pandas: bool = True,
+    ) -> "pd.DataFrame | dd.DataFrame":
+        """Load option by period, timeframe. Lazy dask dataframe if to_pandas is False"""
+        ddf = self.scan_options_history(asset_code, params, columns)
+        return ddf.compute().reset_index(drop=True) if to_pandas else ddf
+
+    @validate_call
+    def load_options_book(
+        self,
+        asset_code: str,
+        settlement_datetime: datetime.datetime | None = None,
+        timeframe: Timeframe = Timeframe.EOD,
+        columns: list | None = None,
+    ) -> pd.DataFrame:
+        """Provide options for datetime, timeframe"""
+        return self._load_book(
+            asset_kind=AssetKind.OPTIONS,
+            asset_code=asset_code,
+            settlement_datetime=settlement_datetime,
+            timeframe=timeframe,
+            columns=self.options_columns if columns is None else columns,
+        )
+
+    def load_futures_history(
+        self,
+        asset_code: str,
+        params: RequestParameters | None = None,
+        columns: list | None = None,
+        to_pandas: bool = True,
+    ) -> "pd.DataFrame | dd.DataFrame":
+        """Load futures data for asset code. Lazy dask dataframe if to_pandas is False"""
+        ddf = self.scan_futures_history(asset_code, params, columns)
+        return ddf.compute().reset_index(drop=True) if to_pandas else ddf
+
+    @validate_call
+    def load_futures_book(
+        self,
+        asset_code: str,
+        settlement_datetime: datetime.datetime | None = None,
+        timeframe: Timeframe = Timeframe.EOD,
+        columns: list | None = None,
+    ) -> pd.DataFrame:
+        """Provide futures for datetime, timeframe"""
+        return self._load_book(
+            asset_kind=AssetKind.FUTURES,
+            asset_code=asset_code,
+            settlement_datetime=settlement_datetime,
+            timeframe=timeframe,
+            columns=self.futures_columns if columns is None else columns,
+        )
+
+    @validate_call
+    def load_options_chain(
+        self,
+        asset_code: str,
+        settlement_datetime: datetime.datetime | None = None,
+        expiration_date: datetime.datetime | None = None,
+        timeframe: Timeframe = Timeframe.EOD,
+        columns: list | None = None,
+    ) -> pd.DataFrame | None:
+        """Provide options chain for the last timestamp not later than settlement datetime and expiration date,
+        by default the nearest not expired"""
+        return self._load_book(
+            asset_kind=AssetKind.OPTIONS,
+            asset_code=asset_code,
+            settlement_datetime=settlement_datetime,
+            timeframe=timeframe,
+            columns=self.options_columns if columns is None else columns,
+            is_chain=True,
+            expiration_date=expiration_date,
+        )
@@ -0,0 +1,87 @@
+"""
+SQL queries over history files by embedded DuckDB
+History folders EXCHANGE_CODE/ASSET_CODE/ASSET_KIND/TIMEFRAME_CODE are registered as views ASSET_KIND_TIMEFRAME
+in lower case with not word symbols replaced by "_", for example: btc_options_eod.
+Aggregates are calculated by DuckDB on parquet files out of core and by all cores, only result is returned
+
+DuckDB is optional dependency: poetry install --with duckdb
+"""
+
+import re
+import threading
+import pandas as pd
+import pyarrow as pa
+from options_lib.dictionary import Timeframe, AssetKind
+from provider._file_provider import AbstractFileProvider
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+
+class DuckDBHistoryQuery:
+    """Query history files of file provider by SQL"""
+
+    ASSET_KINDS: list[AssetKind] = [AssetKind.OPTIONS, AssetKind.FUTURES, AssetKind.SPOT]
+
+    def __init__(self, provider: AbstractFileProvider, database: str = ":memory:", threads: int | None = None) -> None:
+        if duckdb is None:
+            raise ImportError("DuckDB is not installed, install it by: poetry install --with duckdb")
+        self.provider: AbstractFileProvider = provider
+        self._connection = duckdb.connect(database)
+        if threads is not None:
+            self._connection.execute(f"SET threads = {int(threads)}")
+        self._lock = threading.Lock()
+        self.views: dict[str, list[str]] = {}
+        self.register_views()
+
+    @staticmethod
+    def get_view_name(asset_code: str, asset_kind: AssetKind, timeframe: Timeframe) -> str:
+        """View name for history folder"""
+        return re.sub(r"\W", "_", f"{asset_code}_{asset_kind.value}_{timeframe.value}").lower()
+
+    def _get_history_files(self, asset_code: str, asset_kind: AssetKind, timeframe: Timeframe) -> list[str]:
+        fn_paths = []
+        for year in self.provider.get_asset_history_years(asset_code, asset_kind, timeframe):
+            fn_paths.extend(self.provider.get_history_files(asset_code, asset_kind, timeframe, year))
+        return fn_paths
+
+    def register_views(self, asset_codes: list[str] | None = None) -> dict[str, list[str]]:
+        """Create or replace views for history folders, should be called after history files are added"""
+        views = {}
+        for asset_kind in self.ASSET_KINDS:
+            for asset_code in self.provider.get_assets_list(asset_kind):
+                if asset_codes is not None and asset_code not in asset_codes:
+                    continue
+                for timeframe in Timeframe:
+                    fn_paths = self._get_history_files(asset_code, asset_kind, timeframe)
+                    if fn_paths:
+                        views[self.get_view_name(asset_code, asset_kind, timeframe)] = fn_paths
+        with self._lock:
+            for view_name, fn_paths in views.items():
+                files_list = ", ".join("'" + fn_path.replace("'", "''") + "'" for fn_path in fn_paths)
+                self._connection.execute(
+                    f'CREATE OR REPLACE VIEW "{view_name}" AS SELECT * FROM read_parquet([{files_list}], '
+                    f'union_by_name = true, hive_partitioning = false)'
+                )
+            self.views.update(views)
+        return views
+
+    def query(
+        self, sql: str, parameters: list | dict | None = None, to_arrow: bool = False
+    ) -> pd.DataFrame | pa.Table:
+        """Execute SQL over registered views, pandas dataframe or arrow table if to_arrow"""
+        cursor = self._connection.cursor()  # Cursor for each query to allow queries from different threads
+        try:
+            result = cursor.execute(sql, parameters)
+            if not to_arrow:
+                return result.df()
+            table = result.arrow()  # Record batch reader since DuckDB 1.4
+            return table.read_all() if isinstance(table, pa.RecordBatchReader) else table
+        finally:
+            cursor.close()
+
+    def close(self) -> None:
+        """Close DuckDB connection"""
+        self._connection.close()
@@ -3,38 +3,68 @@ Local provider
 Data should be organized like EXCHANGE_CODE/ASSET_CODE/ASSET_KIND/TIMEFRAME_CODE/YEAR.parquet
 Example: LME/WTI/options/EOD/2024.year
 ASSET_KIND can be: options, futures, spot (spot - mean assets: currency, stock, crypto)
+For intraday timeframes year can be partitioned by months in hive style:
+EXCHANGE_CODE/ASSET_CODE/ASSET_KIND/TIMEFRAME_CODE/year=YEAR/month=MM/data.parquet
+If year have partitions folder, YEAR.parquet for it is ignored
 
 dataframe columns:
 """
 
+import builtins
+import datetime
 import os
 import re
+import types
 from abc import ABC
-from options_lib.dictionary import Timeframe, AssetKind
+import pandas as pd
+from options_lib.dictionary import Timeframe, AssetKind, OptionsColumns as OCl
 from provider._abstract_provider_class import AbstractProvider
+from provider._provider_entities import HistoryLayout, RequestParameters
+from provider._catalog import HistoryCatalog
 
 
 class AbstractFileProvider(AbstractProvider, ABC):
     """Load data from files"""
 
     exchange_data_path: str
+    YEAR_PARTITION_PREFIX: str = "year="
+    MONTH_PARTITION_PREFIX: str = "month="
+    PARTITION_FILE_NAME: str = "data.parquet"
+    CATALOG_SUPPORTED: bool = True  # Catalog is local SQLite database
 
     def __init__(self, exchange_code: str, data_path: str) -> None:
-        exchange_data_path: str = os.path.normpath(
-            os.path.abspath(os.path.join(data_path, exchange_code))
-        )
-        if not os.path.isdir(exchange_data_path):
+        exchange_data_path: str = self._normalize_path(f"{data_path}/{exchange_code}")
+        if not self._isdir(exchange_data_path):
             raise FileNotFoundError(f"Folder {exchange_data_path} is not exist")
         self.exchange_data_path = exchange_data_path
+        self.catalog: HistoryCatalog | None = None  # Discovery by catalog instead of folders listing if it exists
+        if self.CATALOG_SUPPORTED and HistoryCatalog.exists(exchange_data_path):
+            self.catalog = HistoryCatalog(exchange_data_path)
         super().__init__(exchange_code=exchange_code)
 
+    # File system operations, should be overridden by providers of not local storages
+    @staticmethod
+    def _normalize_path(path: str) -> str:
+        return os.path.normpath(os.path.abspath(path))
+
+    def _listdir(self, path: str) -> list[str]:
+        return os.listdir(path)
+
+    def _isdir(self, path: str) -> bool:
+        return os.path.isdir(path)
+
+    def _isfile(self, path: str) -> bool:
+        return os.path.isfile(path)
+
     def get_assets_list(self, asset_kind: AssetKind) -> list[str]:
         """Prepare list of underlying assets symbols"""
+        if self.catalog is not None:
+            return self.catalog.get_assets_list(asset_kind)
         asset_codes: list[str] = []
-        for symbol in os.listdir(self.exchange_data_path):
-            asset_kinds: list[str] = os.listdir(
-                os.path.join(self.exchange_data_path, symbol)
-            )
+        for symbol in self._listdir(self.exchange_data_path):
+            if not self._isdir(f"{self.exchange_data_path}/{symbol}"):
+                continue
+            asset_kinds: list[str] = self._listdir(f"{self.exchange_data_path}/{symbol}")
             if asset_kind.value in asset_kinds:
                 asset_codes.append(symbol)
         return asset_codes
@@ -58,17 +88,73 @@ class AbstractFileProvider(AbstractProvider, ABC):
     def get_asset_history_years(
         self, asset_code: str, asset_kind: AssetKind, timeframe: Timeframe
     ) -> list[int]:
-        """Get years of history data for symbol"""
-        fn_pattern = re.compile(r"\d{4}.parquet")
+        """Get years of history data for symbol, both YEAR.parquet files and year=YEAR partitions"""
+        if self.catalog is not None:
+            return self.catalog.get_asset_history_years(asset_code, asset_kind, timeframe)
+        fn_pattern = re.compile(r"^\d{4}.parquet$")
+        partition_pattern = re.compile(rf"^{self.YEAR_PARTITION_PREFIX}\d{{4}}$")
         history_folder: str = self._get_history_folder(
             asset_code, asset_kind, timeframe
         )
-        if not os.path.isdir(history_folder):
+        if not self._isdir(history_folder):
             return []
-        history_files: list[int] = [
-            int(fn[:4]) for fn in os.listdir(history_folder) if fn_pattern.match(fn)
-        ]
-        return history_files
+        history_years: set[int] = set()
+        for fn in self._listdir(history_folder):
+            if fn_pattern.match(fn):
+                history_years.add(int(fn[:4]))
+            elif partition_pattern.match(fn):
+                history_years.add(int(fn[len(self.YEAR_PARTITION_PREFIX):]))
+        return sorted(history_years)
+
+    def get_history_layout(
+        self, asset_code: str, asset_kind: AssetKind | str, timeframe: Timeframe | str, year: int
+    ) -> HistoryLayout | None:
+        """Layout of year history, None if there is no history for year"""
+        if self._isdir(self._get_year_partition_folder(asset_code, asset_kind, timeframe, year)):
+            return HistoryLayout.MONTH
+        if self._isfile(self.fn_path_prepare(asset_code, asset_kind, timeframe, year)):
+            return HistoryLayout.YEAR
+        return None
+
+    def _get_year_partition_folder(
+        self, asset_code: str, asset_kind: AssetKind | str, timeframe: Timeframe | str, year: int
+    ) -> str:
+        history_folder: str = self._get_history_folder(
+            asset_code, asset_kind, timeframe
+        )
+        return f"{history_folder}/{self.YEAR_PARTITION_PREFIX}{year}"
+
+    def get_history_files(
+        self,
+        asset_code: str,
+        asset_kind: AssetKind | str,
+        timeframe: Timeframe | str,
+        year: int,
+        months: list[int] | None = None,
+    ) -> list[str]:
+        """Files of year history, for month partitions only files for months (all if None) ordered by month"""
+        if self.catalog is not None:
+            fn_paths = self.catalog.get_history_files(asset_code, asset_kind, timeframe, year, months)
+            if fn_paths is not None:
+                return fn_paths
+        match self.get_history_layout(asset_code, asset_kind, timeframe, year):
+            case HistoryLayout.YEAR:
+                return [self.fn_path_prepare(asset_code, asset_kind, timeframe, year)]
+            case HistoryLayout.MONTH:
+                year_folder = self._get_year_partition_folder(asset_code, asset_kind, timeframe, year)
+                partitions: list[tuple[int, str]] = []
+                for month_folder in self._listdir(year_folder):
+                    if not month_folder.startswith(self.MONTH_PARTITION_PREFIX):
+                        continue
+                    month = int(month_folder[len(self.MONTH_PARTITION_PREFIX):])
+                    if months is not None and month not in months:
+                        continue
+                    month_path = f"{year_folder}/{month_folder}"
+                    partitions.extend((month, f"{month_path}/{fn}") for fn in sorted(self._listdir(month_path))
+                                      if fn.endswith(".parquet"))
+                return [fn_path for _, fn_path in sorted(partitions, key=lambda partition: partition[0])]
+            case _:
+                return []
 
     def fn_path_prepare(
         self,
@@ -76,9 +162,155 @@ class AbstractFileProvider(AbstractProvider, ABC):
         asset_kind: AssetKind | str,
         timeframe: Timeframe | str,
         year: int,
+        month: int | None = None,
     ) -> str:
-        """Prepare path for files"""
+        """Prepare path for files, with month it is path of month partition file"""
+        if month is not None:
+            year_folder = self._get_year_partition_folder(asset_code, asset_kind, timeframe, year)
+            return f"{year_folder}/{self.MONTH_PARTITION_PREFIX}{month:02d}/{self.PARTITION_FILE_NAME}"
         history_folder: str = self._get_history_folder(
             asset_code, asset_kind, timeframe
         )
         return f"{history_folder}/{year}.parquet"
+
+    @staticmethod
+    def _to_utc_timestamp(value: datetime.date | datetime.datetime) -> pd.Timestamp:
+        """Period values without timezone are UTC like timestamps in history files"""
+        timestamp = pd.Timestamp(value)
+        if timestamp.tzinfo is None:
+            return timestamp.tz_localize(datetime.UTC)
+        return timestamp.tz_convert(datetime.UTC)
+
+    def _get_period_bounds(
+        self, params: RequestParameters
+    ) -> tuple[pd.Timestamp | None, pd.Timestamp | None]:
+        """Convert period to [timestamp_from, timestamp_to) bounds, None if period is not limited"""
+        period_from, period_to = params.period_from, params.period_to
+        if isinstance(period_from, int) != isinstance(period_to, int) and \
+                period_from is not None and period_to is not None:
+            raise TypeError(
+                f"Mismatch types period_from {type(period_from)} "
+                f"and period_to {type(period_to)}"
+            )
+        if period_from is None and period_to is not None:
+            period_from = period_to  # Only period_to mean request for single year, date or datetime
+        ts_from = None
+        match type(period_from):
+            case builtins.int:
+                ts_from = pd.Timestamp(year=period_from, month=1, day=1, tz=datetime.UTC)
+            case datetime.date | datetime.datetime:
+                ts_from = self._to_utc_timestamp(period_from)
+            case types.NoneType:
+                pass
+            case _:
+                raise TypeError(f"period_from have incorrect type {type(period_from)}")
+        ts_to = None
+        match type(period_to):
+            case builtins.int:
+                ts_to = pd.Timestamp(year=period_to + 1, month=1, day=1, tz=datetime.UTC)
+            case datetime.date:
+                ts_to = self._to_utc_timestamp(period_to) + pd.Timedelta(days=1)
+            case datetime.datetime:
+                ts_to = self._to_utc_timestamp(period_to) + pd.Timedelta(microseconds=1)
+            case types.NoneType:
+                pass
+            case _:
+                raise TypeError(f"period_to have incorrect type {type(period_to)}")
+        if ts_from is not None and ts_to is not None and ts_from >= ts_to:
+            raise ValueError(f"period_from {params.period_from} should be earlier than period_to {params.period_to}")
+        return ts_from, ts_to
+
+    def _get_period_files(
+        self,
+        asset_kind: AssetKind,
+        asset_code: str,
+        timeframe: Timeframe,
+        ts_from: pd.Timestamp | None,
+        ts_to: pd.Timestamp | None,
+    ) -> list[str]:
+        """History files that overlap with period, ordered by year and month partitions"""
+        years = sorted(self.get_asset_history_years(asset_code, asset_kind, timeframe))
+        first_month = (ts_from.year, ts_from.month) if ts_from is not None else None
+        last_ts = ts_to - pd.Timedelta(microseconds=1) if ts_to is not None else None
+        last_month = (last_ts.year, last_ts.month) if last_ts is not None else None
+        fn_paths = []
+        for year in years:
+            if (first_month is not None and year < first_month[0]) or \
+                    (last_month is not None and year > last_month[0]):
+                continue
+            months = [month for month in range(1, 13)
+                      if (first_month is None or (year, month) >= first_month) and
+                      (last_month is None or (year, month) <= last_month)]
+            fn_paths.extend(self.get_history_files(asset_code, asset_kind, timeframe, year,
+                                                   None if len(months) == 12 else months))
+        return fn_paths
+
+    def _get_book_files(
+        self,
+        asset_kind: AssetKind,
+        asset_code: str,
+        timeframe: Timeframe,
+        settlement_datetime: datetime.datetime | None,
+    ) -> tuple[list[str], pd.Timestamp | None]:
+        """Files which can contain book from the latest and end bound of book timestamp, None for the last book
+        of history"""
+        ts_to = None
+        if settlement_datetime is not None:
+            ts_to = self._to_utc_timestamp(settlement_datetime) + pd.Timedelta(microseconds=1)
+        return list(reversed(self._get_period_files(asset_kind, asset_code, timeframe, None, ts_to))), ts_to
+
+    @staticmethod
+    def _get_book_error(
+        asset_kind: AssetKind,
+        asset_code: str,
+        timeframe: Timeframe,
+        settlement_datetime: datetime.datetime | None,
+        is_chain: bool,
+    ) -> FileNotFoundError:
+        return FileNotFoundError(
+            f"There is no {asset_kind.value} {timeframe.value} {'chain' if is_chain else 'book'} for {asset_code} "
+            f"at {settlement_datetime}"
+        )
+
+    def _get_chain_expiration(self, expirations: list[int], timestamp: int,
+                              expiration_date: datetime.datetime | None) -> int:
+        """Expiration of chain in nanoseconds, by default the nearest not expired like select_chain"""
+        if expiration_date is not None:
+            expiration = self._to_utc_timestamp(expiration_date).value
+            if expiration not in expirations:
+                raise ValueError(f"{OCl.EXPIRATION_DATE.value} {expiration_date} is not present for "
+                                 f"{OCl.TIMESTAMP.value} {pd.Timestamp(timestamp, tz=datetime.UTC).isoformat()}")
+            return expiration
+        actual_expirations = [expiration for expiration in expirations if expiration >= timestamp]
+        if not actual_expirations:
+            raise ValueError(f"There are no actual expirations for "
+                             f"{OCl.TIMESTAMP.value} {pd.Timestamp(timestamp, tz=datetime.UTC).isoformat()}")
+        return min(actual_expirations)
+
+    def _get_filters(
+        self,
+        asset_kind: AssetKind,
+        params: RequestParameters,
+        ts_from: pd.Timestamp | None,
+        ts_to: pd.Timestamp | None,
+    ) -> list[tuple] | None:
+        """Filters in pyarrow DNF format to push down to scan, parquet row groups are skipped by statistics and rows
+        filtered before conversion to dataframe"""
+        filters = []
+        is_year_period = not isinstance(params.period_from, datetime.date) and \
+            not isinstance(params.period_to, datetime.date)
+        if not is_year_period:  # Year files already contain only data for year
+            if ts_from is not None:
+                filters.append((OCl.TIMESTAMP.nm, ">=", ts_from))
+            if ts_to is not None:
+                filters.append((OCl.TIMESTAMP.nm, "<", ts_to))
+        if params.expiration_date is not None:
+            filters.append((OCl.EXPIRATION_DATE.nm, "==", self._to_utc_timestamp(params.expiration_date)))
+        if asset_kind.value == AssetKind.OPTIONS.value:
+            if params.option_type is not None:
+                filters.append((OCl.OPTION_TYPE.nm, "==", params.option_type.code))
+            if params.strike_from is not None:
+                filters.append((OCl.STRIKE.nm, ">=", params.strike_from))
+            if params.strike_to is not None:
+                filters.append((OCl.STRIKE.nm, "<=", params.strike_to))
+        return filters if filters else None
@@ -0,0 +1,76 @@
+"""
+Hot tier of history files
+Uncompressed Arrow IPC (Feather v2) mirrors of parquet files in HOT_TIER_PATH/<path relative to data path>.arrow
+Mirror has mtime of source file, so it is rebuilt when source is changed. Mirrors are read by memory mapping,
+repeated reads do not decode data and pages are shared between processes by OS page cache
+"""
+import os
+import threading
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+
+class ArrowHotTier:
+    """Memory mapped Arrow IPC mirrors of parquet files"""
+
+    MIRROR_EXTENSION: str = ".arrow"
+
+    def __init__(self, hot_tier_path: str, data_path: str) -> None:
+        self.hot_tier_path: str = os.path.normpath(os.path.abspath(hot_tier_path))
+        self.data_path: str = os.path.normpath(os.path.abspath(data_path))
+        os.makedirs(self.hot_tier_path, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def get_mirror_path(self, fn_path: str) -> str:
+        """Path of mirror for source file"""
+        relative_path = os.path.relpath(os.path.normpath(os.path.abspath(fn_path)), self.data_path)
+        if relative_path.startswith(os.pardir):
+            raise ValueError(f"File {fn_path} is not in data folder {self.data_path}")
+        return os.path.join(self.hot_tier_path, os.path.splitext(relative_path)[0] + self.MIRROR_EXTENSION)
+
+    def is_synced(self, fn_path: str) -> bool:
+        """Mirror exists and has the same mtime as source file"""
+        try:
+            return os.stat(self.get_mirror_path(fn_path)).st_mtime_ns == os.stat(fn_path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+
+    def sync(self, fn_path: str) -> str:
+        """Write mirror of source file if it is absent or outdated, return mirror path"""
+        mirror_path = self.get_mirror_path(fn_path)
+        if self.is_synced(fn_path):
+            return mirror_path
+        with self._lock:
+            if self.is_synced(fn_path):
+                return mirror_path
+            source_stat = os.stat(fn_path)
+            table = pq.read_table(fn_path)
+            os.makedirs(os.path.dirname(mirror_path), exist_ok=True)
+            tmp_path = f"{mirror_path}.{os.getpid()}.tmp"
+            try:
+                feather.write_feather(table, tmp_path, compression="uncompressed")
+                os.utime(tmp_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+                os.replace(tmp_path, mirror_path)  # Atomic for readers in other processes
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        return mirror_path
+
+    def read_table(self, fn_path: str, columns: list | None = None, filters: list[tuple] | None = None) -> pa.Table:
+        """Read source file from synced mirror, columns selection do not copy data, filter copies only selected
+        and filter columns"""
+        with pa.memory_map(self.sync(fn_path), "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            filter_columns = [column for column, _, _ in filters] if filters else []
+            table = table.select(list(dict.fromkeys(columns + filter_columns)))
+        if filters:
+            table = table.filter(pq.filters_to_expression(filters))
+        return table if columns is None else table.select(columns)
+
+    def remove(self, fn_path: str) -> None:
+        """Remove mirror of source file"""
+        mirror_path = self.get_mirror_path(fn_path)
+        if os.path.isfile(mirror_path):
+            os.remove(mirror_path)
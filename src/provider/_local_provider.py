@@ -2,28 +2,102 @@
 Local provider
 Data should be organized like EXCHANGE_CODE/EXCHANGE_SYMBOL/TRADE_TYPE/TIMEFRAME_CODE/YEAR.parquet
 Example: LME/WTI/option/EOD/2024.year
+or partitioned by month like EXCHANGE_CODE/EXCHANGE_SYMBOL/TRADE_TYPE/TIMEFRAME_CODE/year=YEAR/month=MM/data.parquet
 TRADE_TYPE can be: option, future, asset (asset - mean tangible assets: currency, stock, crypto)
 
 dataframe columns:
 """
 
-import builtins
 import datetime
+import functools
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from pydantic import validate_call
-from options_lib.dictionary import Timeframe, AssetKind
+from options_lib.dictionary import Timeframe, AssetKind, OptionsColumns as OCl
+from options_lib.normalization.dtypes import get_compact_dtypes, CATEGORY_DTYPE, FLOAT32_DTYPE
 from provider._file_provider import AbstractFileProvider
 from provider._provider_entities import RequestParameters
+from provider._parquet_scan import read_parquet_table, iter_parquet_batches
+from provider._hot_tier import ArrowHotTier
+from provider._offset_index import TimestampOffsetIndex
 
 
 class PandasLocalFileProvider(AbstractFileProvider):
     """Load data from files by Pandas"""
 
+    READ_TASKS_LIMIT: int = 4  # Parallel year files reading, pyarrow release GIL while decoding
+    OFFSET_INDEX_SUPPORTED: bool = True  # Sidecar timestamp index files are local files
+    _FN_YEAR_PATTERN: re.Pattern = re.compile(r"/(\d{4})\.parquet$|/year=(\d{4})/")
+
+    def __init__(self, exchange_code: str, data_path: str, hot_tier_path: str | None = None,
+                 hot_tier_years: list[int] | None = None, compact_dtypes: bool = False, float32: bool = False) -> None:
+        """Optional hot tier keep memory mapped Arrow mirrors of history files for hot_tier_years,
+        by default for current year. compact_dtypes load str columns as category and with float32 - float columns
+        as float32"""
+        super().__init__(exchange_code, data_path)
+        self._compact_dtypes: bool = compact_dtypes
+        self._float32: bool = float32
+        self._hot_tier: ArrowHotTier | None = None
+        if hot_tier_path is not None:
+            self._hot_tier = ArrowHotTier(hot_tier_path, data_path)
+        self._hot_tier_years: list[int] | None = hot_tier_years
+        self._offset_indexes: dict[str, TimestampOffsetIndex] = {}
+
+    def _is_hot_file(self, fn_path: str) -> bool:
+        if self._hot_tier is None:
+            return False
+        fn_year = self._FN_YEAR_PATTERN.search(fn_path.replace(os.sep, "/"))
+        if fn_year is None:
+            return False
+        hot_tier_years = self._hot_tier_years
+        if hot_tier_years is None:
+            hot_tier_years = [datetime.datetime.now(datetime.UTC).year]
+        return int(fn_year.group(1) or fn_year.group(2)) in hot_tier_years
+
     def _fn_path_prepare(
         self, asset_code: str, asset_kind: AssetKind, timeframe: Timeframe, year: int
     ):
         return super().fn_path_prepare(asset_code, asset_kind, timeframe, year)
 
+    def _read_table(self, fn_path: str, columns: list | None, filters: list[tuple] | None = None) -> pa.Table:
+        if self._is_hot_file(fn_path):
+            return self._hot_tier.read_table(fn_path, columns=columns, filters=filters)
+        return read_parquet_table(fn_path, columns=columns, filters=filters)
+
+    def _read_files(
+        self, fn_paths: list[str], columns: list | None, filters: list[tuple] | None = None
+    ) -> pd.DataFrame:
+        """Read files concurrently and convert to pandas once, tables concatenation do not copy data"""
+        read_table = functools.partial(self._read_table, columns=columns, filters=filters)
+        if len(fn_paths) == 1:
+            tables = [read_table(fn_paths[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.READ_TASKS_LIMIT, len(fn_paths))) as executor:
+                tables = list(executor.map(read_table, fn_paths))
+        table = pa.concat_tables(tables, promote_options="default") if len(tables) > 1 else tables[0]
+        del tables
+        return self._to_pandas(table)
+
+    def _to_pandas(self, table: pa.Table) -> pd.DataFrame:
+        """Convert table to pandas with compact dtypes policy, types are converted by arrow before pandas blocks
+        are created"""
+        if not self._compact_dtypes:
+            return table.to_pandas(split_blocks=True, self_destruct=True)
+        dtypes = get_compact_dtypes(table.column_names, self._float32)
+        categories = [column for column, dtype in dtypes.items()
+                      if dtype == CATEGORY_DTYPE and (pa.types.is_string(table.schema.field(column).type) or
+                                                       pa.types.is_large_string(table.schema.field(column).type))]
+        float32_fields = [pa.field(field.name, pa.float32())
+                          if dtypes.get(field.name) == FLOAT32_DTYPE and pa.types.is_floating(field.type) else field
+                          for field in table.schema]
+        table = table.cast(pa.schema(float32_fields, metadata=table.schema.metadata))
+        return table.to_pandas(split_blocks=True, self_destruct=True, categories=categories)
+
     def _load_data_for_period(
         self,
         asset_kind: AssetKind,
@@ -31,55 +105,150 @@ class PandasLocalFileProvider(AbstractFileProvider):
         params: RequestParameters,
         columns: list,
     ) -> pd.DataFrame:
-        if params.period_from is None and params.period_to is None:
-            raise NotImplementedError("Load all data")
-        if params.period_from is None:
-            match type(params.period_to):
-                case builtins.int:
-                    fn_path = self._fn_path_prepare(
-                        asset_code, asset_kind, params.timeframe, params.period_to
-                    )
-                    return pd.read_parquet(fn_path, columns=columns)
-                case datetime.date:
-                    fn_path = self._fn_path_prepare(
-                        asset_code, asset_kind, params.timeframe, params.period_to.year
-                    )
-                    df_hist = pd.read_parquet(fn_path, columns=columns)
-                    return df_hist[df_hist["datetime"] == params.period_to].reset_index(
-                        drop=True
-                    )
-                case datetime.datetime:
-                    raise NotImplementedError("to period type datetime.datetime")
-                case _:
-                    raise TypeError(
-                        f"period_to have incorrect type {type(params.period_to)}"
-                    )
-        else:
-            match type(params.period_from):
-                case builtins.int:
-                    if params.period_to is None:
-                        raise NotImplementedError("load from period_from to last year")
-                    if isinstance(params.period_to, int):
-                        raise NotImplementedError("Load from year to year")
-                    raise TypeError(
-                        f"Mismatch types period_from {type(params.period_from)} "
-                        f"and period_to {type(params.period_to)}"
-                    )
-                case datetime.date:
-                    if params.period_to is None:
-                        raise NotImplementedError("load from period_from to last year")
-                    if isinstance(params.period_to, datetime.date):
-                        raise NotImplementedError("Load from date to date")
-                    raise TypeError(
-                        f"Mismatch types period_from {type(params.period_from)} "
-                        f"and period_to {type(params.period_to)}"
-                    )
-                case datetime.datetime:
-                    raise NotImplementedError("period from datatime")
-                case _:
-                    raise TypeError(
-                        f"period_from have incorrect type {type(params.period_from)}"
-                    )
+        ts_from, ts_to = self._get_period_bounds(params)
+        fn_paths = self._get_period_files(asset_kind, asset_code, params.timeframe, ts_from, ts_to)
+        if not fn_paths:
+            raise FileNotFoundError(
+                f"There is no {asset_kind.value} {params.timeframe.value} history for {asset_code} "
+                f"from {params.period_from} to {params.period_to}"
+            )
+        filters = self._get_filters(asset_kind, params, ts_from, ts_to)
+        return self._read_files(fn_paths, columns, filters)
+
+    def _get_offset_index(self, fn_path: str) -> TimestampOffsetIndex:
+        """Index of history file from memory, sidecar file or built by timestamp column"""
+        offset_index = self._offset_indexes.get(fn_path)
+        if offset_index is None or not offset_index.is_actual():
+            offset_index = TimestampOffsetIndex.load(fn_path)
+            self._offset_indexes[fn_path] = offset_index
+        return offset_index
+
+    def _read_book_table(self, fn_path: str, ts_to: pd.Timestamp, columns: list, is_chain: bool = False,
+                         expiration_date: datetime.datetime | None = None) -> pa.Table | None:
+        """Rows of the last timestamp earlier than ts_to in file, None if file has no such timestamp.
+        For chain only rows of expiration date, the nearest not expired if it is None"""
+        if not self.OFFSET_INDEX_SUPPORTED:
+            read_columns = [OCl.TIMESTAMP.nm, OCl.EXPIRATION_DATE.nm] if is_chain else [OCl.TIMESTAMP.nm]
+            table = self._read_table(fn_path, columns=sorted(set(columns) | set(read_columns)),
+                                     filters=[(OCl.TIMESTAMP.nm, "<", ts_to)])
+            if table.num_rows == 0:
+                return None
+            timestamp = pc.max(table.column(OCl.TIMESTAMP.nm))
+            table = table.filter(pc.equal(table.column(OCl.TIMESTAMP.nm), timestamp))
+            if is_chain:
+                expirations = pc.unique(table.column(OCl.EXPIRATION_DATE.nm)).cast(
+                    pa.timestamp("ns", tz=datetime.UTC)).cast(pa.int64()).to_pylist()
+                expiration = self._get_chain_expiration(expirations, pd.Timestamp(timestamp.as_py()).value,
+                                                        expiration_date)
+                table = table.filter(pc.equal(table.column(OCl.EXPIRATION_DATE.nm),
+                                              pd.Timestamp(expiration, tz=datetime.UTC)))
+            return table.select(columns)
+        offset_index = self._get_offset_index(fn_path)
+        timestamp = offset_index.get_asof_timestamp(ts_to.value - 1)
+        if timestamp is None:
+            return None
+        filters = [(OCl.TIMESTAMP.nm, "==", pd.Timestamp(timestamp, tz=datetime.UTC))]
+        expiration = None
+        if is_chain:
+            expiration = self._get_chain_expiration(offset_index.get_expirations(timestamp), timestamp,
+                                                    expiration_date)
+            filters.append((OCl.EXPIRATION_DATE.nm, "==", pd.Timestamp(expiration, tz=datetime.UTC)))
+        if self._is_hot_file(fn_path):
+            return self._read_table(fn_path, columns=columns, filters=filters)
+        return offset_index.read(timestamp, columns=columns, expiration=expiration)
+
+    def _load_book(
+        self,
+        asset_kind: AssetKind,
+        asset_code: str,
+        settlement_datetime: datetime.datetime | None,
+        timeframe: Timeframe,
+        columns: list,
+        is_chain: bool = False,
+        expiration_date: datetime.datetime | None = None,
+    ) -> pd.DataFrame:
+        """Book of the last timestamp not later than settlement datetime, the last book of history if it is None.
+        Files are checked from the latest, only row groups with book rows are read"""
+        fn_paths, ts_to = self._get_book_files(asset_kind, asset_code, timeframe, settlement_datetime)
+        if ts_to is None:
+            ts_to = pd.Timestamp.max.tz_localize(datetime.UTC)
+        for fn_path in fn_paths:
+            table = self._read_book_table(fn_path, ts_to, columns, is_chain, expiration_date)
+            if table is not None:
+                return self._to_pandas(table)
+        raise self._get_book_error(asset_kind, asset_code, timeframe, settlement_datetime, is_chain)
+
+    def _iter_file_batches(
+        self, fn_path: str, columns: list, filters: list[tuple] | None, batch_rows: int
+    ) -> Iterator[pa.RecordBatch]:
+        """Batches of file in timestamp order. Files sorted by timestamp are read by batches, files sorted by
+        expiration first are read with projection and sorted, so memory is limited by one file partition"""
+        if self.OFFSET_INDEX_SUPPORTED and not self._is_hot_file(fn_path) and \
+                self._get_offset_index(fn_path).is_timestamp_ordered():
+            yield from iter_parquet_batches(fn_path, columns=columns, filters=filters, batch_rows=batch_rows)
+            return
+        table = self._read_table(fn_path, columns=list(dict.fromkeys(columns + [OCl.TIMESTAMP.nm])), filters=filters)
+        table = table.sort_by(OCl.TIMESTAMP.nm).select(columns)  # Stable sort keep order of rows for timestamp
+        yield from table.to_batches(max_chunksize=batch_rows)
+
+    def _iter_data_for_period(
+        self,
+        asset_kind: AssetKind,
+        asset_code: str,
+        params: RequestParameters,
+        columns: list,
+        batch_rows: int,
+        to_pandas: bool,
+    ) -> Iterator[pd.DataFrame | pa.RecordBatch]:
+        ts_from, ts_to = self._get_period_bounds(params)
+        fn_paths = self._get_period_files(asset_kind, asset_code, params.timeframe, ts_from, ts_to)
+        if not fn_paths:
+            raise FileNotFoundError(
+                f"There is no {asset_kind.value} {params.timeframe.value} history for {asset_code} "
+                f"from {params.period_from} to {params.period_to}"
+            )
+        filters = self._get_filters(asset_kind, params, ts_from, ts_to)
+        for fn_path in fn_paths:
+            for batch in self._iter_file_batches(fn_path, columns, filters, batch_rows):
+                yield self._to_pandas(pa.Table.from_batches([batch])) if to_pandas else batch
+
+    @validate_call
+    def iter_options_history(
+        self,
+        asset_code: str,
+        params: RequestParameters | None = None,
+        columns: list | None = None,
+        batch_rows: int | None = None,
+        to_pandas: bool = True,
+    ) -> Iterator[pd.DataFrame | pa.RecordBatch]:
+        """Options by period, timeframe as chunks up to batch_rows in timestamp order, files are read by parts"""
+        return self._iter_data_for_period(
+            asset_kind=AssetKind.OPTIONS,
+            asset_code=asset_code,
+            params=RequestParameters() if params is None else params,
+            columns=self.options_columns if columns is None else columns,
+            batch_rows=batch_rows or self.ITER_BATCH_ROWS,
+            to_pandas=to_pandas,
+        )
+
+    @validate_call
+    def iter_futures_history(
+        self,
+        asset_code: str,
+        params: RequestParameters | None = None,
+        columns: list | None = None,
+        batch_rows: int | None = None,
+        to_pandas: bool = True,
+    ) -> Iterator[pd.DataFrame | pa.RecordBatch]:
+        """Futures by period, timeframe as chunks up to batch_rows in timestamp order, files are read by parts"""
+        return self._iter_data_for_period(
+            asset_kind=AssetKind.FUTURES,
+            asset_code=asset_code,
+            params=RequestParameters() if params is None else params,
+            columns=self.futures_columns if columns is None else columns,
+            batch_rows=batch_rows or self.ITER_BATCH_ROWS,
+            to_pandas=to_pandas,
+        )
 
     @validate_call
     def load_options_history(
@@ -101,6 +270,7 @@ class PandasLocalFileProvider(AbstractFileProvider):
         )
         return df_hist
 
+    @validate_call
     def load_options_book(
         self,
         asset_code: str,
@@ -109,7 +279,13 @@ class PandasLocalFileProvider(AbstractFileProvider):
         columns: list | None = None,
     ) -> pd.DataFrame:
         """Provide options for datetime, timeframe"""
-        raise NotImplementedError
+        return self._load_book(
+            asset_kind=AssetKind.OPTIONS,
+            asset_code=asset_code,
+            settlement_datetime=settlement_datetime,
+            timeframe=timeframe,
+            columns=self.options_columns if columns is None else columns,
+        )
 
     @validate_call
     def load_futures_history(
@@ -140,7 +316,13 @@ class PandasLocalFileProvider(AbstractFileProvider):
         columns: list | None = None,
     ) -> pd.DataFrame:
         """Provide futures for datetime, timeframe"""
-        raise NotImplementedError
+        return self._load_book(
+            asset_kind=AssetKind.FUTURES,
+            asset_code=asset_code,
+            settlement_datetime=settlement_datetime,
+            timeframe=timeframe,
+            columns=self.futures_columns if columns is None else columns,
+        )
 
     @validate_call
     def load_options_chain(
@@ -151,5 +333,14 @@ class PandasLocalFileProvider(AbstractFileProvider):
         timeframe: Timeframe = Timeframe.EOD,
         columns: list | None = None,
     ) -> pd.DataFrame | None:
-        """Provide options chain by request to api if supported. Otherwise, return None"""
-        raise NotImplementedError
\ No newline at end of file
+        """Provide options chain for the last timestamp not later than settlement datetime and expiration date,
+        by default the nearest not expired. Only rows of chain are read by timestamp offset index"""
+        return self._load_book(
+            asset_kind=AssetKind.OPTIONS,
+            asset_code=asset_code,
+            settlement_datetime=settlement_datetime,
+            timeframe=timeframe,
+            columns=self.options_columns if columns is None else columns,
+            is_chain=True,
+            expiration_date=expiration_date,
+        )
@@ -0,0 +1,176 @@
+"""
+Timestamp offset index of history files
+Sidecar file FILE.parquet.timestamp_index.arrow maps every (timestamp, expiration) to row group and rows ranges in
+parquet file, so book or chain for one timestamp is read without scanning and filtering of other timestamps. Index is
+rebuilt when modification time or size of parquet file is changed
+"""
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+from options_lib.dictionary import OptionsColumns as OCl
+
+
+class TimestampOffsetIndex:
+    """Timestamp and expiration to parquet row group and rows ranges"""
+
+    SIDECAR_SUFFIX: str = ".timestamp_index.arrow"
+    INDEX_VERSION: bytes = b"2"
+    _INDEX_VERSION_KEY: bytes = b"index_version"
+    _SOURCE_MTIME_KEY: bytes = b"source_mtime_ns"
+    _SOURCE_SIZE_KEY: bytes = b"source_size"
+
+    def __init__(self, fn_path: str, timestamps: np.ndarray, expirations: np.ndarray, row_groups: np.ndarray,
+                 row_starts: np.ndarray, row_counts: np.ndarray, source_mtime_ns: int, source_size: int) -> None:
+        self.fn_path: str = fn_path
+        order = np.lexsort((row_starts, row_groups, expirations, timestamps))
+        self.timestamps: np.ndarray = timestamps[order]  # Nanoseconds UTC
+        self.expirations: np.ndarray = expirations[order]  # Nanoseconds UTC, NaT value for spot history
+        self.row_groups: np.ndarray = row_groups[order]
+        self.row_starts: np.ndarray = row_starts[order]
+        self.row_counts: np.ndarray = row_counts[order]
+        self.source_mtime_ns: int = source_mtime_ns
+        self.source_size: int = source_size
+
+    @classmethod
+    def get_sidecar_path(cls, fn_path: str) -> str:
+        """Path of index file for parquet file"""
+        return fn_path + cls.SIDECAR_SUFFIX
+
+    @classmethod
+    def build(cls, fn_path: str, write: bool = True) -> "TimestampOffsetIndex":
+        """Build index by timestamp and expiration columns of parquet file and save it to sidecar file"""
+        fn_stat = os.stat(fn_path)
+        parquet_file = pq.ParquetFile(fn_path)
+        columns = [column for column in [OCl.TIMESTAMP.nm, OCl.EXPIRATION_DATE.nm]
+                   if column in parquet_file.schema_arrow.names]
+        timestamps, expirations, row_groups, row_starts, row_counts = [], [], [], [], []
+        for row_group in range(parquet_file.metadata.num_row_groups):
+            table = parquet_file.read_row_group(row_group, columns=columns)
+            if table.num_rows == 0:
+                continue
+            values = cls._to_ns(table.column(OCl.TIMESTAMP.nm))
+            expiration_values = cls._to_ns(table.column(OCl.EXPIRATION_DATE.nm)) \
+                if OCl.EXPIRATION_DATE.nm in columns else np.full(len(values), pd.NaT.value, dtype=np.int64)
+            # Range is continuous rows with the same timestamp and expiration
+            starts = np.concatenate([[0], np.flatnonzero((np.diff(values) != 0) |
+                                                         (np.diff(expiration_values) != 0)) + 1])
+            timestamps.append(values[starts])
+            expirations.append(expiration_values[starts])
+            row_groups.append(np.full(len(starts), row_group, dtype=np.int32))
+            row_starts.append(starts.astype(np.int64))
+            row_counts.append(np.diff(np.append(starts, len(values))).astype(np.int64))
+        index = cls(fn_path, *(np.concatenate(values) if values else np.array([], dtype=np.int64)
+                               for values in [timestamps, expirations, row_groups, row_starts, row_counts]),
+                    source_mtime_ns=fn_stat.st_mtime_ns, source_size=fn_stat.st_size)
+        if write:
+            index.write()
+        return index
+
+    @staticmethod
+    def _to_ns(column: pa.ChunkedArray) -> np.ndarray:
+        values = column.cast(pa.timestamp("ns", tz=column.type.tz)).cast(pa.int64())
+        return values.fill_null(pd.NaT.value).to_numpy()
+
+    def write(self) -> None:
+        """Save index to sidecar file, index is kept only in memory if folder is read only"""
+        table = pa.table({"timestamp": self.timestamps, "expiration": self.expirations, "row_group": self.row_groups,
+                          "row_start": self.row_starts, "row_count": self.row_counts})
+        table = table.replace_schema_metadata({self._INDEX_VERSION_KEY: self.INDEX_VERSION,
+                                               self._SOURCE_MTIME_KEY: str(self.source_mtime_ns),
+                                               self._SOURCE_SIZE_KEY: str(self.source_size)})
+        sidecar_path = self.get_sidecar_path(self.fn_path)
+        tmp_path = f"{sidecar_path}.{os.getpid()}.tmp"
+        try:
+            feather.write_feather(table, tmp_path, compression="uncompressed")
+            os.replace(tmp_path, sidecar_path)
+        except OSError as err:
+            print(f"[WARNING] timestamp index is not saved for {self.fn_path}: {err}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def load(cls, fn_path: str) -> "TimestampOffsetIndex":
+        """Load index from sidecar file, build it if sidecar is absent or parquet file is changed"""
+        fn_stat = os.stat(fn_path)
+        sidecar_path = cls.get_sidecar_path(fn_path)
+        if os.path.isfile(sidecar_path):
+            table = feather.read_table(sidecar_path, memory_map=True)
+            metadata = table.schema.metadata or {}
+            if metadata.get(cls._INDEX_VERSION_KEY) == cls.INDEX_VERSION and \
+                    metadata.get(cls._SOURCE_MTIME_KEY) == str(fn_stat.st_mtime_ns).encode() and \
+                    metadata.get(cls._SOURCE_SIZE_KEY) == str(fn_stat.st_size).encode():
+                return cls(fn_path, *(table.column(column).to_numpy() for column in
+                                      ["timestamp", "expiration", "row_group", "row_start", "row_count"]),
+                           source_mtime_ns=fn_stat.st_mtime_ns, source_size=fn_stat.st_size)
+        return cls.build(fn_path)
+
+    @classmethod
+    def remove(cls, fn_path: str) -> None:
+        """Remove sidecar file of removed parquet file"""
+        try:
+            os.remove(cls.get_sidecar_path(fn_path))
+        except FileNotFoundError:
+            pass
+
+    def is_actual(self) -> bool:
+        """Parquet file is not changed after index was built"""
+        try:
+            fn_stat = os.stat(self.fn_path)
+        except FileNotFoundError:
+            return False
+        return fn_stat.st_mtime_ns == self.source_mtime_ns and fn_stat.st_size == self.source_size
+
+    def get_asof_timestamp(self, timestamp: int) -> int | None:
+        """The latest timestamp in file which is not later than timestamp in nanoseconds"""
+        position = np.searchsorted(self.timestamps, timestamp, side="right")
+        return None if position == 0 else int(self.timestamps[position - 1])
+
+    def get_last_timestamp(self) -> int | None:
+        """The latest timestamp in file"""
+        return int(self.timestamps[-1]) if len(self.timestamps) else None
+
+    def is_timestamp_ordered(self) -> bool:
+        """Rows of file are sorted by timestamp, so file can be read by batches in timestamp order"""
+        file_order = np.lexsort((self.row_starts, self.row_groups))
+        return bool(np.all(np.diff(self.timestamps[file_order]) >= 0))
+
+    def _get_positions(self, timestamp: int) -> slice:
+        start, end = np.searchsorted(self.timestamps, [timestamp, timestamp + 1])
+        return slice(start, end)
+
+    def get_expirations(self, timestamp: int) -> list[int]:
+        """Expirations of timestamp in nanoseconds"""
+        return np.unique(self.expirations[self._get_positions(timestamp)]).tolist()
+
+    def get_ranges(self, timestamp: int, expiration: int | None = None) -> list[tuple[int, int, int]]:
+        """Row group, start row in row group and rows number for timestamp and optionally expiration in nanoseconds"""
+        positions = self._get_positions(timestamp)
+        if expiration is not None:
+            expirations = self.expirations[positions]
+            start, end = np.searchsorted(expirations, [expiration, expiration + 1])
+            positions = slice(positions.start + start, positions.start + end)
+        return list(zip(self.row_groups[positions].tolist(), self.row_starts[positions].tolist(),
+                        self.row_counts[positions].tolist()))
+
+    def read(self, timestamp: int, columns: list | None = None, expiration: int | None = None) -> pa.Table:
+        """Read rows of timestamp and optionally expiration, only row groups with these rows are read"""
+        parquet_file = pq.ParquetFile(self.fn_path)
+        ranges = self.get_ranges(timestamp, expiration)
+        if not ranges:
+            schema = parquet_file.schema_arrow
+            return schema.empty_table() if columns is None else schema.empty_table().select(columns)
+        merged_ranges = []  # Adjacent ranges are sliced once
+        for row_group, row_start, row_count in sorted(ranges):
+            if merged_ranges and merged_ranges[-1][0] == row_group and \
+                    merged_ranges[-1][1] + merged_ranges[-1][2] == row_start:
+                merged_ranges[-1][2] += row_count
+            else:
+                merged_ranges.append([row_group, row_start, row_count])
+        row_groups = sorted({row_group for row_group, _, _ in merged_ranges})
+        row_group_tables = dict(zip(row_groups, (parquet_file.read_row_group(row_group, columns=columns)
+                                                 for row_group in row_groups)))
+        return pa.concat_tables([row_group_tables[row_group].slice(row_start, row_count)
+                                 for row_group, row_start, row_count in merged_ranges])
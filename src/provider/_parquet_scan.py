@@ -0,0 +1,108 @@
+"""
+Parquet scan with predicate pushdown
+Row groups are skipped by column chunk statistics before reading, rest of rows filtered by arrow before
+conversion to pandas. Filters use pyarrow DNF format: [(column, op, value), ...] joined by AND
+"""
+import datetime
+from typing import Iterator
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+_PRUNE_OPERATIONS = {
+    '==': lambda col_min, col_max, value: col_min <= value <= col_max,
+    '=': lambda col_min, col_max, value: col_min <= value <= col_max,
+    '>': lambda col_min, col_max, value: col_max > value,
+    '>=': lambda col_min, col_max, value: col_max >= value,
+    '<': lambda col_min, col_max, value: col_min < value,
+    '<=': lambda col_min, col_max, value: col_min <= value,
+    'in': lambda col_min, col_max, values: any(col_min <= value <= col_max for value in values),
+}
+
+_TIMESTAMP_UNIT_NS = {'s': 1_000_000_000, 'ms': 1_000_000, 'us': 1_000, 'ns': 1}
+
+
+def _to_physical_value(value, arrow_type: pa.DataType):
+    """Convert filter value to parquet physical value to compare with raw statistics, None if not supported"""
+    if isinstance(value, (list, tuple, set)):
+        values = [_to_physical_value(val, arrow_type) for val in value]
+        return None if any(val is None for val in values) else values
+    if pa.types.is_timestamp(arrow_type):
+        timestamp = pd.Timestamp(value)
+        if timestamp.tzinfo is None and arrow_type.tz is not None:
+            timestamp = timestamp.tz_localize(datetime.UTC)
+        unit_ns = _TIMESTAMP_UNIT_NS[arrow_type.unit]
+        value_ns = timestamp.as_unit('ns').value  # Value of pandas timestamp is nanoseconds for any unit
+        return value_ns // unit_ns if value_ns % unit_ns == 0 else None  # Truncated value can prune matched rows
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return value.encode('utf-8') if isinstance(value, str) else None
+    if pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type):
+        return value if isinstance(value, (int, float)) else None
+    return None
+
+
+def prune_row_groups(metadata: pq.FileMetaData, schema: pa.Schema, filters: list[tuple] | None) -> list[int]:
+    """Row groups which statistics can match all filters"""
+    row_groups = list(range(metadata.num_row_groups))
+    if not filters:
+        return row_groups
+    column_names = metadata.schema.names
+    prune_filters = []
+    for column, operation, value in filters:
+        if column not in column_names or operation not in _PRUNE_OPERATIONS:
+            continue
+        physical_value = _to_physical_value(value, schema.field(column).type)
+        if physical_value is not None:
+            prune_filters.append((column_names.index(column), _PRUNE_OPERATIONS[operation], physical_value))
+    matched_row_groups = []
+    for row_group in row_groups:
+        row_group_metadata = metadata.row_group(row_group)
+        for column_idx, is_matched, value in prune_filters:
+            statistics = row_group_metadata.column(column_idx).statistics
+            if statistics is None or not statistics.has_min_max:
+                continue
+            if not is_matched(statistics.min_raw, statistics.max_raw, value):
+                break
+        else:
+            matched_row_groups.append(row_group)
+    return matched_row_groups
+
+
+def read_parquet_table(source: str | pq.ParquetFile, columns: list | None = None,
+                       filters: list[tuple] | None = None) -> pa.Table:
+    """Read parquet file with projection and filters pushed down to row groups"""
+    parquet_file = source if isinstance(source, pq.ParquetFile) else pq.ParquetFile(source)
+    if not filters:
+        return parquet_file.read(columns=columns)
+    schema = parquet_file.schema_arrow
+    row_groups = prune_row_groups(parquet_file.metadata, schema, filters)
+    filter_columns = [column for column, _, _ in filters]
+    read_columns = None if columns is None else list(dict.fromkeys(columns + filter_columns))
+    if not row_groups:
+        table = schema.empty_table() if read_columns is None else schema.empty_table().select(read_columns)
+    else:
+        table = parquet_file.read_row_groups(row_groups, columns=read_columns)
+    table = table.filter(pq.filters_to_expression(filters))
+    return table if columns is None else table.select(columns)
+
+
+def iter_parquet_batches(source: str | pq.ParquetFile, columns: list | None = None,
+                         filters: list[tuple] | None = None, batch_rows: int = 100_000) -> Iterator[pa.RecordBatch]:
+    """Read parquet file by record batches up to batch_rows with projection and filters pushed down to row groups,
+    only one batch is decoded at a time"""
+    parquet_file = source if isinstance(source, pq.ParquetFile) else pq.ParquetFile(source)
+    row_groups = prune_row_groups(parquet_file.metadata, parquet_file.schema_arrow, filters)
+    if not row_groups:
+        return
+    read_columns = columns
+    if filters and columns is not None:
+        read_columns = list(dict.fromkeys(columns + [column for column, _, _ in filters]))
+    expression = pq.filters_to_expression(filters) if filters else None
+    for batch in parquet_file.iter_batches(batch_size=batch_rows, row_groups=row_groups, columns=read_columns):
+        if expression is not None:
+            table = pa.Table.from_batches([batch]).filter(expression)
+            if columns is not None:
+                table = table.select(columns)
+            batch = table.combine_chunks().to_batches()[0] if table.num_rows else None
+        if batch is not None and batch.num_rows:
+            yield batch
@@ -0,0 +1,62 @@
+"""
+Parquet writer for history files
+Rows are sorted by key columns and split to row groups aligned with values of the first sort column (trading day by
+default), so timestamp statistics of row groups don't overlap and period requests, books reads and iterators skip most
+of the file. Expiration and strike inside the day are pruned by page indexes
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from options_lib.dictionary import OptionsColumns as OCl
+
+DEFAULT_SORT_COLUMNS = [OCl.TIMESTAMP.nm, OCl.EXPIRATION_DATE.nm, OCl.STRIKE.nm]
+DEFAULT_ROW_GROUP_ROWS = 100_000
+
+
+def get_row_group_bounds(key: pa.ChunkedArray | pa.Array, row_group_rows: int = DEFAULT_ROW_GROUP_ROWS
+                         ) -> list[tuple[int, int]]:
+    """Row groups [start, end) for sorted key. Timestamps aligned by day. Consecutive key values are merged while
+    row group less than row_group_rows, key value with more rows is split. Zero row_group_rows - row group per value"""
+    if pa.types.is_timestamp(key.type):
+        key = pc.floor_temporal(key, unit='day')
+    codes, _ = pd.factorize(key.to_numpy(zero_copy_only=False))
+    if len(codes) == 0:
+        return []
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(codes)) + 1]).tolist()
+    ends = starts[1:] + [len(codes)]
+    if row_group_rows <= 0:
+        return list(zip(starts, ends))
+    bounds = []
+    group_start = 0
+    for key_start, key_end in zip(starts, ends):
+        if key_end - group_start > row_group_rows and key_start > group_start:
+            bounds.append((group_start, key_start))
+            group_start = key_start
+        while key_end - group_start > row_group_rows:
+            bounds.append((group_start, group_start + row_group_rows))
+            group_start += row_group_rows
+    if group_start < len(codes):
+        bounds.append((group_start, len(codes)))
+    return bounds
+
+
+def write_history_parquet(df: pd.DataFrame, fn_path: str, sort_columns: list[str] | None = None,
+                          row_group_rows: int = DEFAULT_ROW_GROUP_ROWS):
+    """Write dataframe sorted by existed sort columns with aligned row groups, statistics and page index"""
+    sort_columns = DEFAULT_SORT_COLUMNS if sort_columns is None else sort_columns
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    del df
+    sort_columns = [column for column in sort_columns if column in table.column_names]
+    if sort_columns:
+        table = table.sort_by([(column, 'ascending') for column in sort_columns])
+        bounds = get_row_group_bounds(table.column(sort_columns[0]), row_group_rows)
+    else:
+        bounds = [(0, table.num_rows)]
+    with pq.ParquetWriter(fn_path, table.schema, write_statistics=True, write_page_index=True) as writer:
+        if not bounds:
+            writer.write_table(table)
+        for start, end in bounds:
+            writer.write_table(table.slice(start, end - start), row_group_size=end - start)
@@ -0,0 +1,215 @@
+"""
+Local provider by Polars
+The same files layout as for pandas local provider. History is scanned lazily, only requested columns are read and
+period and option filters are pushed down to parquet scan, query is executed by polars on all cores.
+Data is converted to pandas only at the end if it is requested
+
+Polars is optional dependency: poetry install --with polars
+"""
+
+import datetime
+import operator
+from pydantic import validate_call
+import pandas as pd
+from options_lib.dictionary import Timeframe, AssetKind, OptionsColumns as OCl
+from provider._file_provider import AbstractFileProvider
+from provider._provider_entities import RequestParameters
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+_FILTER_OPERATIONS = {
+    '==': operator.eq,
+    '=': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+}
+
+
+class PolarsLocalFileProvider(AbstractFileProvider):
+    """Load data from files by Polars"""
+
+    def __init__(self, exchange_code: str, data_path: str) -> None:
+        if pl is None:
+            raise ImportError("Polars is not installed, install it by: poetry install --with polars")
+        super().__init__(exchange_code, data_path)
+
+    @staticmethod
+    def _to_expression(filters: list[tuple] | None) -> "pl.Expr | None":
+        """Convert pyarrow DNF filters to polars expression"""
+        if not filters:
+            return None
+        expressions = []
+        for column, operation, value in filters:
+            if isinstance(value, pd.Timestamp):
+                value = value.to_pydatetime()
+            if operation == 'in':
+                expressions.append(pl.col(column).is_in(list(value)))
+            else:
+                expressions.append(_FILTER_OPERATIONS[operation](pl.col(column), pl.lit(value)))
+        return pl.all_horizontal(expressions)
+
+    def _scan_data_for_period(
+        self,
+        asset_kind: AssetKind,
+        asset_code: str,
+        params: RequestParameters,
+        columns: list,
+    ) -> "pl.LazyFrame":
+        ts_from, ts_to = self._get_period_bounds(params)
+        fn_paths = self._get_period_files(asset_kind, asset_code, params.timeframe, ts_from, ts_to)
+        if not fn_paths:
+            raise FileNotFoundError(
+                f"There is no {asset_kind.value} {params.timeframe.value} history for {asset_code} "
+                f"from {params.period_from} to {params.period_to}"
+            )
+        lf = pl.scan_parquet(fn_paths, hive_partitioning=False, missing_columns='insert', extra_columns='ignore')
+        expression = self._to_expression(self._get_filters(asset_kind, params, ts_from, ts_to))
+        if expression is not None:
+            lf = lf.filter(expression)
+        return lf.select(columns)
+
+    def _load_book(
+        self,
+        asset_kind: AssetKind,
+        asset_code: str,
+        settlement_datetime: datetime.datetime | None,
+        timeframe: Timeframe,
+        columns: list,
+        is_chain: bool = False,
+        expiration_date: datetime.datetime | None = None,
+    ) -> pd.DataFrame:
+        """Book of the last timestamp not later than settlement datetime, the last book of history if it is None.
+        Files are scanned from the latest with timestamp filter pushed down"""
+        fn_paths, ts_to = self._get_book_files(asset_kind, asset_code, timeframe, settlement_datetime)
+        timestamp_type = pl.Datetime("ns", "UTC")
+        for fn_path in fn_paths:
+            lf = pl.scan_parquet(fn_path, hive_partitioning=False)
+            if ts_to is not None:
+                lf = lf.filter(pl.col(OCl.TIMESTAMP.nm) < pl.lit(ts_to.value).cast(timestamp_type))
+            timestamp = lf.select(pl.col(OCl.TIMESTAMP.nm).max().dt.epoch("ns")).collect().item()
+            if timestamp is None:
+                continue
+            lf = lf.filter(pl.col(OCl.TIMESTAMP.nm) == pl.lit(timestamp).cast(timestamp_type))
+            if is_chain:
+                expirations = lf.select(pl.col(OCl.EXPIRATION_DATE.nm).unique().dt.epoch("ns")).collect()
+                expiration = self._get_chain_expiration(expirations.to_series().to_list(), timestamp,
+                                                        expiration_date)
+                lf = lf.filter(pl.col(OCl.EXPIRATION_DATE.nm) == pl.lit(expiration).cast(timestamp_type))
+            return lf.select(columns).collect().to_pandas()
+        raise self._get_book_error(asset_kind, asset_code, timeframe, settlement_datetime, is_chain)
+
+    @staticmethod
+    def _collect(lf: "pl.LazyFrame", to_pandas: bool) -> "pd.DataFrame | pl.DataFrame":
+        df = lf.collect()
+        return df.to_pandas() if to_pandas else df
+
+    @validate_call
+    def scan_options_history(
+        self,
+        asset_code: str,
+        params: RequestParameters | None = None,
+        columns: list | None = None,
+    ) -> "pl.LazyFrame":
+        """Lazy frame of options by period, timeframe to continue query in polars"""
+        return self._scan_data_for_period(
+            asset_kind=AssetKind.OPTIONS,
+            asset_code=asset_code,
+            params=RequestParameters() if params is None else params,
+            columns=self.options_columns if columns is None else columns,
+        )
+
+    @validate_call
+    def scan_futures_history(
+        self,
+        asset_code: str,
+        params: RequestParameters | None = None,
+        columns: list | None = None,
+    ) -> "pl.LazyFrame":
+        """Lazy frame of futures by period, timeframe to continue query in polars"""
+        return self._scan_data_for_period(
+            asset_kind=AssetKind.FUTURES,
+            asset_code=asset_code,
+            params=RequestParameters() if params is None else params,
+            columns=self.futures_columns if columns is None else columns,
+        )
+
+    def load_options_history(
+        self,
+        asset_code: str,
+        params: RequestParameters | None = None,
+        columns: list | None = None,
+        to_pandas: bool = True,
+    ) -> "pd.DataFrame | pl.DataFrame":
+        """Load option by period, timeframe. Polars dataframe if to_pandas is False"""
+        return self._collect(self.scan_options_history(asset_code, params, columns), to_pandas)
+
+    @validate_call
+    def load_options_book(
+        self,
+        asset_code: str,
+        settlement_datetime: datetime.datetime | None = None,
+        timeframe: Timeframe = Timeframe.EOD,
+        columns: list | None = None,
+    ) -> pd.DataFrame:
+        """Provide options for datetime, timeframe"""
+        return self._load_book(
+            asset_kind=AssetKind.OPTIONS,
+            asset_code=asset_code,
+            settlement_datetime=settlement_datetime,
+            timeframe=timeframe,
+            columns=self.options_columns if columns is None else columns,
+        )
+
+    def load_futures_history(
+        self,
+        asset_code: str,
+        params: RequestParameters | None = None,
+        columns: list | None = None,
+        to_pandas: bool = True,
+    ) -> "pd.DataFrame | pl.DataFrame":
+        """Load futures data for asset code. Polars dataframe if to_pandas is False"""
+        return self._collect(self.scan_futures_history(asset_code, params, columns), to_pandas)
+
+    @validate_call
+    def load_futures_book(
+        self,
+        asset_code: str,
+        settlement_datetime: datetime.datetime | None = None,
+        timeframe: Timeframe = Timeframe.EOD,
+        columns: list | None = None,
+    ) -> pd.DataFrame:
+        """Provide futures for datetime, timeframe"""
+        return self._load_book(
+            asset_kind=AssetKind.FUTURES,
+            asset_code=asset_code,
+            settlement_datetime=settlement_datetime,
+            timeframe=timeframe,
+            columns=self.futures_columns if columns is None else columns,
+        )
+
+    @validate_call
+    def load_options_chain(
+        self,
+        asset_code: str,
+        settlement_datetime: datetime.datetime | None = None,
+        expiration_date: datetime.datetime | None = None,
+        timeframe: Timeframe = Timeframe.EOD,
+        columns: list | None = None,
+    ) -> pd.DataFrame | None:
+        """Provide options chain for the last timestamp not later than settlement datetime and expiration date,
+        by default the nearest not expired"""
+        return self._load_book(
+            asset_kind=AssetKind.OPTIONS,
+            asset_code=asset_code,
+            settlement_datetime=settlement_datetime,
+            timeframe=timeframe,
+            columns=self.options_columns if columns is None else columns,
+            is_chain=True,
+            expiration_date=expiration_date,
+        )
@@ -4,7 +4,7 @@ import enum
 import datetime
 
 from pydantic import BaseModel
-from options_lib.dictionary import Timeframe
+from options_lib.dictionary import Timeframe, OptionsType
 
 
 class DataEngine(enum.Enum):
@@ -24,9 +24,21 @@ class DataSource(enum.Enum):
     API = "api"
 
 
+class HistoryLayout(enum.Enum):
+    """Layout of history files in EXCHANGE_CODE/ASSET_CODE/ASSET_KIND/TIMEFRAME_CODE folder"""
+
+    YEAR = "year"  # YEAR.parquet
+    MONTH = "month"  # year=YEAR/month=MM/data.parquet - hive style partitions for intraday timeframes
+
+
 class RequestParameters(BaseModel):
     """Parameters to request provider data"""
 
     period_from: int | datetime.date | datetime.datetime | None = None
     period_to: int | datetime.date | datetime.datetime | None = None
     timeframe: Timeframe = Timeframe.EOD
+    # Filters pushed down to storage, options only filters are ignored for futures and spot
+    expiration_date: datetime.date | datetime.datetime | None = None
+    option_type: OptionsType | None = None
+    strike_from: float | None = None
+    strike_to: float | None = None
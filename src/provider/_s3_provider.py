@@ -0,0 +1,56 @@
+"""
+S3 compatible object storage provider
+The same files layout as for local provider in BUCKET/PREFIX/EXCHANGE_CODE/... Parquet files are read by ranges:
+footer first and then only row groups and columns that are required by request, column chunks are requested
+concurrently. Read ranges are kept in size limited disk block cache, so repeated requests do not go to storage
+"""
+
+import pyarrow as pa
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+from provider._local_provider import PandasLocalFileProvider
+from provider._parquet_scan import read_parquet_table
+from provider._block_cache import DiskBlockCache
+
+
+class PandasS3FileProvider(PandasLocalFileProvider):
+    """Load data from S3 compatible storage by Pandas"""
+
+    CATALOG_SUPPORTED: bool = False
+    OFFSET_INDEX_SUPPORTED: bool = False
+
+    def __init__(self, exchange_code: str, data_path: str, filesystem: pafs.FileSystem | None = None,
+                 endpoint_url: str | None = None, cache_path: str | None = None,
+                 cache_size: int = DiskBlockCache.DEFAULT_MAX_SIZE, block_size: int = DiskBlockCache.DEFAULT_BLOCK_SIZE,
+                 compact_dtypes: bool = False, float32: bool = False) -> None:
+        """data_path - BUCKET/PREFIX. By default S3 filesystem with credentials from environment, endpoint_url for
+        S3 compatible storages like MinIO. Without cache_path files are read by ranges directly from storage"""
+        if filesystem is None:
+            filesystem = pafs.S3FileSystem(endpoint_override=endpoint_url) if endpoint_url else pafs.S3FileSystem()
+        self._filesystem: pafs.FileSystem = filesystem
+        self._block_cache: DiskBlockCache | None = None
+        if cache_path is not None:
+            self._block_cache = DiskBlockCache(cache_path, max_size=cache_size, block_size=block_size)
+        super().__init__(exchange_code, data_path, compact_dtypes=compact_dtypes, float32=float32)
+
+    @staticmethod
+    def _normalize_path(path: str) -> str:
+        return "/".join(part for part in path.replace("s3://", "", 1).split("/") if part not in ("", "."))
+
+    def _listdir(self, path: str) -> list[str]:
+        file_infos = self._filesystem.get_file_info(pafs.FileSelector(path, allow_not_found=True))
+        return [file_info.base_name for file_info in file_infos]
+
+    def _isdir(self, path: str) -> bool:
+        return self._filesystem.get_file_info(path).type == pafs.FileType.Directory
+
+    def _isfile(self, path: str) -> bool:
+        return self._filesystem.get_file_info(path).type == pafs.FileType.File
+
+    def _read_table(self, fn_path: str, columns: list | None, filters: list[tuple] | None = None) -> pa.Table:
+        source = self._filesystem.open_input_file(fn_path) if self._block_cache is None else \
+            self._block_cache.open(self._filesystem, fn_path)
+        with source:
+            # Column chunks of row groups are requested by coalesced concurrent ranges
+            parquet_file = pq.ParquetFile(source, pre_buffer=True)
+            return read_parquet_table(parquet_file, columns=columns, filters=filters)
@@ -0,0 +1,58 @@
+"""Benchmark of exchange cache bookkeeping: hits and inserts with eviction do not depend on number of entries"""
+# pylint: disable=missing-function-docstring
+import time
+import pandas as pd
+
+from exchange import Cache
+
+SMALL_ENTRIES = 1_000
+LARGE_ENTRIES = 8_000
+MAX_SLOWDOWN = 3  # Expected about 1 for O(1) hits and O(log n) eviction, limited to be stable on loaded CI runners
+
+
+class _BookkeepingCache(Cache):
+    """Cache with constant size measurement, so only bookkeeping is measured"""
+
+    def __init__(self, entries: int):
+        super().__init__()
+        self.max_cache_memory = entries
+        self.max_cached_df_size = entries
+
+    @staticmethod
+    def get_df_memory_usage(df):
+        return 1
+
+
+def _measure(entries: int) -> tuple[float, float]:
+    """Seconds per hit and per insert with eviction for full cache"""
+    cache = _BookkeepingCache(entries)
+    df = pd.DataFrame({'value': [1.]})
+    for key in range(entries):
+        cache._set_cache(df, key, 'benchmark')
+    keys = list(range(entries))
+    start = time.perf_counter()
+    for _ in range(5):
+        for key in keys:
+            cache._get_cache(key)
+    hit_time = (time.perf_counter() - start) / (5 * entries)
+    start = time.perf_counter()
+    for key in range(entries, 2 * entries):
+        cache._set_cache(df, key, 'benchmark')  # Every insert evict the least requested entry
+    insert_time = (time.perf_counter() - start) / entries
+    assert len(cache.entries) == entries
+    return hit_time, insert_time
+
+
+def _best_measure(entries: int, repeat: int = 3) -> tuple[float, float]:
+    measures = [_measure(entries) for _ in range(repeat)]
+    return min(hit_time for hit_time, _ in measures), min(insert_time for _, insert_time in measures)
+
+
+def test_cache_bookkeeping_does_not_depend_on_entries():
+    small_hit_time, small_insert_time = _best_measure(SMALL_ENTRIES)
+    large_hit_time, large_insert_time = _best_measure(LARGE_ENTRIES)
+    print(f'\nhit: {small_hit_time * 1e6:.1f}us for {SMALL_ENTRIES}, {large_hit_time * 1e6:.1f}us for {LARGE_ENTRIES}'
+          f'\ninsert with eviction: {small_insert_time * 1e6:.1f}us for {SMALL_ENTRIES}, '
+          f'{large_insert_time * 1e6:.1f}us for {LARGE_ENTRIES}')
+    assert large_hit_time < small_hit_time * MAX_SLOWDOWN
+    assert large_insert_time < small_insert_time * MAX_SLOWDOWN
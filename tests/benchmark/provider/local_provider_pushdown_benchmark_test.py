@@ -0,0 +1,72 @@
+"""Benchmark of predicate pushdown for single day reads from year history file"""
+# pylint: disable=missing-function-docstring
+import datetime
+import os
+import time
+import numpy as np
+import pandas as pd
+import pytest
+
+from options_lib.dictionary import AssetKind, Timeframe, OptionsType, OptionsColumns as OCl
+from provider import PandasLocalFileProvider, RequestParameters
+
+BENCHMARK_EXCHANGE_CODE = 'BENCHMARK'
+BENCHMARK_ASSET_CODE = 'BTC'
+BENCHMARK_YEAR = 2024
+BENCHMARK_TIMESTAMPS_IN_DAY = 24
+BENCHMARK_INSTRUMENTS = 200
+MIN_SPEEDUP = 10  # Expected much more, limited to be stable on loaded CI runners
+
+
+@pytest.fixture(name='year_history_path', scope='module')
+def year_history_path_fixture(tmp_path_factory) -> str:
+    """Year of hourly options history, row groups by day like history written sorted by timestamp"""
+    history_path = str(tmp_path_factory.mktemp('history'))
+    timestamps = pd.date_range(f'{BENCHMARK_YEAR}-01-01', f'{BENCHMARK_YEAR}-12-31 23:00', freq='1h',
+                               tz=datetime.UTC)
+    rows_num = len(timestamps) * BENCHMARK_INSTRUMENTS
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        OCl.TIMESTAMP.nm: np.repeat(timestamps, BENCHMARK_INSTRUMENTS),
+        OCl.EXPIRATION_DATE.nm: pd.Timestamp(f'{BENCHMARK_YEAR + 1}-01-01', tz=datetime.UTC),
+        OCl.STRIKE.nm: np.tile(np.arange(BENCHMARK_INSTRUMENTS // 2, dtype=float).repeat(2) * 1000, len(timestamps)),
+        OCl.OPTION_TYPE.nm: np.tile([OptionsType.CALL.code, OptionsType.PUT.code],
+                                    rows_num // 2),
+        OCl.PRICE.nm: rng.random(rows_num),
+        OCl.ASK.nm: rng.random(rows_num),
+        OCl.BID.nm: rng.random(rows_num),
+        OCl.OPEN_INTEREST.nm: rng.random(rows_num),
+    })
+    history_folder = os.path.join(history_path, BENCHMARK_EXCHANGE_CODE, BENCHMARK_ASSET_CODE,
+                                  AssetKind.OPTIONS.value, Timeframe.MINUTE_5.value)
+    os.makedirs(history_folder)
+    df.to_parquet(os.path.join(history_folder, f'{BENCHMARK_YEAR}.parquet'),
+                  row_group_size=BENCHMARK_TIMESTAMPS_IN_DAY * BENCHMARK_INSTRUMENTS)
+    return history_path
+
+
+def _best_time(func, repeat: int = 3) -> float:
+    times = []
+    for _ in range(repeat):
+        start_tm = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start_tm)
+    return min(times)
+
+
+def test_single_day_read_faster_than_year_read(year_history_path):
+    provider = PandasLocalFileProvider(BENCHMARK_EXCHANGE_CODE, year_history_path)
+    columns = [OCl.TIMESTAMP.nm, OCl.STRIKE.nm, OCl.OPTION_TYPE.nm, OCl.PRICE.nm, OCl.ASK.nm, OCl.BID.nm]
+    year_params = RequestParameters(period_to=BENCHMARK_YEAR, timeframe=Timeframe.MINUTE_5)
+    day_params = RequestParameters(period_to=datetime.date(BENCHMARK_YEAR, 6, 15), timeframe=Timeframe.MINUTE_5)
+
+    df_day = provider.load_options_history(BENCHMARK_ASSET_CODE, params=day_params, columns=columns)
+    assert len(df_day) == BENCHMARK_TIMESTAMPS_IN_DAY * BENCHMARK_INSTRUMENTS
+
+    year_time = _best_time(lambda: provider.load_options_history(BENCHMARK_ASSET_CODE, params=year_params,
+                                                                 columns=columns))
+    day_time = _best_time(lambda: provider.load_options_history(BENCHMARK_ASSET_CODE, params=day_params,
+                                                                columns=columns))
+    print(f'\nYear read {year_time * 1000:.1f} ms, single day read {day_time * 1000:.1f} ms, '
+          f'speedup x{year_time / day_time:.0f}')
+    assert year_time / day_time > MIN_SPEEDUP
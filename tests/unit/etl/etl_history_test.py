@@ -1,9 +1,12 @@
 import datetime
+import os
 from functools import lru_cache
 import pandas as pd
+import pyarrow.parquet as pq
 import pytest
 from options_lib.dictionary import Timeframe, AssetKind
-from options_lib.dictionary import OptionsColumns as OCl
+from options_lib.dictionary import OptionsColumns as OCl, FuturesColumns as FCl
+from provider import HistoryLayout, RequestParameters
 from options_etl.etl_updates_to_history import EtlHistory
 from exchange.exchange_entities import ExchangeCode
 
@@ -148,3 +151,114 @@ def test_get_update_timeframes_files(etl_history_future):
 
 # def test_file_pattern(etl_history):
 #     etl_history.prepare()
+
+
+def _write_futures_update(update_path: str, timestamp: pd.Timestamp) -> str:
+    update_folder = os.path.join(update_path, 'TEST', 'BTC', AssetKind.FUTURES.value, Timeframe.EOD.value,
+                                 str(timestamp.year))
+    os.makedirs(update_folder, exist_ok=True)
+    df = pd.DataFrame({FCl.TIMESTAMP.nm: [timestamp, timestamp],
+                       FCl.EXPIRATION_DATE.nm: [pd.Timestamp('2024-06-28', tz=datetime.UTC),
+                                                pd.Timestamp('2024-12-27', tz=datetime.UTC)],
+                       FCl.ASSET_CODE.nm: ['BTC-28JUN24', 'BTC-27DEC24'],
+                       FCl.PRICE.nm: [100., 110.]})
+    fn = os.path.join(update_folder, f'{timestamp.strftime("%y-%m-%d")}.parquet')
+    df.to_parquet(fn)
+    return fn
+
+
+def _join_futures_updates(etl_history: EtlHistory, start_ts: pd.Timestamp | None = None):
+    updates_files = etl_history.get_symbols_asset_by_timeframes_updates_fn(start_ts)
+    etl_history.join_symbols_kind_diff_timeframes_update_files(updates_files['BTC'][AssetKind.FUTURES.value],
+                                                               'BTC', AssetKind.FUTURES.value)
+
+
+@pytest.fixture(name='etl_history_month_layout')
+def etl_history_month_layout_fixture(tmp_path):
+    return EtlHistory(exchange_code='TEST', history_path=str(tmp_path / 'history'),
+                      update_path=str(tmp_path / 'update'), timeframe=Timeframe.EOD, symbols=['BTC'],
+                      asset_kinds=[AssetKind.FUTURES],
+                      params={'history_layout': HistoryLayout.MONTH.value, 'row_group_rows': 0,
+                              'create_catalog': True})
+
+
+def test_join_updates_to_month_partitions(etl_history_month_layout):
+    etl_history = etl_history_month_layout
+    for timestamp in ['2024-01-30', '2024-01-31', '2024-02-01']:
+        _write_futures_update(etl_history.update_path, pd.Timestamp(timestamp, tz=datetime.UTC))
+    _join_futures_updates(etl_history)
+    january_fn = etl_history._get_filepath('BTC', AssetKind.FUTURES, 2024, 1)
+    february_fn = etl_history._get_filepath('BTC', AssetKind.FUTURES, 2024, 2)
+    assert os.path.isfile(january_fn)
+    assert os.path.isfile(february_fn)
+    assert pq.ParquetFile(january_fn).metadata.num_row_groups == 2  # Row group for each trading day
+    assert etl_history.provider.get_asset_history_years('BTC', AssetKind.FUTURES, Timeframe.EOD) == [2024]
+    january_mtime = os.path.getmtime(january_fn)
+
+    start_ts = pd.Timestamp('2024-02-02', tz=datetime.UTC)
+    _write_futures_update(etl_history.update_path, start_ts)
+    _join_futures_updates(etl_history, start_ts)
+    assert os.path.getmtime(january_fn) == january_mtime
+    params = RequestParameters(period_from=datetime.date(2024, 1, 31), period_to=datetime.date(2024, 2, 2))
+    df_fut = etl_history.provider.load_futures_history('BTC', params=params)
+    assert sorted(df_fut[FCl.TIMESTAMP.nm].dt.day.unique()) == [1, 2, 31]
+    assert etl_history.detect_last_update() == start_ts
+    assert len(etl_history.catalog.get_files_info('BTC')) == 2
+
+
+def test_join_updates_to_month_partitions_migrate_year_file(etl_history_month_layout):
+    etl_history = etl_history_month_layout
+    year_fn = etl_history._get_filepath('BTC', AssetKind.FUTURES, 2024)
+    fn = _write_futures_update(etl_history.update_path, pd.Timestamp('2024-01-15', tz=datetime.UTC))
+    os.makedirs(os.path.dirname(year_fn), exist_ok=True)
+    pd.read_parquet(fn).to_parquet(year_fn)
+    os.remove(fn)
+    _write_futures_update(etl_history.update_path, pd.Timestamp('2024-03-01', tz=datetime.UTC))
+    _join_futures_updates(etl_history)
+    assert not os.path.isfile(year_fn)
+    assert etl_history.provider.get_history_layout('BTC', AssetKind.FUTURES, Timeframe.EOD, 2024) == \
+        HistoryLayout.MONTH
+    assert len(etl_history.provider.get_history_files('BTC', AssetKind.FUTURES, Timeframe.EOD, 2024)) == 2
+
+
+def test_join_updates_to_year_file_migrate_month_partitions(etl_history_month_layout):
+    etl_history = etl_history_month_layout
+    for timestamp in ['2024-01-15', '2024-02-15']:
+        _write_futures_update(etl_history.update_path, pd.Timestamp(timestamp, tz=datetime.UTC))
+    _join_futures_updates(etl_history)
+    etl_history._history_layout = HistoryLayout.YEAR
+    start_ts = pd.Timestamp('2024-03-01', tz=datetime.UTC)
+    _write_futures_update(etl_history.update_path, start_ts)
+    _join_futures_updates(etl_history, start_ts)
+    assert etl_history.provider.get_history_layout('BTC', AssetKind.FUTURES, Timeframe.EOD, 2024) == \
+        HistoryLayout.YEAR
+    assert etl_history.provider.get_history_files('BTC', AssetKind.FUTURES, Timeframe.EOD, 2024) == \
+        [etl_history._get_filepath('BTC', AssetKind.FUTURES, 2024)]
+    df_fut = etl_history.provider.load_futures_history('BTC', params=RequestParameters(period_to=2024))
+    assert sorted(df_fut[FCl.TIMESTAMP.nm].dt.month.unique()) == [1, 2, 3]
+
+
+def test_join_updates_to_month_partitions_without_history_update(etl_history_month_layout):
+    etl_history = etl_history_month_layout
+    etl_history._update_history = False
+    year_fn = etl_history._get_filepath('BTC', AssetKind.FUTURES, 2024)
+    fn = _write_futures_update(etl_history.update_path, pd.Timestamp('2024-01-15', tz=datetime.UTC))
+    os.makedirs(os.path.dirname(year_fn), exist_ok=True)
+    pd.read_parquet(fn).to_parquet(year_fn)
+    os.remove(fn)
+    _write_futures_update(etl_history.update_path, pd.Timestamp('2024-03-01', tz=datetime.UTC))
+    _join_futures_updates(etl_history)
+    assert not os.path.isfile(year_fn)  # Shadowed by partitions
+    assert len(etl_history.provider.get_history_files('BTC', AssetKind.FUTURES, Timeframe.EOD, 2024)) == 1
+
+
+def test_join_updates_without_catalog(tmp_path):
+    etl_history = EtlHistory(exchange_code='TEST', history_path=str(tmp_path / 'history'),
+                             update_path=str(tmp_path / 'update'), timeframe=Timeframe.EOD, symbols=['BTC'],
+                             asset_kinds=[AssetKind.FUTURES])
+    assert etl_history.catalog is None
+    for timestamp in ['2024-01-30', '2024-02-01']:
+        _write_futures_update(etl_history.update_path, pd.Timestamp(timestamp, tz=datetime.UTC))
+    _join_futures_updates(etl_history)
+    assert not os.path.isfile(os.path.join(etl_history.provider.exchange_data_path, '_catalog.sqlite'))
+    assert etl_history.detect_last_update() == pd.Timestamp('2024-02-01', tz=datetime.UTC)
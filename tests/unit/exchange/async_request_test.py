@@ -0,0 +1,94 @@
+"""Tests for asyncio requests of exchanges"""
+import asyncio
+import httpx
+import pandas as pd
+import pytest
+from exchange import AsyncRequestClass, RequestClass
+from exchange.exchange_exception import APIException
+from exchange.deribit import DeribitMarket, DeribitExchange, DeribitAssetKind
+from exchange.moex import MoexOptions
+
+try:
+    import h2
+except ImportError:
+    h2 = None
+
+_MOEX_DESK = {
+    'call': [{'secid': 'SI80000BF5B', 'strike': 80000.0, 'offer': 2100.0, 'bid': 2000.0, 'last': 0.0,
+              'theorprice': 2050.0, 'volatility': 20.5, 'intrinsic_value': 1500.0}],
+    'put': [{'secid': 'SI80000BR5B', 'strike': 80000.0, 'offer': 600.0, 'bid': 500.0, 'last': 0.0,
+             'theorprice': 550.0, 'volatility': 20.5, 'intrinsic_value': 0.0}],
+}
+
+
+def _async_client(handler, **kwargs) -> AsyncRequestClass:
+    return AsyncRequestClass('https://test.exchange/api/', {'transport': httpx.MockTransport(handler)}, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_async_request_api():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.url.path == '/api/error':
+            return httpx.Response(500, text='{"code": 1, "msg": "failed"}')
+        return httpx.Response(200, json={'path': request.url.path, 'params': dict(request.url.params)})
+
+    limits = httpx.Limits(max_connections=4, max_keepalive_connections=4)
+    async with _async_client(handler, limits=limits) as client:
+        assert client.limits == limits
+        responses = await asyncio.gather(*(client.request_api('/assets', params={'n': n}) for n in range(16)))
+        assert [response['params'] for response in responses] == [{'n': str(n)} for n in range(16)]
+        assert responses[0]['path'] == '/api/assets'
+        assert requests[0].headers['User-Agent'] == RequestClass.HEADERS['User-Agent']
+        with pytest.raises(APIException) as err:
+            await client.request_api('error')
+        assert err.value.status_code == 500
+    assert client.session.is_closed
+    assert not isinstance(client, RequestClass)  # Code typed by sync client do not get coroutines
+
+
+@pytest.mark.skipif(h2 is not None, reason='h2 is installed')
+def test_async_request_http2_requires_h2():
+    with pytest.raises(ImportError):
+        AsyncRequestClass('https://test.exchange/api', http2=True)
+
+
+@pytest.mark.asyncio
+async def test_moex_async_option_series_desk(monkeypatch):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        if 'SI-6.25M220525XA' in request.url.path:
+            return httpx.Response(200, json=_MOEX_DESK)
+        return httpx.Response(422, text='{}')
+
+    monkeypatch.setattr(MoexOptions, '_normalize_option_desk',  # Response is normalized as sync desk
+                        lambda self, response, asset_code, series_code, asset_type, request_timestamp:
+                        pd.DataFrame(response['call'] + response['put']).assign(series_code=series_code))
+    async with _async_client(handler) as client:
+        options = MoexOptions(client)
+        desks = await asyncio.gather(
+            options.aget_option_series_desk(asset_code='SI', series_code='SI-6.25M220525XA'),
+            options.aget_option_series_desk(asset_code='SI', series_code='SI-6.25M290525XA'))
+    assert sorted(requests) == ['/api/assets/SI/optionseries/SI-6.25M220525XA/optionboard',
+                                '/api/assets/SI/optionseries/SI-6.25M290525XA/optionboard']
+    assert desks[0]['secid'].tolist() == ['SI80000BF5B', 'SI80000BR5B']
+    assert desks[1] is None  # Series without desk
+
+
+@pytest.mark.asyncio
+async def test_deribit_async_book_summary(monkeypatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={'result': [{'instrument_name': f'{request.url.params["currency"]}-PERPETUAL',
+                                                     'kind': request.url.params['kind']}]})
+
+    monkeypatch.setattr(DeribitMarket, '_normalize_book', lambda self, book_summary_df, request_timestamp:
+                        book_summary_df.assign(request_timestamp=request_timestamp))
+    async with _async_client(handler) as client:
+        book_df = await DeribitMarket(client).aget_book_summary_by_currency(DeribitExchange.CURRENCIES[0],
+                                                                            DeribitAssetKind.FUTURE)
+    assert book_df['instrument_name'].tolist() == [f'{DeribitExchange.CURRENCIES[0]}-PERPETUAL']
+    assert book_df['kind'].tolist() == [DeribitAssetKind.FUTURE.value]
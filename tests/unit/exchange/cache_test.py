@@ -0,0 +1,296 @@
+"""Tests for exchange requests cache"""
+import datetime
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import pytest
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from exchange import Cache
+
+
+class _SizedCache(Cache):
+    """Cache with size of dataframe equal to rows number"""
+
+    def __init__(self, max_cache_memory: int):
+        super().__init__()
+        self.max_cache_memory = max_cache_memory
+        self.max_cached_df_size = max_cache_memory
+
+    @staticmethod
+    def get_df_memory_usage(df):
+        return len(df)
+
+
+def _cached_loader(cache: Cache, calls: list):
+    @cache.it
+    def load(rows: int, name: str) -> pd.DataFrame:
+        calls.append(name)
+        return pd.DataFrame({'value': range(rows)})
+    return load
+
+
+def test_cache_hits_counted():
+    cache, calls = _SizedCache(100), []
+    load = _cached_loader(cache, calls)
+    df = load(3, 'a')
+    df.loc[0, 'value'] = -1  # Cached data is not changed by caller
+    assert load(3, 'a')['value'].tolist() == [0, 1, 2]
+    assert calls == ['a']
+    assert cache.validate_df['requests'].tolist() == [2]
+    assert cache.cached_size == 3
+
+
+def test_cache_evict_least_requests_per_size():
+    cache, calls = _SizedCache(10), []
+    load = _cached_loader(cache, calls)
+    load(4, 'a')
+    load(4, 'b')
+    for _ in range(3):
+        load(4, 'b')  # b is more efficient than a
+    load(4, 'c')  # a and c have the same score, so one of them should be evicted
+    assert cache.cached_size <= 10
+    assert len(cache.entries) == 2
+    calls.clear()
+    load(4, 'b')
+    assert not calls
+    load(11, 'd')  # Bigger than cache limit is not cached
+    load(11, 'd')
+    assert calls == ['d', 'd']
+
+
+def test_cache_expiry_invalidation():
+    cache, calls = _SizedCache(100), []
+    load = _cached_loader(cache, calls)
+    cache.expiry_timeout_sec = -1  # Data of a is expired on insert
+    load(1, 'a')
+    cache.expiry_timeout_sec = 60
+    load(1, 'b')
+    cache.expiry = 0  # Time of expiry check
+    load(1, 'b')
+    assert len(cache.entries) == 1
+    load(1, 'a')
+    assert calls == ['a', 'b', 'a']
+
+
+def test_cache_namespace_budgets():
+    cache, calls = _SizedCache(20), []
+    cache.namespace_memory_ratio = {'reference': 0.5}
+    load = _cached_loader(cache, calls)
+
+    @cache.it(namespace='reference')
+    def load_reference(rows: int) -> pd.DataFrame:
+        calls.append('reference')
+        return pd.DataFrame({'value': range(rows)})
+
+    load_reference(8)
+    for name in ['a', 'b', 'c', 'd']:
+        load(4, name)  # Shared budget is 10, series do not evict reference data
+    assert cache.get_memory_usage() == {'reference': 8, 'load': 8}
+    assert cache.get_budget_memory('load') == 10
+    calls.clear()
+    load_reference(8)
+    assert not calls
+
+
+def test_cache_memory_usage_deep():
+    df = pd.DataFrame({'value': ['x' * 1_000] * 100})
+    assert Cache.get_df_memory_usage(df) > 100 * 1_000
+
+
+def test_cache_read_only_hits():
+    cache, calls = _SizedCache(10_000), []
+
+    @cache.it(read_only=True)
+    def load_series(rows: int) -> pd.DataFrame:
+        calls.append(rows)
+        return pd.DataFrame({'value': np.arange(rows, dtype=float), 'code': ['a'] * rows,
+                             'timestamp': pd.date_range('2024-01-01', periods=rows, tz=datetime.UTC),
+                             'kind': pd.Categorical(['c'] * rows), 'count': pd.array(range(rows), dtype='Int64')})
+
+    load_series(3)
+    df_first, df_second = load_series(3), load_series(3)
+    assert calls == [3]
+    assert np.shares_memory(df_first['value'].to_numpy(), df_second['value'].to_numpy())
+    with pytest.raises(ValueError):
+        df_first.loc[0, 'value'] = -1.
+    with pytest.raises(ValueError):
+        df_first['count'].array[0] = -1
+    df_first['new'] = 1  # Columns of shallow copy are not shared
+    assert 'new' not in load_series(3).columns
+    assert load_series(3)['value'].tolist() == [0., 1., 2.]
+    df_writable = load_series(3).copy()
+    df_writable.loc[0, 'value'] = -1.
+    assert load_series(3).loc[0, 'value'] == 0.
+
+
+def test_cache_read_only_not_numpy_columns_copied():
+    cache = _SizedCache(10_000)
+
+    @cache.it(read_only=True)
+    def load_arrow(rows: int) -> pd.DataFrame:
+        return pd.DataFrame({'code': pd.array(['a'] * rows, dtype=pd.ArrowDtype(pa.string()))})
+
+    load_arrow(2)
+    df_first = load_arrow(2)
+    df_first.loc[0, 'code'] = 'b'
+    assert load_arrow(2)['code'].tolist() == ['a', 'a']
+
+
+def test_cache_single_flight():
+    cache, calls = _SizedCache(10_000), []
+    started = threading.Event()
+
+    @cache.it
+    def load_slow(name: str) -> pd.DataFrame:
+        calls.append(name)
+        started.set()
+        time.sleep(0.1)
+        if name == 'error':
+            raise ConnectionError(name)
+        return pd.DataFrame({'name': [name]})
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(load_slow, ['a'] * 6 + ['b'] * 2))
+    assert sorted(calls) == ['a', 'b']
+    assert [df.loc[0, 'name'] for df in results] == ['a'] * 6 + ['b'] * 2
+    calls.clear()
+    started.clear()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(load_slow, 'error')]
+        started.wait()
+        futures.extend(executor.submit(load_slow, 'error') for _ in range(3))
+        errors = [future.exception() for future in futures]
+    assert calls == ['error']
+    assert all(isinstance(error, ConnectionError) for error in errors)
+    assert not cache._in_flight
+
+
+def test_cache_disk_tier_reloaded(tmp_path):
+    calls = []
+
+    def reference_loader(cache: Cache):
+        @cache.it(persistent=True, read_only=True)
+        def load_reference(name: str) -> pd.DataFrame:
+            calls.append(name)
+            return pd.DataFrame({'asset_code': ['SI', 'BR'], 'strike': [1.5, 2.5]})
+        return load_reference
+
+    load = reference_loader(Cache(disk_path=str(tmp_path)))
+    df = load('assets')
+    assert len(list(tmp_path.glob('*.arrow'))) == 1
+    restarted_cache = Cache(disk_path=str(tmp_path))  # New process has empty memory
+    df_reloaded = reference_loader(restarted_cache)('assets')
+    pd.testing.assert_frame_equal(df_reloaded, df)
+    assert calls == ['assets']
+    entry = next(iter(restarted_cache.entries.values()))
+    assert entry.expiry == pytest.approx(time.time() + restarted_cache.expiry_timeout_sec, abs=60)
+    assert restarted_cache.is_read_only_df(restarted_cache.cached_data[entry.key])
+    load('not_persistent_cache')  # Persistent function of cache without disk tier is cached only in memory
+    assert len(list(tmp_path.glob('*.arrow'))) == 2
+    _cached_loader(restarted_cache, [])(2, 'a')
+    assert len(list(tmp_path.glob('*.arrow'))) == 2
+
+
+def test_cache_disk_tier_expired_removed(tmp_path):
+    cache, calls = Cache(disk_path=str(tmp_path)), []
+    cache.expiry_timeout_sec = -1
+
+    @cache.it(persistent=True)
+    def load(name: str) -> pd.DataFrame:
+        calls.append(name)
+        return pd.DataFrame({'value': [1, 2]})
+
+    load('a')
+    assert len(list(tmp_path.glob('*.arrow'))) == 1
+    cache.expiry = 0  # Force invalidation
+    assert load('a')['value'].tolist() == [1, 2]  # Expired file is not loaded
+    assert calls == ['a', 'a']
+    Cache(disk_path=str(tmp_path))
+    assert not list(tmp_path.glob('*.arrow'))
+
+
+def test_cache_new_day_ttl_reset():
+    cache = Cache(is_new_day_ttl_reset=True, day_reset_tz='Europe/Moscow')
+    cur_time = datetime.datetime(2024, 3, 5, 23, 50, tzinfo=datetime.UTC).timestamp()  # 02:50 in Moscow
+    expiry = datetime.datetime.fromtimestamp(cache._get_expiry(cur_time, True), cache.day_reset_tz)
+    assert expiry == datetime.datetime(2024, 3, 7, tzinfo=cache.day_reset_tz)
+    assert cache._get_expiry(cur_time) == cur_time + cache.expiry_timeout_sec
+
+    @cache.it
+    def load_day() -> pd.DataFrame:
+        return pd.DataFrame({'value': [1]})
+
+    @cache.it(is_new_day_ttl_reset=False)
+    def load_timeout() -> pd.DataFrame:
+        return pd.DataFrame({'value': [2]})
+
+    load_day()
+    load_timeout()
+    expiries = cache.validate_df.set_index('data_type')['expiry']
+    next_day = datetime.datetime.now(cache.day_reset_tz).date() + datetime.timedelta(days=1)
+    assert expiries['load_day'] == datetime.datetime.combine(next_day, datetime.time(),
+                                                             tzinfo=cache.day_reset_tz).timestamp()
+    assert expiries['load_timeout'] == pytest.approx(time.time() + cache.expiry_timeout_sec, abs=60)
+
+
+def test_cache_stats():
+    cache, calls = _SizedCache(10), []
+    load = _cached_loader(cache, calls)
+    load(4, 'a')
+    load(4, 'a')
+    load(4, 'a')
+    load(11, 'big')  # Bigger than cache limit
+    load(11, 'big')
+    load(4, 'b')
+    load(4, 'c')  # b is evicted
+    stats = cache.stats()['load']
+    assert (stats.hits, stats.misses, stats.ignored, stats.evicted, stats.expired) == (2, 4, 1, 1, 0)
+    assert stats.size == cache.cached_size == 8
+    assert stats.hit_ratio == pytest.approx(2 / 6)
+    assert stats.saved_time == pytest.approx(stats.compute_time / 2)
+    stats.hits = 0  # Snapshot is not linked to cache counters
+    assert cache.stats()['load'].hits == 2
+    cache.expiry_timeout_sec = -1
+    load(1, 'd')
+    cache.expiry = 0
+    load(1, 'e')
+    assert cache.stats()['load'].expired >= 1
+
+
+def _load_shared_reference(disk_path: str, calls_path: str) -> float:
+    cache = Cache(disk_path=disk_path)
+
+    @cache.it(persistent=True, read_only=True)
+    def load_shared_reference() -> pd.DataFrame:
+        with open(calls_path, 'a', encoding='utf-8') as calls_file:
+            calls_file.write('call\n')
+        time.sleep(0.2)
+        return pd.DataFrame({'value': np.arange(1_000.)})
+
+    return float(load_shared_reference()['value'].sum())
+
+
+def test_cache_disk_tier_shared_by_processes(tmp_path):
+    disk_path, calls_path = str(tmp_path / 'cache'), str(tmp_path / 'calls.txt')
+    with ProcessPoolExecutor(max_workers=4, mp_context=multiprocessing.get_context('fork')) as executor:
+        results = list(executor.map(_load_shared_reference, [disk_path] * 4, [calls_path] * 4))
+    assert results == [499_500.] * 4
+    with open(calls_path, encoding='utf-8') as calls_file:
+        assert calls_file.read() == 'call\n'  # Computed once for all processes
+    cache = Cache(disk_path=disk_path)
+
+    @cache.it(persistent=True, read_only=True)
+    def load_shared_reference() -> pd.DataFrame:
+        raise AssertionError('Data should be read from disk tier')
+
+    df = load_shared_reference()
+    cached_df = next(iter(cache.cached_data.values()))
+    assert cache.is_read_only_df(cached_df)
+    assert np.shares_memory(df['value'].to_numpy(), cached_df['value'].to_numpy())
+    values_base = cached_df['value'].to_numpy()
+    while isinstance(values_base, np.ndarray):
+        values_base = values_base.base
+    assert values_base is not None  # Memory mapped arrow buffer is not copied to numpy owned memory
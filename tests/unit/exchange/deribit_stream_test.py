@@ -0,0 +1,187 @@
+"""Tests for Deribit websocket stream with local stand-in server"""
+import asyncio
+import json
+import numpy as np
+import pandas as pd
+import pytest
+import pytest_asyncio
+from websockets.asyncio.server import serve
+from exchange import DeribitStream
+from exchange.deribit_stream import LatestStateTable
+
+INSTRUMENTS_DF = pd.DataFrame({'instrument_name': ['BTC-27JUN25-100000-C', 'BTC-PERPETUAL', 'ETH-PERPETUAL'],
+                               'base_currency': ['BTC', 'BTC', 'ETH'],
+                               'quote_currency': ['BTC', 'USD', 'USD'],
+                               'settlement_currency': ['BTC', 'BTC', 'ETH']})
+
+
+def _get_ticker(instrument_name: str, price: float, timestamp: int = 1745981665292) -> dict:
+    return {'instrument_name': instrument_name, 'timestamp': timestamp, 'best_bid_price': price - 1,
+            'best_ask_price': price + 1, 'last_price': price, 'mark_price': price, 'underlying_index': 'index_price',
+            'stats': {'high': price + 10, 'low': None, 'volume': 7.5}}
+
+
+class _StandInServer:
+    """Deribit websocket stand-in: confirms subscriptions, sends heartbeat test request and pushes queued tickers
+    or raw messages"""
+
+    def __init__(self):
+        self.channels: list[str] = []
+        self.methods: list[str] = []
+        self.tickers: asyncio.Queue = asyncio.Queue()
+        self.subscribed: asyncio.Event = asyncio.Event()
+        self.tested: asyncio.Event = asyncio.Event()
+        self.url: str = ''
+        self.connections: int = 0
+
+    async def handler(self, websocket):
+        self.connections += 1
+
+        async def push_tickers():
+            while True:
+                data = await self.tickers.get()
+                if isinstance(data, str):  # Raw message
+                    await websocket.send(data)
+                    continue
+                channel = f'ticker.{data["instrument_name"]}.agg2'
+                await websocket.send(json.dumps({'jsonrpc': '2.0', 'method': 'subscription',
+                                                 'params': {'channel': channel, 'data': data}}))
+
+        pusher = asyncio.create_task(push_tickers())
+        try:
+            async for message in websocket:
+                request = json.loads(message)
+                self.methods.append(request['method'])
+                result = None
+                if request['method'] == 'public/subscribe':
+                    self.channels.extend(request['params']['channels'])
+                    result = request['params']['channels']
+                    self.subscribed.set()
+                elif request['method'] == 'public/set_heartbeat':
+                    result = 'ok'
+                    await websocket.send(json.dumps({'jsonrpc': '2.0', 'method': 'heartbeat',
+                                                     'params': {'type': 'test_request'}}))
+                elif request['method'] == 'public/test':
+                    result = {'version': '1.2.26'}
+                    self.tested.set()
+                await websocket.send(json.dumps({'jsonrpc': '2.0', 'id': request['id'], 'result': result}))
+        finally:
+            pusher.cancel()
+
+
+@pytest_asyncio.fixture(name='stand_in_server')
+async def stand_in_server_fixture():
+    stand_in = _StandInServer()
+    async with serve(stand_in.handler, '127.0.0.1', 0) as server:
+        stand_in.url = f'ws://127.0.0.1:{server.sockets[0].getsockname()[1]}'
+        yield stand_in
+
+
+async def _wait_for(condition, timeout: float = 5.):
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_deribit_stream_snapshot(stand_in_server):
+    stream = DeribitStream(INSTRUMENTS_DF, ws_url=stand_in_server.url)
+    task = asyncio.create_task(stream.run())
+    try:
+        await asyncio.wait_for(stand_in_server.subscribed.wait(), 5)
+        assert stand_in_server.channels == stream.get_channels(list(INSTRUMENTS_DF['instrument_name']))
+        await asyncio.wait_for(stand_in_server.tested.wait(), 5)  # Heartbeat test request is answered
+        for instrument_name, price in [('BTC-PERPETUAL', 95000.), ('ETH-PERPETUAL', 1800.),
+                                       ('BTC-PERPETUAL', 95100.)]:
+            await stand_in_server.tickers.put(_get_ticker(instrument_name, price))
+        await _wait_for(lambda: stream.messages == 3)
+        book_summary_df = stream.get_book_summary(['BTC'])
+        assert list(book_summary_df['instrument_name']) == ['BTC-PERPETUAL']
+        row = book_summary_df.iloc[0]
+        assert (row['bid_price'], row['ask_price'], row['last'], row['mid_price']) == (95099., 95101., 95100., 95100.)
+        assert (row['high'], row['volume'], row['quote_currency']) == (95110., 7.5, 'USD')
+        assert np.isnan(row['low']) and row['underlying_index'] == 'index_price'
+        assert row['creation_timestamp'] == 1745981665292
+        assert len(stream.get_book_summary()) == 2
+        await stream.stop()
+        await asyncio.wait_for(task, 5)
+    finally:
+        task.cancel()
+    assert stand_in_server.connections == 1
+
+
+@pytest.mark.asyncio
+async def test_deribit_stream_reconnect_and_instruments(stand_in_server):
+    stream = DeribitStream(INSTRUMENTS_DF.iloc[:2], ws_url=stand_in_server.url)
+    stream.RECONNECT_DELAY_SEC = 0.01
+    task = asyncio.create_task(stream.run())
+    try:
+        await asyncio.wait_for(stand_in_server.subscribed.wait(), 5)
+        await stand_in_server.tickers.put(_get_ticker('BTC-PERPETUAL', 95000.))
+        await _wait_for(lambda: stream.messages == 1)
+        stream.set_instruments(INSTRUMENTS_DF.iloc[1:])  # Option is expired, ETH-PERPETUAL is listed
+        await _wait_for(lambda: 'ticker.ETH-PERPETUAL.agg2' in stand_in_server.channels)
+        await stream._websocket.close()  # pylint: disable=protected-access
+        await _wait_for(lambda: stand_in_server.connections == 2 and stream.is_connected)
+        assert stand_in_server.channels[-2:] == ['ticker.BTC-PERPETUAL.agg2', 'ticker.ETH-PERPETUAL.agg2']
+        assert list(stream.get_book_summary()['bid_price']) == [94999.]  # State is kept after reconnect
+        await stream.stop()
+        await asyncio.wait_for(task, 5)
+    finally:
+        task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_deribit_stream_seeded_by_book_summary(stand_in_server):
+    book_summary_df = pd.DataFrame({'instrument_name': ['BTC-27JUN25-100000-C', 'BTC-PERPETUAL', 'ETH-PERPETUAL',
+                                                        'BTC-27JUN25-90000-P'],
+                                    'bid_price': [0.05, 94000., 1700., 0.01], 'creation_timestamp': 1745981600000,
+                                    'underlying_index': ['BTC-27JUN25', 'index_price', 'index_price', 'BTC-27JUN25']})
+    stream = DeribitStream(INSTRUMENTS_DF, ws_url=stand_in_server.url, book_summary_fn=lambda: book_summary_df)
+    task = asyncio.create_task(stream.run())
+    try:
+        await _wait_for(lambda: stream.is_connected)
+        book_summary = stream.get_book_summary()  # Not subscribed instrument is not added
+        assert list(book_summary['instrument_name']) == list(INSTRUMENTS_DF['instrument_name'])
+        assert list(book_summary['bid_price']) == [0.05, 94000., 1700.]
+        for message in ['not json', json.dumps({'jsonrpc': '2.0', 'method': 'subscription', 'params': {}})]:
+            await stand_in_server.tickers.put(message)
+        await stand_in_server.tickers.put(_get_ticker('BTC-PERPETUAL', 95000.))
+        await _wait_for(lambda: stream.messages == 2)  # Bad messages do not stop stream
+        assert stream.get_book_summary(['BTC'])['bid_price'].tolist() == [0.05, 94999.]
+        assert stream.is_connected
+        await stream.stop()
+        await asyncio.wait_for(task, 5)
+    finally:
+        task.cancel()
+
+
+def test_deribit_stream_settlement_currency():
+    instruments_df = pd.DataFrame({'instrument_name': ['BTC-PERPETUAL', 'BTC_USDC-PERPETUAL', 'BTC_USDC'],
+                                   'base_currency': ['BTC', 'BTC', 'BTC'],
+                                   'quote_currency': ['USD', 'USDC', 'USDC'],
+                                   'settlement_currency': ['BTC', 'USDC', None]})  # Spot has no settlement
+    stream = DeribitStream(instruments_df)
+    for instrument_name in instruments_df['instrument_name']:
+        stream.update_ticker(_get_ticker(instrument_name, 95000.))
+    assert list(stream.get_book_summary(['BTC'])['instrument_name']) == ['BTC-PERPETUAL']
+    assert list(stream.get_book_summary(['USDC'])['instrument_name']) == ['BTC_USDC-PERPETUAL', 'BTC_USDC']
+    assert 'settlement_currency' not in stream.get_book_summary().columns
+    stream.set_instruments(instruments_df.drop(columns='settlement_currency'))
+    assert list(stream.get_book_summary(['USD'])['instrument_name']) == ['BTC-PERPETUAL']
+
+
+def test_latest_state_table():
+    table = LatestStateTable(['bid_price', 'ask_price'], ['underlying_index'])
+    for n in range(5_000):
+        table.update(f'instrument_{n % 3_000}', {'bid_price': float(n)})
+    table.update('instrument_1', {'ask_price': 5., 'underlying_index': 'BTC-27JUN25'})
+    table.remove(['instrument_0', 'instrument_2', 'unknown'])
+    assert len(table) == 2_998
+    state_df = table.to_frame().set_index('instrument_name')
+    assert 'instrument_0' not in state_df.index
+    assert state_df.loc['instrument_1'].to_dict() == {'bid_price': 3_001., 'ask_price': 5.,
+                                                      'underlying_index': 'BTC-27JUN25'}
+    assert state_df.loc['instrument_2999', 'bid_price'] == 2_999.
+    table.update('instrument_0', {'bid_price': None})
+    assert np.isnan(table.to_frame().set_index('instrument_name').loc['instrument_0', 'bid_price'])
@@ -1,4 +1,5 @@
 """Deribit exchange provider"""
+import os
 import pandas as pd
 from options_lib.dictionary import AssetKind, OptionsColumns as OCl
 from provider import AbstractProvider
@@ -34,3 +35,36 @@ def test_get_options_assets_books_snapshot(moex_exchange, moex_asset_code):
     assert len(book_summary_df) > 0
     assert OCl.BASE_CODE.nm in book_summary_df.columns
     assert not book_summary_df[book_summary_df[OCl.BASE_CODE.nm] == moex_asset_code].empty
+
+
+class _ReferenceMoexExchange(MoexExchange):
+    """Exchange for reference data requests, history methods are not used"""
+
+
+_ReferenceMoexExchange.__abstractmethods__ = frozenset()
+
+
+def test_incomplete_reference_data_not_cached(tmp_path, monkeypatch):
+    moex = _ReferenceMoexExchange(cache_path=str(tmp_path))
+    calls, failed = [], {'TEST_FAILED'}
+
+    def get_option_series(asset_code: str) -> pd.DataFrame:
+        calls.append(asset_code)
+        if asset_code in failed:
+            raise ConnectionError('Request failed')
+        return pd.DataFrame({OCl.BASE_CODE.nm: [asset_code]})
+
+    monkeypatch.setattr(moex.options, 'get_option_series', get_option_series)
+    asset_codes = ['TEST_LOADED', 'TEST_FAILED']
+    try:
+        series_df = moex._get_reference_data(moex._get_options_series, asset_codes)
+        assert list(series_df[OCl.BASE_CODE.nm]) == ['TEST_LOADED']
+        assert not [fn for fn in os.listdir(tmp_path) if fn.endswith('.arrow')]  # Incomplete data is not persisted
+        failed.clear()
+        series_df = moex._get_reference_data(moex._get_options_series, asset_codes)
+        assert sorted(series_df[OCl.BASE_CODE.nm]) == sorted(asset_codes)
+        assert len(calls) == 4
+        moex._get_reference_data(moex._get_options_series, asset_codes)
+        assert len(calls) == 4
+    finally:
+        moex.cache.set_disk_tier(None)
@@ -0,0 +1,166 @@
+"""Tests for adaptive rate limiter of exchange requests"""
+import asyncio
+import datetime
+import email.utils
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+import pytest
+from exchange import RateLimiter, RequestClass, AsyncRequestClass
+from exchange.exchange_exception import APIException
+
+
+class _LimitedServer(ThreadingHTTPServer):
+    """Mock exchange: more than max_active concurrent requests are throttled with Retry-After, path /fail/N fails
+    N first requests with 503, path /slow responds after second"""
+    daemon_threads = True
+
+    def __init__(self, max_active: int):
+        super().__init__(('127.0.0.1', 0), _LimitedHandler)
+        self.max_active = max_active
+        self.active = 0
+        self.throttled = 0
+        self.served = 0
+        self.failures: dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+
+class _LimitedHandler(BaseHTTPRequestHandler):
+    server: _LimitedServer
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: dict, headers: dict | None = None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        server = self.server
+        if self.path.startswith('/fail/'):
+            with server.lock:
+                failures = server.failures.get(self.path, 0)
+                server.failures[self.path] = failures + 1
+            if failures < int(self.path.split('/')[2]):
+                self._send(503, {'msg': 'unavailable'})
+            else:
+                self._send(200, {'failures': failures})
+            return
+        if self.path == '/slow':
+            time.sleep(1)
+            self._send(200, {'path': self.path})
+            return
+        with server.lock:
+            server.active += 1
+            is_throttled = server.active > server.max_active
+        try:
+            if is_throttled:
+                with server.lock:
+                    server.throttled += 1
+                self._send(429, {'msg': 'too many requests'}, {'Retry-After': '0.05'})
+                return
+            time.sleep(0.02)
+            with server.lock:
+                server.served += 1
+            self._send(200, {'path': self.path})
+        finally:
+            with server.lock:
+                server.active -= 1
+
+
+@pytest.fixture(name='limited_server')
+def limited_server_fixture():
+    server = _LimitedServer(max_active=3)
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_rate_limiter_adapts_to_server_limit(limited_server):
+    rate_limiter = RateLimiter(max_concurrency=16, backoff_base_sec=0.01, max_retries=20)
+    client = RequestClass(limited_server.url, rate_limiter=rate_limiter)
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        responses = list(executor.map(lambda n: client.request_api(f'/series/{n}'), range(60)))
+    assert [response['path'] for response in responses] == [f'/series/{n}' for n in range(60)]  # Nothing is lost
+    assert limited_server.served == 60
+    assert limited_server.throttled > 0
+    assert rate_limiter.throttled >= limited_server.throttled
+    assert rate_limiter.concurrency < 16
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_async_requests(limited_server):
+    rate_limiter = RateLimiter(max_concurrency=16, backoff_base_sec=0.01, max_retries=20)
+    async with AsyncRequestClass(limited_server.url, rate_limiter=rate_limiter) as client:
+        responses = await asyncio.gather(*(client.request_api(f'/series/{n}') for n in range(60)))
+    assert len({response['path'] for response in responses}) == 60
+    assert limited_server.served == 60
+    assert rate_limiter.concurrency < 16
+
+
+def test_rate_limiter_token_bucket(limited_server):
+    rate_limiter = RateLimiter(rate=50, burst=5, max_concurrency=1)
+    client = RequestClass(limited_server.url, rate_limiter=rate_limiter)
+    start_time = time.monotonic()
+    for n in range(15):
+        client.request_api(f'/series/{n}')
+    assert time.monotonic() - start_time >= (15 - 5) / 50 * 0.9  # Requests over burst wait for tokens
+    assert limited_server.throttled == 0
+
+
+def test_rate_limiter_retries_server_errors(limited_server):
+    rate_limiter = RateLimiter(backoff_base_sec=0.01, max_retries=3)
+    client = RequestClass(limited_server.url, rate_limiter=rate_limiter)
+    assert client.request_api('/fail/2') == {'failures': 2}
+    assert rate_limiter.concurrency == rate_limiter.max_concurrency / 4  # Halved by each sequential failure
+    with pytest.raises(APIException) as err:
+        client.request_api('/fail/10')
+    assert err.value.status_code == 503
+    assert limited_server.failures['/fail/10'] == 4
+    with pytest.raises(httpx.ConnectError):
+        RequestClass('http://127.0.0.1:9', rate_limiter=RateLimiter(backoff_base_sec=0.01, max_retries=1)) \
+            .request_api('/series')
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_slots_released_by_cancellation(limited_server):
+    rate_limiter = RateLimiter(max_concurrency=2)
+    async with AsyncRequestClass(limited_server.url, rate_limiter=rate_limiter) as client:
+        for _ in range(2):
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(client.request_api('/slow'), 0.05)
+        assert rate_limiter.concurrency == 1  # Cancelled requests are errors
+        response = await asyncio.wait_for(client.request_api('/series/0'), 1)  # Slots of cancelled are released
+    assert response == {'path': '/series/0'}
+
+    def send_failed() -> httpx.Response:
+        raise httpx.TooManyRedirects('Exceeded maximum allowed redirects')
+
+    with pytest.raises(httpx.TooManyRedirects):
+        rate_limiter.request(send_failed)
+    assert rate_limiter.request(lambda: httpx.Response(200)).status_code == 200
+
+
+def test_rate_limiter_retry_after_parsing():
+    assert RateLimiter.parse_retry_after('2') == 2.
+    assert RateLimiter.parse_retry_after(None) is None
+    assert RateLimiter.parse_retry_after('soon') is None
+    retry_datetime = datetime.datetime.now(datetime.UTC) + datetime.timedelta(seconds=30)
+    assert RateLimiter.parse_retry_after(email.utils.format_datetime(retry_datetime)) == pytest.approx(30, abs=2)
+    rate_limiter = RateLimiter(backoff_base_sec=1, backoff_max_sec=4)
+    assert all(0 <= rate_limiter.get_backoff(attempt) <= 4 for attempt in range(10))
@@ -0,0 +1,46 @@
+import datetime
+import pytest
+import pandas as pd
+from options_lib.dictionary import OptionsColumns as OCl, FuturesColumns as FCl, OptionsType, Timeframe
+from options_lib.enrichment import join_option_with_future, add_intrinsic_and_time_value
+from options_lib.normalization import convert_to_timeframe
+
+dd = pytest.importorskip("dask.dataframe")
+options_dask = pytest.importorskip("options_lib.dask")
+
+
+@pytest.fixture(name='hourly_options')
+def hourly_options_fixture():
+    timestamps = pd.date_range('2024-01-01', periods=72, freq='1h', tz=datetime.UTC)
+    expiration_date = pd.Timestamp('2024-01-26', tz=datetime.UTC)
+    rows = [(timestamp, strike, option_type) for timestamp in timestamps for strike in [90., 100., 110.]
+            for option_type in [OptionsType.CALL.code, OptionsType.PUT.code]]
+    df = pd.DataFrame(rows, columns=[OCl.TIMESTAMP.nm, OCl.STRIKE.nm, OCl.OPTION_TYPE.nm])
+    df[OCl.EXPIRATION_DATE.nm] = expiration_date
+    df[OCl.UNDERLYING_EXPIRATION_DATE.nm] = expiration_date
+    df[OCl.PRICE.nm] = 5.
+    df[OCl.ASSET_CODE.nm] = df[OCl.STRIKE.nm].astype(int).astype(str) + df[OCl.OPTION_TYPE.nm]
+    df_fut = pd.DataFrame({FCl.TIMESTAMP.nm: timestamps, FCl.EXPIRATION_DATE.nm: expiration_date,
+                           FCl.PRICE.nm: 100. + pd.Series(range(len(timestamps))) % 10})
+    return df, df_fut
+
+
+def _day_partitions(df: pd.DataFrame):
+    """Partitions aligned by day like history files aligned by month or year"""
+    return dd.from_pandas(df, npartitions=3, sort=False)
+
+
+def test_join_and_intrinsic_value(hourly_options):
+    df, df_fut = hourly_options
+    ddf = options_dask.join_option_with_future(_day_partitions(df), dd.from_pandas(df_fut, npartitions=2))
+    ddf = options_dask.add_intrinsic_and_time_value(ddf)
+    df_expected = add_intrinsic_and_time_value(join_option_with_future(df, df_fut))
+    pd.testing.assert_frame_equal(ddf.compute().reset_index(drop=True), df_expected, check_dtype=False)
+
+
+def test_convert_to_timeframe(hourly_options):
+    df, _ = hourly_options
+    df_eod = options_dask.convert_to_timeframe(_day_partitions(df), Timeframe.EOD).compute()
+    df_expected = convert_to_timeframe(df, Timeframe.EOD)
+    assert len(df_eod) == len(df_expected) == 3 * 6
+    assert sorted(df_eod[OCl.TIMESTAMP.nm].unique()) == sorted(df_expected[OCl.TIMESTAMP.nm].unique())
@@ -0,0 +1,26 @@
+import pandas as pd
+from options_lib.dictionary import (
+    OptionsColumns as OCl, OptionsType
+)
+from options_lib.normalization.dtypes import compact_dtypes, get_compact_dtypes
+
+
+def test_get_compact_dtypes():
+    columns = [OCl.OPTION_TYPE.nm, OCl.CURRENCY.nm, OCl.STRIKE.nm, OCl.PRICE.nm, OCl.TIMESTAMP.nm, 'unknown']
+    assert get_compact_dtypes(columns) == {OCl.OPTION_TYPE.nm: 'category', OCl.CURRENCY.nm: 'category'}
+    assert get_compact_dtypes(columns, float32=True) == {OCl.OPTION_TYPE.nm: 'category', OCl.CURRENCY.nm: 'category',
+                                                         OCl.PRICE.nm: 'float32'}
+
+
+def test_compact_dtypes():
+    df = pd.DataFrame({OCl.OPTION_TYPE.nm: [OptionsType.CALL.code, OptionsType.PUT.code] * 50,
+                       OCl.ASSET_CODE.nm: ['BTC-1', 'BTC-2', 'BTC-3', 'BTC-4'] * 25,
+                       OCl.STRIKE.nm: 100_000.5,
+                       OCl.PRICE.nm: 0.25})
+    df_compact = compact_dtypes(df.copy(), float32=True)
+    assert isinstance(df_compact[OCl.OPTION_TYPE.nm].dtype, pd.CategoricalDtype)
+    assert isinstance(df_compact[OCl.ASSET_CODE.nm].dtype, pd.CategoricalDtype)
+    assert df_compact[OCl.STRIKE.nm].dtype == 'float64'
+    assert df_compact[OCl.PRICE.nm].dtype == 'float32'
+    assert df_compact.astype(df.dtypes.to_dict()).equals(df)
+    assert df_compact.memory_usage(deep=True).sum() < df.memory_usage(deep=True).sum()
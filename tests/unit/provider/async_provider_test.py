@@ -0,0 +1,60 @@
+"""Tests for asyncio provider adapter"""
+import asyncio
+import threading
+import time
+import pytest
+import pandas as pd
+from options_lib.dictionary import AssetKind, Timeframe, OptionsColumns as OCl
+from provider import AsyncProvider, RequestParameters
+
+
+@pytest.mark.asyncio
+async def test_aload_history_like_sync(history_provider, history_asset_code, history_years):
+    params = RequestParameters(period_from=history_years[1])
+    async with AsyncProvider(history_provider) as async_provider:
+        assert await async_provider.aget_assets_list(AssetKind.OPTIONS) == [history_asset_code]
+        assert await async_provider.aget_asset_history_years(history_asset_code, AssetKind.FUTURES,
+                                                             Timeframe.EOD) == history_years
+        df_opt = await async_provider.aload_options_history(history_asset_code, params)
+        df_chain = await async_provider.aload_options_chain(history_asset_code)
+    pd.testing.assert_frame_equal(df_opt, history_provider.load_options_history(history_asset_code, params))
+    pd.testing.assert_frame_equal(df_chain, history_provider.load_options_chain(history_asset_code))
+
+
+@pytest.mark.asyncio
+async def test_agather_history(history_provider, history_asset_code):
+    async with AsyncProvider(history_provider) as async_provider:
+        results = await async_provider.agather_history([history_asset_code], columns={
+            AssetKind.FUTURES: [OCl.TIMESTAMP.nm]})
+        assert list(results) == [(history_asset_code, AssetKind.OPTIONS), (history_asset_code, AssetKind.FUTURES)]
+        assert list(results[(history_asset_code, AssetKind.FUTURES)].columns) == [OCl.TIMESTAMP.nm]
+        results = await async_provider.agather_history(['UNKNOWN'], [AssetKind.OPTIONS], return_exceptions=True)
+        assert isinstance(results[('UNKNOWN', AssetKind.OPTIONS)], FileNotFoundError)
+
+
+class _SlowProvider:
+    """Provider stand-in which counts concurrent requests"""
+
+    def __init__(self):
+        self.active, self.max_active = 0, 0
+        self._lock = threading.Lock()
+
+    def load_options_history(self, asset_code, params, columns):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.05)
+        with self._lock:
+            self.active -= 1
+        return pd.DataFrame({OCl.TIMESTAMP.nm: [asset_code]})
+
+
+@pytest.mark.asyncio
+async def test_agather_history_concurrency_limit():
+    provider = _SlowProvider()
+    async with AsyncProvider(provider, concurrency=3) as async_provider:
+        ticker = asyncio.create_task(asyncio.sleep(0.01))  # Event loop is not blocked by requests
+        results = await async_provider.agather_history([f'A{idx}' for idx in range(9)], [AssetKind.OPTIONS])
+        assert ticker.done()
+    assert provider.max_active == 3
+    assert [df.iloc[0, 0] for df in results.values()] == [f'A{idx}' for idx in range(9)]
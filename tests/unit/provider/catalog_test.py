@@ -0,0 +1,71 @@
+"""Tests for history files catalog"""
+import datetime
+import os
+import shutil
+import pandas as pd
+from options_lib.dictionary import AssetKind, Timeframe
+from provider import HistoryCatalog, PandasLocalFileProvider, RequestParameters, write_history_parquet
+
+
+def test_rebuild_catalog(history_provider, history_asset_code, history_years):
+    catalog = HistoryCatalog(history_provider.exchange_data_path)
+    assert catalog.rebuild(history_provider) == len(history_years) * 2
+    assert catalog.get_assets_list(AssetKind.OPTIONS) == [history_asset_code]
+    assert catalog.get_asset_history_years(history_asset_code, AssetKind.FUTURES, Timeframe.EOD) == history_years
+    assert catalog.get_history_files(history_asset_code, AssetKind.OPTIONS, Timeframe.EOD, history_years[-1]) == \
+        [history_provider.fn_path_prepare(history_asset_code, AssetKind.OPTIONS, Timeframe.EOD, history_years[-1])]
+    df_opt = history_provider.load_options_history(history_asset_code)
+    assert catalog.get_last_timestamp(AssetKind.OPTIONS, Timeframe.EOD) == df_opt['timestamp'].max()
+    assert catalog.get_last_timestamp(AssetKind.OPTIONS, Timeframe.MINUTE_1) is None
+    assert catalog.get_expirations(history_asset_code, AssetKind.OPTIONS, Timeframe.EOD)[-1] == \
+        df_opt['expiration_date'].max()
+    df_files = catalog.get_files_info(history_asset_code)
+    assert len(df_files) == len(history_years) * 2
+    assert df_files['schema_hash'].nunique() == 2
+
+
+def test_provider_discovery_by_catalog(history_path, history_provider, history_asset_code, history_years):
+    HistoryCatalog(history_provider.exchange_data_path).rebuild(history_provider)
+    provider = PandasLocalFileProvider('TEST', history_path)
+    assert provider.catalog is not None
+    fn_path = provider.fn_path_prepare(history_asset_code, AssetKind.FUTURES, Timeframe.EOD, history_years[0])
+    os.rename(fn_path, fn_path + '.bak')  # File which is not in catalog is not discovered
+    assert provider.get_asset_history_years(history_asset_code, AssetKind.FUTURES, Timeframe.EOD) == history_years
+    provider.catalog.remove_file(fn_path)
+    assert provider.get_asset_history_years(history_asset_code, AssetKind.FUTURES, Timeframe.EOD) == \
+        history_years[1:]
+    params = RequestParameters(period_from=datetime.date(history_years[-1], 1, 2))
+    assert len(provider.load_futures_history(history_asset_code, params=params)) > 0
+
+
+def test_update_file(history_provider, history_asset_code, history_years):
+    catalog = HistoryCatalog(history_provider.exchange_data_path)
+    fn_path = history_provider.fn_path_prepare(history_asset_code, AssetKind.FUTURES, Timeframe.EOD, 2030)
+    df_fut = pd.DataFrame({'timestamp': [pd.Timestamp('2030-01-02', tz=datetime.UTC)], 'price': [1.]})
+    df_fut.to_parquet(fn_path)
+    catalog.update_file(fn_path, history_asset_code, AssetKind.FUTURES, Timeframe.EOD, 2030)
+    assert catalog.get_last_timestamp(AssetKind.FUTURES, Timeframe.EOD, [history_asset_code]) == \
+        pd.Timestamp('2030-01-02', tz=datetime.UTC)
+    assert catalog.get_asset_history_years(history_asset_code, AssetKind.FUTURES, Timeframe.EOD) == [2030]
+    assert catalog.get_expirations(history_asset_code, AssetKind.FUTURES, Timeframe.EOD) == []
+
+
+def test_catalog_files_changed_outside(history_path, history_provider, history_asset_code, history_years):
+    catalog = HistoryCatalog(history_provider.exchange_data_path)
+    catalog.rebuild(history_provider)
+    provider = PandasLocalFileProvider('TEST', history_path)
+    year = history_years[-1]
+    year_fn = provider.fn_path_prepare(history_asset_code, AssetKind.FUTURES, Timeframe.EOD, year)
+    month_fn = provider.fn_path_prepare(history_asset_code, AssetKind.FUTURES, Timeframe.EOD, year, 1)
+    df_fut = pd.read_parquet(year_fn)
+    os.makedirs(os.path.dirname(month_fn))
+    write_history_parquet(df_fut, month_fn)
+    catalog.update_file(month_fn, history_asset_code, AssetKind.FUTURES, Timeframe.EOD, year, 1)
+    assert provider.get_history_files(history_asset_code, AssetKind.FUTURES, Timeframe.EOD, year) == [month_fn]
+    shutil.rmtree(os.path.dirname(os.path.dirname(month_fn)))  # Removed outside of catalog
+    assert provider.get_history_files(history_asset_code, AssetKind.FUTURES, Timeframe.EOD, year) == [year_fn]
+    catalog.remove_file(month_fn)
+    write_history_parquet(df_fut.iloc[:1], year_fn)  # Changed outside of catalog
+    assert provider.get_history_files(history_asset_code, AssetKind.FUTURES, Timeframe.EOD, year) == [year_fn]
+    assert catalog.get_history_files(history_asset_code, AssetKind.FUTURES, Timeframe.EOD, year) is None
+    assert len(provider.load_futures_history(history_asset_code, params=RequestParameters(period_to=year))) == 1
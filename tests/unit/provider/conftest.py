@@ -0,0 +1,78 @@
+"""Provider test fixtures with generated history files"""
+import datetime
+import os
+import pytest
+import numpy as np
+import pandas as pd
+
+from options_lib.dictionary import AssetKind, Timeframe, OptionsType, OptionsColumns as OCl, FuturesColumns as FCl
+from provider import PandasLocalFileProvider
+
+HISTORY_EXCHANGE_CODE = 'TEST'
+HISTORY_ASSET_CODE = 'BTC'
+HISTORY_YEARS = [2022, 2023, 2024]
+HISTORY_DAYS_IN_YEAR = 20
+HISTORY_STRIKES = [80_000., 90_000., 100_000., 110_000.]
+
+
+def generate_options_history(year: int, days: int = HISTORY_DAYS_IN_YEAR,
+                             strikes: list[float] | None = None, freq: str = '1D') -> pd.DataFrame:
+    """Options history with weekly expirations for every timestamp"""
+    strikes = HISTORY_STRIKES if strikes is None else strikes
+    timestamps = pd.date_range(f'{year}-01-01', periods=days, freq=freq, tz=datetime.UTC)
+    expirations = pd.date_range(f'{year}-01-07', periods=days // 7 + 3, freq='7D', tz=datetime.UTC)
+    rows = []
+    for timestamp in timestamps:
+        for expiration_date in expirations[expirations >= timestamp][:3]:
+            for strike in strikes:
+                for option_type in [OptionsType.CALL.code, OptionsType.PUT.code]:
+                    rows.append((timestamp, expiration_date, strike, option_type))
+    df = pd.DataFrame(rows, columns=[OCl.TIMESTAMP.nm, OCl.EXPIRATION_DATE.nm, OCl.STRIKE.nm, OCl.OPTION_TYPE.nm])
+    df[OCl.PRICE.nm] = np.arange(len(df), dtype=float)
+    df[OCl.UNDERLYING_EXPIRATION_DATE.nm] = df[OCl.EXPIRATION_DATE.nm]
+    df[OCl.UNDERLYING_PRICE.nm] = 95_000.
+    df[OCl.OPEN_INTEREST.nm] = 10.
+    df[OCl.ASSET_CODE.nm] = HISTORY_ASSET_CODE + '-' + df[OCl.STRIKE.nm].astype(int).astype(str) + '-' + \
+        df[OCl.OPTION_TYPE.nm]
+    df[OCl.BASE_CODE.nm] = HISTORY_ASSET_CODE
+    return df
+
+
+def generate_futures_history(year: int, days: int = HISTORY_DAYS_IN_YEAR) -> pd.DataFrame:
+    """Futures history with weekly expirations for every timestamp"""
+    df_opt = generate_options_history(year, days, strikes=[0.])
+    df_fut = df_opt[df_opt[OCl.OPTION_TYPE.nm] == OptionsType.CALL.code][
+        [FCl.TIMESTAMP.nm, FCl.EXPIRATION_DATE.nm]].reset_index(drop=True)
+    df_fut[FCl.PRICE.nm] = 95_000.
+    return df_fut
+
+
+@pytest.fixture(name='history_path')
+def history_path_fixture(tmp_path) -> str:
+    """History folder with TEST/BTC/{options,futures}/EOD/YEAR.parquet"""
+    for year in HISTORY_YEARS:
+        for asset_kind, df in [(AssetKind.OPTIONS, generate_options_history(year)),
+                               (AssetKind.FUTURES, generate_futures_history(year))]:
+            history_folder = os.path.join(tmp_path, HISTORY_EXCHANGE_CODE, HISTORY_ASSET_CODE, asset_kind.value,
+                                          Timeframe.EOD.value)
+            os.makedirs(history_folder, exist_ok=True)
+            df.to_parquet(os.path.join(history_folder, f'{year}.parquet'))
+    return str(tmp_path)
+
+
+@pytest.fixture(name='history_asset_code')
+def history_asset_code_fixture() -> str:
+    """Asset code of generated history"""
+    return HISTORY_ASSET_CODE
+
+
+@pytest.fixture(name='history_years')
+def history_years_fixture() -> list[int]:
+    """Years of generated history"""
+    return HISTORY_YEARS
+
+
+@pytest.fixture(name='history_provider')
+def history_provider_fixture(history_path) -> PandasLocalFileProvider:
+    """Local provider for generated history"""
+    return PandasLocalFileProvider(HISTORY_EXCHANGE_CODE, history_path)
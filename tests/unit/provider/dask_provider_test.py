@@ -0,0 +1,44 @@
+"""Tests for dask local provider"""
+import datetime
+import pytest
+import pandas as pd
+from options_lib.dictionary import OptionsType, OptionsColumns as OCl
+from provider import DataEngine, DataSource, RequestParameters
+from exchange import get_provider
+
+dd = pytest.importorskip("dask.dataframe")
+
+
+@pytest.fixture(name='dask_provider')
+def dask_provider_fixture(history_path):
+    return get_provider('TEST', storage=DataSource.LOCAL, engine=DataEngine.DASK, data_path=history_path)
+
+
+def test_scan_options_history_partitions(dask_provider, history_asset_code, history_years):
+    ddf = dask_provider.scan_options_history(history_asset_code)
+    assert isinstance(ddf, dd.DataFrame)
+    assert ddf.npartitions == len(history_years)
+
+
+def test_load_options_history_like_pandas(dask_provider, history_provider, history_asset_code):
+    params = RequestParameters(period_from=datetime.date(2022, 1, 10), period_to=datetime.date(2023, 1, 5),
+                               option_type=OptionsType.PUT, strike_to=90_000.)
+    df_opt = dask_provider.load_options_history(history_asset_code, params=params)
+    df_expected = history_provider.load_options_history(history_asset_code, params=params)
+    assert isinstance(df_opt, pd.DataFrame)
+    pd.testing.assert_frame_equal(df_opt, df_expected, check_dtype=False)
+    assert (df_opt[OCl.OPTION_TYPE.nm] == OptionsType.PUT.code).all()
+
+
+def test_load_book_and_chain_like_pandas(dask_provider, history_provider, history_asset_code):
+    settlement_datetime = datetime.datetime(2023, 1, 8, 12)
+    pd.testing.assert_frame_equal(dask_provider.load_futures_book(history_asset_code, settlement_datetime),
+                                  history_provider.load_futures_book(history_asset_code, settlement_datetime),
+                                  check_dtype=False)
+    pd.testing.assert_frame_equal(dask_provider.load_options_chain(history_asset_code, settlement_datetime),
+                                  history_provider.load_options_chain(history_asset_code, settlement_datetime),
+                                  check_dtype=False)
+    pd.testing.assert_frame_equal(dask_provider.load_options_book(history_asset_code),
+                                  history_provider.load_options_book(history_asset_code), check_dtype=False)
+    with pytest.raises(FileNotFoundError):
+        dask_provider.load_options_chain(history_asset_code, datetime.datetime(2000, 1, 1))
@@ -0,0 +1,40 @@
+"""Tests for SQL queries over history files"""
+import pytest
+import pyarrow as pa
+from options_lib.dictionary import OptionsColumns as OCl
+from provider import DuckDBHistoryQuery, RequestParameters
+
+pytest.importorskip("duckdb")
+
+
+@pytest.fixture(name='history_query')
+def history_query_fixture(history_provider):
+    history_query = DuckDBHistoryQuery(history_provider)
+    yield history_query
+    history_query.close()
+
+
+def test_register_views(history_query, history_years):
+    assert set(history_query.views) == {'btc_options_eod', 'btc_futures_eod'}
+    assert len(history_query.views['btc_options_eod']) == len(history_years)
+
+
+def test_query_aggregate(history_query, history_provider, history_asset_code):
+    df_oi = history_query.query(
+        f'SELECT {OCl.TIMESTAMP.nm}, {OCl.EXPIRATION_DATE.nm}, SUM({OCl.OPEN_INTEREST.nm}) AS open_interest '
+        f'FROM btc_options_eod WHERE year({OCl.TIMESTAMP.nm}) = $year '
+        f'GROUP BY ALL ORDER BY ALL', parameters={'year': 2024})
+    df_opt = history_provider.load_options_history(history_asset_code, params=RequestParameters(period_from=2024),
+                                                   columns=[OCl.TIMESTAMP.nm, OCl.EXPIRATION_DATE.nm,
+                                                            OCl.OPEN_INTEREST.nm])
+    df_expected = df_opt.groupby([OCl.TIMESTAMP.nm, OCl.EXPIRATION_DATE.nm], as_index=False)[
+        OCl.OPEN_INTEREST.nm].sum()
+    assert len(df_oi) == len(df_expected)
+    assert df_oi[OCl.OPEN_INTEREST.nm].tolist() == df_expected[OCl.OPEN_INTEREST.nm].tolist()
+
+
+def test_query_arrow(history_query, history_years):
+    table = history_query.query('SELECT COUNT(DISTINCT year(timestamp)) AS years FROM btc_futures_eod',
+                                to_arrow=True)
+    assert isinstance(table, pa.Table)
+    assert table.column('years').to_pylist() == [len(history_years)]
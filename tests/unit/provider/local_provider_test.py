@@ -1,6 +1,15 @@
 """Tests for local provider"""
+import datetime
+import os
+import pytest
 import pandas as pd
-from provider import AbstractProvider
+import pyarrow as pa
+from options_lib.dictionary import AssetKind, Timeframe, OptionsType, OptionsColumns as OCl, FuturesColumns as FCl
+from options_lib.chain.chain_selector import select_chain, validate_chain
+from options_assembler.option_data_class import OptionData
+from options_assembler.chain import OptionChain
+from provider import AbstractProvider, HistoryLayout, PandasLocalFileProvider, RequestParameters, \
+    write_history_parquet
 
 
 def test_load_option(exchange_provider, option_symbol, provider_params):
@@ -13,3 +22,230 @@ def test_load_future(exchange_provider, option_symbol, provider_params):
     df_fut = exchange_provider.load_futures_history(asset_code=option_symbol, params=provider_params)
     assert isinstance(df_fut, pd.DataFrame)
     assert all((f_col in df_fut.columns for f_col in AbstractProvider.futures_columns))
+
+
+def test_load_options_history_years_range(history_provider, history_asset_code, history_years):
+    params = RequestParameters(period_from=history_years[0], period_to=history_years[-1])
+    df_opt = history_provider.load_options_history(history_asset_code, params=params)
+    assert list(df_opt.columns) == AbstractProvider.options_columns
+    assert sorted(df_opt[OCl.TIMESTAMP.nm].dt.year.unique()) == history_years
+    assert df_opt[OCl.TIMESTAMP.nm].is_monotonic_increasing
+
+
+def test_load_options_history_from_year_to_last_year(history_provider, history_asset_code, history_years):
+    params = RequestParameters(period_from=history_years[1])
+    df_opt = history_provider.load_options_history(history_asset_code, params=params, columns=[OCl.TIMESTAMP.nm])
+    assert sorted(df_opt[OCl.TIMESTAMP.nm].dt.year.unique()) == history_years[1:]
+
+
+def test_load_options_history_all_years(history_provider, history_asset_code, history_years):
+    df_opt = history_provider.load_options_history(history_asset_code, columns=[OCl.TIMESTAMP.nm])
+    assert sorted(df_opt[OCl.TIMESTAMP.nm].dt.year.unique()) == history_years
+
+
+def test_load_options_history_dates_range(history_provider, history_asset_code, history_years):
+    date_from, date_to = datetime.date(history_years[0], 1, 10), datetime.date(history_years[1], 1, 5)
+    params = RequestParameters(period_from=date_from, period_to=date_to)
+    df_opt = history_provider.load_options_history(history_asset_code, params=params, columns=[OCl.PRICE.nm])
+    assert list(df_opt.columns) == [OCl.PRICE.nm]
+    df_ts = history_provider.load_options_history(history_asset_code, params=params, columns=[OCl.TIMESTAMP.nm])
+    assert len(df_ts) == len(df_opt)
+    assert df_ts[OCl.TIMESTAMP.nm].min().date() == date_from
+    assert df_ts[OCl.TIMESTAMP.nm].max().date() == date_to
+
+
+def test_load_futures_history_single_date(history_provider, history_asset_code, history_years):
+    settlement_date = datetime.date(history_years[-1], 1, 3)
+    df_fut = history_provider.load_futures_history(history_asset_code, params=RequestParameters(period_to=settlement_date))
+    assert not df_fut.empty
+    assert (df_fut[FCl.TIMESTAMP.nm].dt.date == settlement_date).all()
+
+
+def test_load_futures_history_period_from_date(history_provider, history_asset_code, history_years):
+    date_from = datetime.date(history_years[-1], 1, 10)
+    df_fut = history_provider.load_futures_history(history_asset_code, params=RequestParameters(period_from=date_from))
+    assert not df_fut.empty
+    assert df_fut[FCl.TIMESTAMP.nm].min().date() >= date_from
+
+
+def test_load_history_mismatch_period_types(history_provider, history_asset_code, history_years):
+    params = RequestParameters(period_from=history_years[0], period_to=datetime.date(history_years[1], 1, 1))
+    with pytest.raises(TypeError):
+        history_provider.load_options_history(history_asset_code, params=params)
+
+
+def test_load_history_missed_years(history_provider, history_asset_code, history_years):
+    with pytest.raises(FileNotFoundError):
+        history_provider.load_options_history(history_asset_code, params=RequestParameters(period_from=2000, period_to=2001))
+
+
+def test_load_options_history_pushdown_filters(history_provider, history_asset_code, history_years):
+    df_all = history_provider.load_options_history(history_asset_code,
+                                                   params=RequestParameters(period_to=history_years[0]))
+    expiration_date = df_all[OCl.EXPIRATION_DATE.nm].iloc[0]
+    params = RequestParameters(period_to=history_years[0], expiration_date=expiration_date,
+                               option_type=OptionsType.PUT, strike_from=90_000., strike_to=100_000.)
+    df_opt = history_provider.load_options_history(history_asset_code, params=params, columns=[OCl.PRICE.nm])
+    df_expected = df_all[(df_all[OCl.EXPIRATION_DATE.nm] == expiration_date) &
+                         (df_all[OCl.OPTION_TYPE.nm] == OptionsType.PUT.code) &
+                         (df_all[OCl.STRIKE.nm] >= 90_000.) & (df_all[OCl.STRIKE.nm] <= 100_000.)]
+    assert len(df_opt) > 0
+    assert df_opt[OCl.PRICE.nm].tolist() == df_expected[OCl.PRICE.nm].tolist()
+
+
+def test_load_futures_history_ignore_options_filters(history_provider, history_asset_code, history_years):
+    params = RequestParameters(period_to=history_years[0], option_type=OptionsType.CALL, strike_from=1.)
+    df_fut = history_provider.load_futures_history(history_asset_code, params=params)
+    assert not df_fut.empty
+
+
+def test_load_history_month_partitions(history_provider, history_asset_code):
+    year_fn = history_provider.fn_path_prepare(history_asset_code, AssetKind.FUTURES, Timeframe.EOD, 2024)
+    df_year = pd.read_parquet(year_fn)
+    df_year = df_year.assign(**{FCl.TIMESTAMP.nm: df_year[FCl.TIMESTAMP.nm] + pd.DateOffset(days=20)})
+    for month, df_month in df_year.groupby(df_year[FCl.TIMESTAMP.nm].dt.month):
+        fn = history_provider.fn_path_prepare(history_asset_code, AssetKind.FUTURES, Timeframe.EOD, 2024, month)
+        os.makedirs(os.path.dirname(fn), exist_ok=True)
+        df_month.to_parquet(fn)
+    os.remove(year_fn)
+    assert history_provider.get_history_layout(history_asset_code, AssetKind.FUTURES, Timeframe.EOD, 2024) == \
+        HistoryLayout.MONTH
+    assert history_provider.get_asset_history_years(history_asset_code, AssetKind.FUTURES, Timeframe.EOD) == \
+        [2022, 2023, 2024]
+    assert len(history_provider.get_history_files(history_asset_code, AssetKind.FUTURES, Timeframe.EOD, 2024)) == 2
+    df_fut = history_provider.load_futures_history(history_asset_code, params=RequestParameters(period_from=2024))
+    assert len(df_fut) == len(df_year)
+    params = RequestParameters(period_from=datetime.date(2024, 2, 1), period_to=datetime.date(2024, 2, 3))
+    df_fut = history_provider.load_futures_history(history_asset_code, params=params)
+    assert sorted(df_fut[FCl.TIMESTAMP.nm].dt.day.unique()) == [1, 2, 3]
+
+
+def test_load_history_hot_tier(history_path, history_asset_code, tmp_path):
+    hot_tier_path = str(tmp_path / 'hot_tier')
+    provider = PandasLocalFileProvider('TEST', history_path, hot_tier_path=hot_tier_path, hot_tier_years=[2024])
+    cold_provider = PandasLocalFileProvider('TEST', history_path)
+    params = RequestParameters(period_from=datetime.date(2024, 1, 5), period_to=datetime.date(2024, 1, 10),
+                               option_type=OptionsType.PUT)
+    df_opt = provider.load_options_history(history_asset_code, params=params)
+    assert df_opt.equals(cold_provider.load_options_history(history_asset_code, params=params))
+    fn_path = provider.fn_path_prepare(history_asset_code, AssetKind.OPTIONS, Timeframe.EOD, 2024)
+    mirror_path = provider._hot_tier.get_mirror_path(fn_path)
+    assert os.path.isfile(mirror_path)
+    assert not os.path.isfile(provider._hot_tier.get_mirror_path(
+        provider.fn_path_prepare(history_asset_code, AssetKind.OPTIONS, Timeframe.EOD, 2023)))
+
+    df_hist = pd.read_parquet(fn_path)
+    df_hist.loc[:, OCl.PRICE.nm] = -1.
+    df_hist.to_parquet(fn_path)
+    os.utime(fn_path, ns=(os.stat(fn_path).st_atime_ns, os.stat(mirror_path).st_mtime_ns + 1_000_000))
+    df_opt = provider.load_options_history(history_asset_code, params=params)
+    assert (df_opt[OCl.PRICE.nm] == -1.).all()
+
+
+def test_hot_tier_filter_copies_selected_columns(history_path, history_asset_code, tmp_path):
+    provider = PandasLocalFileProvider('TEST', history_path, hot_tier_path=str(tmp_path / 'hot_tier'),
+                                       hot_tier_years=[2024])
+    fn_path = provider.fn_path_prepare(history_asset_code, AssetKind.OPTIONS, Timeframe.EOD, 2024)
+    filters = [(OCl.OPTION_TYPE.nm, '==', OptionsType.PUT.code)]
+    provider._hot_tier.sync(fn_path)
+    allocated_bytes = pa.total_allocated_bytes()
+    table = provider._hot_tier.read_table(fn_path, columns=[OCl.PRICE.nm], filters=filters)
+    allocated_bytes = pa.total_allocated_bytes() - allocated_bytes
+    assert table.column_names == [OCl.PRICE.nm]
+    df_hist = pd.read_parquet(fn_path)
+    assert table.num_rows == (df_hist[OCl.OPTION_TYPE.nm] == OptionsType.PUT.code).sum()
+    assert allocated_bytes < provider._hot_tier.read_table(fn_path, filters=filters).nbytes / 2
+
+
+def test_load_history_compact_dtypes(history_path, history_asset_code):
+    provider = PandasLocalFileProvider('TEST', history_path, compact_dtypes=True, float32=True)
+    columns = AbstractProvider.options_columns + [OCl.ASSET_CODE.nm, OCl.BASE_CODE.nm]
+    params = RequestParameters(period_from=2023, period_to=2024)
+    df_opt = provider.load_options_history(history_asset_code, params=params, columns=columns)
+    df_opt_full = PandasLocalFileProvider('TEST', history_path).load_options_history(
+        history_asset_code, params=params, columns=columns)
+    for column in [OCl.OPTION_TYPE.nm, OCl.ASSET_CODE.nm, OCl.BASE_CODE.nm]:
+        assert isinstance(df_opt[column].dtype, pd.CategoricalDtype)
+        assert df_opt[column].astype(str).equals(df_opt_full[column])
+    assert df_opt[OCl.PRICE.nm].dtype == 'float32'
+    assert df_opt[OCl.STRIKE.nm].dtype == 'float64'
+    assert df_opt[OCl.TIMESTAMP.nm].equals(df_opt_full[OCl.TIMESTAMP.nm])
+    assert df_opt.memory_usage(deep=True).sum() < df_opt_full.memory_usage(deep=True).sum() / 2
+
+
+def test_load_options_book(history_provider, history_asset_code, history_years):
+    settlement_datetime = datetime.datetime(history_years[1], 1, 5, tzinfo=datetime.UTC)
+    df_book = history_provider.load_options_book(history_asset_code, settlement_datetime)
+    df_hist = history_provider.load_options_history(
+        history_asset_code, params=RequestParameters(period_to=settlement_datetime))
+    assert list(df_book.columns) == AbstractProvider.options_columns
+    pd.testing.assert_frame_equal(df_book, df_hist)
+    # The last timestamp before settlement datetime
+    df_asof = history_provider.load_options_book(history_asset_code, settlement_datetime + datetime.timedelta(hours=5),
+                                                 columns=[OCl.TIMESTAMP.nm])
+    assert (df_asof[OCl.TIMESTAMP.nm] == pd.Timestamp(settlement_datetime)).all()
+    df_last = history_provider.load_options_book(history_asset_code, columns=[OCl.TIMESTAMP.nm])
+    assert (df_last[OCl.TIMESTAMP.nm] == pd.Timestamp(f'{history_years[-1]}-01-20', tz=datetime.UTC)).all()
+    with pytest.raises(FileNotFoundError):
+        history_provider.load_options_book(history_asset_code, datetime.datetime(history_years[0] - 1, 12, 31))
+
+
+def test_load_futures_book_previous_year(history_provider, history_asset_code, history_years):
+    df_book = history_provider.load_futures_book(history_asset_code, datetime.datetime(history_years[1], 1, 1) -
+                                                 datetime.timedelta(seconds=1))
+    assert list(df_book.columns) == AbstractProvider.futures_columns
+    assert (df_book[FCl.TIMESTAMP.nm] == pd.Timestamp(f'{history_years[0]}-01-20', tz=datetime.UTC)).all()
+    assert len(df_book) == 3  # Weekly expirations
+
+
+def test_load_options_chain(history_provider, history_asset_code, history_years):
+    settlement_datetime = datetime.datetime(history_years[1], 1, 8, tzinfo=datetime.UTC)
+    df_chain = history_provider.load_options_chain(history_asset_code, settlement_datetime)
+    df_hist = history_provider.load_options_history(history_asset_code,
+                                                    params=RequestParameters(period_from=history_years[1]))
+    pd.testing.assert_frame_equal(df_chain, select_chain(df_hist, pd.Timestamp(settlement_datetime)).reset_index(
+        drop=True))
+    validate_chain(df_chain)
+    expiration_date = datetime.datetime(history_years[1], 1, 21, tzinfo=datetime.UTC)
+    df_chain = history_provider.load_options_chain(history_asset_code, settlement_datetime, expiration_date,
+                                                   columns=[OCl.EXPIRATION_DATE.nm, OCl.STRIKE.nm])
+    assert (df_chain[OCl.EXPIRATION_DATE.nm] == pd.Timestamp(expiration_date)).all()
+    assert len(df_chain) == 2 * 4  # Calls and puts for strikes
+    with pytest.raises(ValueError):
+        history_provider.load_options_chain(history_asset_code, settlement_datetime,
+                                            datetime.datetime(history_years[1], 1, 1))
+
+
+def test_option_chain_limited_by_data_period(history_provider, history_asset_code, history_years):
+    params = RequestParameters(period_from=history_years[0], period_to=history_years[0])
+    df_chain = OptionChain(OptionData(history_provider, history_asset_code, params)).select_chain()
+    df_hist = history_provider.load_options_history(history_asset_code, params=params)
+    assert df_chain[OCl.TIMESTAMP.nm].iloc[0] == df_hist[OCl.TIMESTAMP.nm].max()
+    option_data = OptionData(history_provider, history_asset_code, params)
+    option_data.df_hist = df_hist.assign(enrichment=1.)  # Loaded history is used with its columns
+    df_chain = OptionChain(option_data).select_chain()
+    assert (df_chain[OCl.TIMESTAMP.nm] == df_hist[OCl.TIMESTAMP.nm].max()).all()
+    assert (df_chain['enrichment'] == 1.).all()
+
+
+def test_iter_options_history(history_provider, history_asset_code, history_years):
+    params = RequestParameters(period_from=datetime.date(history_years[0], 1, 10),
+                               period_to=datetime.date(history_years[1], 1, 15), option_type=OptionsType.PUT)
+    df_hist = history_provider.load_options_history(history_asset_code, params=params)
+    chunks = list(history_provider.iter_options_history(history_asset_code, params=params, batch_rows=100))
+    assert all(len(df_chunk) <= 100 for df_chunk in chunks)
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), df_hist)
+
+
+def test_iter_futures_history_expiration_sorted_files(history_provider, history_asset_code, history_years):
+    """Files sorted by expiration are yielded in timestamp order"""
+    fn_path = history_provider.fn_path_prepare(history_asset_code, AssetKind.FUTURES, Timeframe.EOD, history_years[0])
+    df_fut = pd.read_parquet(fn_path)
+    write_history_parquet(df_fut, fn_path, sort_columns=[FCl.EXPIRATION_DATE.nm, FCl.TIMESTAMP.nm])
+    batches = list(history_provider.iter_futures_history(history_asset_code, params=RequestParameters(
+        period_to=history_years[0]), columns=[FCl.TIMESTAMP.nm, FCl.PRICE.nm], batch_rows=7, to_pandas=False))
+    assert all(isinstance(batch, pa.RecordBatch) and batch.num_rows <= 7 for batch in batches)
+    df_iter = pa.Table.from_batches(batches).to_pandas()
+    assert df_iter.columns.tolist() == [FCl.TIMESTAMP.nm, FCl.PRICE.nm]
+    assert df_iter[FCl.TIMESTAMP.nm].is_monotonic_increasing
+    assert len(df_iter) == len(df_fut)
@@ -0,0 +1,78 @@
+"""Tests for timestamp offset index of history files"""
+import os
+import datetime
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from options_lib.dictionary import OptionsColumns as OCl
+from provider import TimestampOffsetIndex, write_history_parquet
+
+
+def _write_intraday_history(fn_path: str) -> pd.DataFrame:
+    """Two days of 5m history with row group for every day"""
+    timestamps = pd.date_range('2024-01-01', periods=2 * 288, freq='5min', tz=datetime.UTC)
+    expirations = pd.to_datetime(['2024-01-05', '2024-01-12'], utc=True)
+    df = pd.DataFrame([(timestamp, expiration, strike) for timestamp in timestamps for expiration in expirations
+                       for strike in [90_000., 100_000.]],
+                      columns=[OCl.TIMESTAMP.nm, OCl.EXPIRATION_DATE.nm, OCl.STRIKE.nm])
+    df[OCl.PRICE.nm] = np.arange(len(df), dtype=float)
+    write_history_parquet(df, fn_path, sort_columns=[OCl.TIMESTAMP.nm, OCl.EXPIRATION_DATE.nm, OCl.STRIKE.nm],
+                          row_group_rows=0)
+    return df
+
+
+def test_offset_index_read_single_row_group(tmp_path):
+    fn_path = os.path.join(tmp_path, '2024.parquet')
+    df = _write_intraday_history(fn_path)
+    assert pq.ParquetFile(fn_path).metadata.num_row_groups == 2
+    timestamp = pd.Timestamp('2024-01-02 10:05', tz=datetime.UTC)
+    offset_index = TimestampOffsetIndex.build(fn_path)
+    assert os.path.isfile(TimestampOffsetIndex.get_sidecar_path(fn_path))
+    assert offset_index.get_ranges(timestamp.value) == [(1, 121 * 4, 2), (1, 121 * 4 + 2, 2)]
+    df_book = offset_index.read(timestamp.value).to_pandas()
+    pd.testing.assert_frame_equal(df_book, df[df[OCl.TIMESTAMP.nm] == timestamp].reset_index(drop=True),
+                                  check_dtype=False)
+    assert offset_index.get_asof_timestamp(timestamp.value + 1) == timestamp.value
+    assert offset_index.get_asof_timestamp(pd.Timestamp('2023-12-31', tz=datetime.UTC).value) is None
+
+
+def test_offset_index_multiple_ranges(tmp_path):
+    """Files sorted by expiration first have range of timestamp in every expiration"""
+    fn_path = os.path.join(tmp_path, '2024.parquet')
+    df = _write_intraday_history(fn_path)
+    write_history_parquet(df, fn_path)
+    timestamp = pd.Timestamp('2024-01-01 00:10', tz=datetime.UTC)
+    offset_index = TimestampOffsetIndex.build(fn_path)
+    assert len(offset_index.get_ranges(timestamp.value)) == 2
+    df_book = offset_index.read(timestamp.value, columns=[OCl.EXPIRATION_DATE.nm, OCl.PRICE.nm]).to_pandas()
+    assert sorted(df_book[OCl.PRICE.nm]) == sorted(df.loc[df[OCl.TIMESTAMP.nm] == timestamp, OCl.PRICE.nm])
+
+
+def test_offset_index_rebuild_changed_file(tmp_path):
+    fn_path = os.path.join(tmp_path, '2024.parquet')
+    df = _write_intraday_history(fn_path)
+    offset_index = TimestampOffsetIndex.load(fn_path)
+    assert TimestampOffsetIndex.load(fn_path).source_mtime_ns == offset_index.source_mtime_ns
+    write_history_parquet(df[df[OCl.TIMESTAMP.nm].dt.day == 1], fn_path)
+    os.utime(fn_path, ns=(offset_index.source_mtime_ns + 1, offset_index.source_mtime_ns + 1))
+    assert not offset_index.is_actual()
+    offset_index = TimestampOffsetIndex.load(fn_path)
+    assert offset_index.is_actual()
+    assert offset_index.get_last_timestamp() == pd.Timestamp('2024-01-01 23:55', tz=datetime.UTC).value
+    TimestampOffsetIndex.remove(fn_path)
+    assert not os.path.exists(TimestampOffsetIndex.get_sidecar_path(fn_path))
+
+
+def test_offset_index_expiration_ranges(tmp_path):
+    fn_path = os.path.join(tmp_path, '2024.parquet')
+    df = _write_intraday_history(fn_path)
+    timestamp = pd.Timestamp('2024-01-02 10:05', tz=datetime.UTC)
+    expiration = pd.Timestamp('2024-01-12', tz=datetime.UTC)
+    offset_index = TimestampOffsetIndex.load(fn_path)
+    assert offset_index.get_expirations(timestamp.value) == [pd.Timestamp('2024-01-05', tz=datetime.UTC).value,
+                                                             expiration.value]
+    assert offset_index.get_ranges(timestamp.value, expiration.value) == [(1, 121 * 4 + 2, 2)]
+    df_chain = offset_index.read(timestamp.value, expiration=expiration.value).to_pandas()
+    df_expected = df[(df[OCl.TIMESTAMP.nm] == timestamp) & (df[OCl.EXPIRATION_DATE.nm] == expiration)]
+    pd.testing.assert_frame_equal(df_chain, df_expected.reset_index(drop=True), check_dtype=False)
+    assert offset_index.get_ranges(timestamp.value, expiration.value + 1) == []
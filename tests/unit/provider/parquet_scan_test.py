@@ -0,0 +1,76 @@
+"""Tests for parquet scan with predicate pushdown"""
+import datetime
+import pandas as pd
+import pyarrow.parquet as pq
+
+from options_lib.dictionary import OptionsColumns as OCl
+from provider._parquet_scan import prune_row_groups, read_parquet_table, iter_parquet_batches
+
+
+def _write_day_row_groups(fn_path: str, days: int = 5, rows_in_day: int = 4, **kwargs) -> pd.DataFrame:
+    df = pd.DataFrame({
+        OCl.TIMESTAMP.nm: pd.date_range('2024-01-01', periods=days, freq='1D', tz=datetime.UTC).repeat(rows_in_day),
+        OCl.OPTION_TYPE.nm: ['c', 'p'] * (days * rows_in_day // 2),
+        OCl.PRICE.nm: range(days * rows_in_day),
+    })
+    df[OCl.PRICE.nm] = df[OCl.PRICE.nm].astype(float)
+    df.to_parquet(fn_path, row_group_size=rows_in_day, **kwargs)
+    return df
+
+
+def test_prune_row_groups_by_timestamp(tmp_path):
+    fn_path = str(tmp_path / 'history.parquet')
+    _write_day_row_groups(fn_path)
+    parquet_file = pq.ParquetFile(fn_path)
+    filters = [(OCl.TIMESTAMP.nm, '>=', pd.Timestamp('2024-01-02', tz=datetime.UTC)),
+               (OCl.TIMESTAMP.nm, '<', datetime.datetime(2024, 1, 4))]
+    row_groups = prune_row_groups(parquet_file.metadata, parquet_file.schema_arrow, filters)
+    assert row_groups == [1, 2]
+    assert prune_row_groups(parquet_file.metadata, parquet_file.schema_arrow, None) == [0, 1, 2, 3, 4]
+
+
+def test_read_parquet_table_with_filters(tmp_path):
+    fn_path = str(tmp_path / 'history.parquet')
+    df = _write_day_row_groups(fn_path)
+    settlement_date = pd.Timestamp('2024-01-03', tz=datetime.UTC)
+    filters = [(OCl.TIMESTAMP.nm, '==', settlement_date), (OCl.OPTION_TYPE.nm, '==', 'p')]
+    table = read_parquet_table(fn_path, columns=[OCl.PRICE.nm], filters=filters)
+    expected = df[(df[OCl.TIMESTAMP.nm] == settlement_date) & (df[OCl.OPTION_TYPE.nm] == 'p')][OCl.PRICE.nm]
+    assert table.column_names == [OCl.PRICE.nm]
+    assert table.column(OCl.PRICE.nm).to_pylist() == expected.tolist()
+
+
+def test_read_parquet_table_without_matched_row_groups(tmp_path):
+    fn_path = str(tmp_path / 'history.parquet')
+    _write_day_row_groups(fn_path)
+    filters = [(OCl.TIMESTAMP.nm, '>', pd.Timestamp('2025-01-01', tz=datetime.UTC))]
+    table = read_parquet_table(fn_path, columns=[OCl.PRICE.nm], filters=filters)
+    assert table.num_rows == 0
+    assert table.column_names == [OCl.PRICE.nm]
+
+
+def test_iter_parquet_batches_with_filters(tmp_path):
+    fn_path = str(tmp_path / 'history.parquet')
+    df = _write_day_row_groups(fn_path)
+    filters = [(OCl.TIMESTAMP.nm, '>=', pd.Timestamp('2024-01-02', tz=datetime.UTC)), (OCl.OPTION_TYPE.nm, '==', 'c')]
+    batches = list(iter_parquet_batches(fn_path, columns=[OCl.PRICE.nm], filters=filters, batch_rows=3))
+    assert all(batch.schema.names == [OCl.PRICE.nm] and batch.num_rows <= 3 for batch in batches)
+    prices = [price for batch in batches for price in batch.column(0).to_pylist()]
+    expected = df[(df[OCl.TIMESTAMP.nm] >= pd.Timestamp('2024-01-02', tz=datetime.UTC)) &
+                  (df[OCl.OPTION_TYPE.nm] == 'c')]
+    assert prices == expected[OCl.PRICE.nm].tolist()
+
+
+def test_read_parquet_table_timestamp_units(tmp_path):
+    for unit in ['ms', 'us']:
+        fn_path = str(tmp_path / f'history_{unit}.parquet')
+        df = _write_day_row_groups(fn_path, coerce_timestamps=unit, allow_truncated_timestamps=True)
+        parquet_file = pq.ParquetFile(fn_path)
+        assert parquet_file.schema_arrow.field(OCl.TIMESTAMP.nm).type.unit == unit
+        filters = [(OCl.TIMESTAMP.nm, '>=', pd.Timestamp('2024-01-02', tz=datetime.UTC)),
+                   (OCl.TIMESTAMP.nm, '<', pd.Timestamp('2024-01-04', tz=datetime.UTC))]
+        assert prune_row_groups(parquet_file.metadata, parquet_file.schema_arrow, filters) == [1, 2]
+        table = read_parquet_table(fn_path, columns=[OCl.PRICE.nm], filters=filters)
+        assert table.column(OCl.PRICE.nm).to_pylist() == df[OCl.PRICE.nm].iloc[4:12].tolist()
+        filters = [(OCl.TIMESTAMP.nm, '<', pd.Timestamp('2024-01-02 00:00:00.000000001', tz=datetime.UTC))]
+        assert prune_row_groups(parquet_file.metadata, parquet_file.schema_arrow, filters) == [0, 1, 2, 3, 4]
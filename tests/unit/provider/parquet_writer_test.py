@@ -0,0 +1,51 @@
+"""Tests for history parquet writer"""
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from options_lib.dictionary import OptionsColumns as OCl, FuturesColumns as FCl
+from provider import RequestParameters, write_history_parquet
+from provider._parquet_writer import get_row_group_bounds
+
+
+def _load_reversed_history(history_provider, history_asset_code) -> pd.DataFrame:
+    """Options history in reverse order so sorting is required"""
+    df_opt = history_provider.load_options_history(history_asset_code, params=RequestParameters(period_from=2024))
+    return df_opt.iloc[::-1].reset_index(drop=True)
+
+
+def test_get_row_group_bounds():
+    key = pa.array([1, 1, 1, 2, 3, 3, 3, 3, 3, 4])
+    assert get_row_group_bounds(key, 0) == [(0, 3), (3, 4), (4, 9), (9, 10)]
+    assert get_row_group_bounds(key, 4) == [(0, 4), (4, 8), (8, 10)]
+    assert get_row_group_bounds(key, 5) == [(0, 4), (4, 9), (9, 10)]
+    assert get_row_group_bounds(pa.array([], pa.int64()), 5) == []
+
+
+def test_write_history_parquet_row_groups_by_trading_day(tmp_path, history_provider, history_asset_code):
+    fn_path = str(tmp_path / 'history.parquet')
+    df_opt = _load_reversed_history(history_provider, history_asset_code)
+    write_history_parquet(df_opt, fn_path, row_group_rows=0)
+    parquet_file = pq.ParquetFile(fn_path)
+    df_hist = pd.read_parquet(fn_path)
+    assert len(df_hist) == len(df_opt)
+    sort_columns = [OCl.TIMESTAMP.nm, OCl.EXPIRATION_DATE.nm, OCl.STRIKE.nm]
+    assert df_hist[sort_columns].equals(df_hist[sort_columns].sort_values(sort_columns, ignore_index=True))
+    assert parquet_file.metadata.num_row_groups == df_opt[OCl.TIMESTAMP.nm].dt.floor('D').nunique()
+    timestamp_idx = parquet_file.schema_arrow.get_field_index(OCl.TIMESTAMP.nm)
+    previous_max = None
+    for row_group in range(parquet_file.metadata.num_row_groups):
+        column = parquet_file.metadata.row_group(row_group).column(timestamp_idx)
+        assert column.statistics.min.date() == column.statistics.max.date()  # Row groups don't overlap by time
+        assert previous_max is None or previous_max < column.statistics.min
+        previous_max = column.statistics.max
+        assert column.has_offset_index and column.has_column_index
+
+
+def test_write_history_parquet_row_groups_by_day(tmp_path):
+    fn_path = str(tmp_path / 'futures.parquet')
+    df_fut = pd.DataFrame({FCl.TIMESTAMP.nm: pd.date_range('2024-01-01', periods=48, freq='1h', tz='UTC'),
+                           FCl.PRICE.nm: 1.})
+    write_history_parquet(df_fut, fn_path, row_group_rows=0)
+    assert pq.ParquetFile(fn_path).metadata.num_row_groups == 2
+    assert pd.read_parquet(fn_path).equals(df_fut)
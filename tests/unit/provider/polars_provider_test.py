@@ -0,0 +1,61 @@
+"""Tests for polars local provider"""
+import datetime
+import pytest
+import pandas as pd
+from options_lib.dictionary import OptionsType, OptionsColumns as OCl, FuturesColumns as FCl
+from provider import AbstractProvider, DataEngine, DataSource, RequestParameters
+from exchange import get_provider
+
+pl = pytest.importorskip("polars")
+
+
+@pytest.fixture(name='polars_provider')
+def polars_provider_fixture(history_path):
+    return get_provider('TEST', storage=DataSource.LOCAL, engine=DataEngine.POLARIS, data_path=history_path)
+
+
+def test_load_options_history_like_pandas(polars_provider, history_provider, history_asset_code):
+    params = RequestParameters(period_from=datetime.date(2022, 1, 10), period_to=datetime.date(2023, 1, 5),
+                               option_type=OptionsType.CALL, strike_from=90_000.)
+    df_opt = polars_provider.load_options_history(history_asset_code, params=params)
+    df_expected = history_provider.load_options_history(history_asset_code, params=params)
+    assert list(df_opt.columns) == AbstractProvider.options_columns
+    pd.testing.assert_frame_equal(df_opt, df_expected, check_dtype=False)
+
+
+def test_scan_options_history(polars_provider, history_asset_code, history_years):
+    lf = polars_provider.scan_options_history(history_asset_code, columns=[OCl.TIMESTAMP.nm, OCl.PRICE.nm],
+                                              params=RequestParameters(period_from=history_years[0],
+                                                                       period_to=history_years[-1]))
+    assert isinstance(lf, pl.LazyFrame)
+    df_years = lf.group_by(pl.col(OCl.TIMESTAMP.nm).dt.year()).agg(pl.len()).collect()
+    assert sorted(df_years[OCl.TIMESTAMP.nm].to_list()) == history_years
+
+
+def test_load_futures_history_polars(polars_provider, history_asset_code):
+    params = RequestParameters(period_to=datetime.date(2024, 1, 3))
+    df_fut = polars_provider.load_futures_history(history_asset_code, params=params, to_pandas=False)
+    assert isinstance(df_fut, pl.DataFrame)
+    assert df_fut[FCl.TIMESTAMP.nm].dt.day().unique().to_list() == [3]
+
+
+def test_iter_options_history_default_chunks(polars_provider, history_provider, history_asset_code):
+    chunks = list(polars_provider.iter_options_history(history_asset_code, batch_rows=500))
+    assert all(len(df_chunk) <= 500 for df_chunk in chunks)
+    df_iter = pd.concat(chunks, ignore_index=True)
+    assert df_iter[OCl.TIMESTAMP.nm].is_monotonic_increasing
+    assert len(df_iter) == len(history_provider.load_options_history(history_asset_code))
+
+
+def test_load_book_and_chain_like_pandas(polars_provider, history_provider, history_asset_code):
+    settlement_datetime = datetime.datetime(2023, 1, 8, 12)
+    pd.testing.assert_frame_equal(polars_provider.load_futures_book(history_asset_code, settlement_datetime),
+                                  history_provider.load_futures_book(history_asset_code, settlement_datetime),
+                                  check_dtype=False)
+    pd.testing.assert_frame_equal(polars_provider.load_options_chain(history_asset_code, settlement_datetime),
+                                  history_provider.load_options_chain(history_asset_code, settlement_datetime),
+                                  check_dtype=False)
+    pd.testing.assert_frame_equal(polars_provider.load_options_book(history_asset_code),
+                                  history_provider.load_options_book(history_asset_code), check_dtype=False)
+    with pytest.raises(FileNotFoundError):
+        polars_provider.load_options_chain(history_asset_code, datetime.datetime(2000, 1, 1))
@@ -0,0 +1,83 @@
+"""Tests for S3 provider with local file system as storage stand-in"""
+import datetime
+import os
+import pytest
+import pyarrow.fs as pafs
+import numpy as np
+import pandas as pd
+from options_lib.dictionary import AssetKind, Timeframe, OptionsType, OptionsColumns as OCl
+from provider import DataSource, PandasS3FileProvider, RequestParameters, write_history_parquet
+from provider._block_cache import DiskBlockCache
+from exchange import get_provider
+
+
+@pytest.fixture(name='storage')
+def storage_fixture(history_path) -> tuple[pafs.FileSystem, str]:
+    """Local file system with parent of history path as root and history folder as bucket"""
+    return pafs.SubTreeFileSystem(os.path.dirname(history_path), pafs.LocalFileSystem()), \
+        os.path.basename(history_path)
+
+
+def test_get_provider_s3(storage, history_asset_code, history_years):
+    filesystem, bucket = storage
+    provider = get_provider('TEST', storage=DataSource.S3, data_path=f's3://{bucket}', filesystem=filesystem)
+    assert isinstance(provider, PandasS3FileProvider)
+    assert provider.get_assets_list(AssetKind.OPTIONS) == [history_asset_code]
+    assert provider.get_asset_history_years(history_asset_code, AssetKind.OPTIONS, Timeframe.EOD) == history_years
+
+
+def test_load_options_history_like_local(storage, history_provider, history_asset_code):
+    filesystem, bucket = storage
+    provider = PandasS3FileProvider('TEST', bucket, filesystem=filesystem)
+    params = RequestParameters(period_from=datetime.date(2023, 1, 5), period_to=datetime.date(2024, 1, 3),
+                               option_type=OptionsType.CALL)
+    df_opt = provider.load_options_history(history_asset_code, params=params)
+    assert df_opt.equals(history_provider.load_options_history(history_asset_code, params=params))
+
+
+def test_load_options_history_ranged_reads_cache(storage, history_provider, history_asset_code, tmp_path):
+    filesystem, bucket = storage
+    fn_path = history_provider.fn_path_prepare(history_asset_code, AssetKind.OPTIONS, Timeframe.EOD, 2024)
+    df_hist = history_provider.load_options_history(history_asset_code, params=RequestParameters(period_from=2024))
+    df_hist = pd.concat([df_hist.assign(**{OCl.TIMESTAMP.nm: df_hist[OCl.TIMESTAMP.nm] + pd.Timedelta(weeks=week),
+                                           OCl.EXPIRATION_DATE.nm: df_hist[OCl.EXPIRATION_DATE.nm] +
+                                           pd.Timedelta(weeks=week)})
+                         for week in range(0, 48)], ignore_index=True)  # Expirations for whole year
+    write_history_parquet(df_hist.assign(**{OCl.PRICE.nm: np.random.random(len(df_hist))}), fn_path, row_group_rows=0)
+    cache_path = str(tmp_path / 'cache')
+    params = RequestParameters(period_from=2024, expiration_date=datetime.date(2024, 1, 7))
+    provider = PandasS3FileProvider('TEST', bucket, filesystem=filesystem, cache_path=cache_path, block_size=1024)
+    df_opt = provider.load_options_history(history_asset_code, params=params)
+    assert df_opt.equals(history_provider.load_options_history(history_asset_code, params=params))
+    cache_size = provider._block_cache.size
+    assert 0 < cache_size < os.path.getsize(fn_path) / 2  # Only footer and required row groups are read
+
+    provider = PandasS3FileProvider('TEST', bucket, filesystem=filesystem, cache_path=cache_path, block_size=1024)
+    assert provider._block_cache.size == cache_size
+    assert provider.load_options_history(history_asset_code, params=params).equals(df_opt)
+    assert provider._block_cache.size == cache_size
+
+
+def test_disk_block_cache_eviction(tmp_path):
+    cache = DiskBlockCache(str(tmp_path), max_size=1000, block_size=100)
+    for block in range(10):
+        cache.put('file', block, bytes(100))
+        block_time = 1_700_000_000 + block if block > 0 else 1_700_000_100  # Block 0 is the most recently used
+        os.utime(cache.get_block_path('file', block), (block_time, block_time))
+    cache.put('file', 9, bytes(100))  # Replaced block is not counted twice
+    assert cache.size == 1000
+    cache.put('file', 10, bytes(100))
+    assert cache.size == 900
+    assert cache.get('file', 0) == bytes(100)
+    assert cache.get('file', 1) is None and cache.get('file', 2) is None
+    assert cache.get('file', 10) == bytes(100)
+
+
+def test_load_book_and_chain_like_local(storage, history_provider, history_asset_code):
+    filesystem, bucket = storage
+    provider = PandasS3FileProvider('TEST', bucket, filesystem=filesystem)
+    settlement_datetime = datetime.datetime(2023, 1, 8, 12)
+    pd.testing.assert_frame_equal(provider.load_futures_book(history_asset_code, settlement_datetime),
+                                  history_provider.load_futures_book(history_asset_code, settlement_datetime))
+    pd.testing.assert_frame_equal(provider.load_options_chain(history_asset_code, settlement_datetime),
+                                  history_provider.load_options_chain(history_asset_code, settlement_datetime))